@@ -1,10 +1,14 @@
+import os
 import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import logging
 from frontend_app.config import Config
 from frontend_app.components.sidebar import sidebar
-from frontend_app.pages import realtime, analytics
+from frontend_app.pages import realtime, analytics, candles, watchlist
+from frontend_app.db_handler import get_db_handler
+from frontend_app.rollups import RollupMaintainer
+from frontend_app.export import get_export_manager, register_routes
 
 logging.basicConfig(level=logging.INFO)
 
@@ -15,6 +19,9 @@ app = dash.Dash(
     title="Modernized Trading Dashboard"
 )
 
+server = app.server  # WSGI entry point, e.g. for frontend_app.serve
+register_routes(app.server, get_export_manager())
+
 app.layout = html.Div(
     children=[
         dcc.Location(id='url', refresh=False),
@@ -32,9 +39,18 @@ def display_page(pathname):
         return realtime.layout()
     elif pathname == '/analytics':
         return analytics.layout()
+    elif pathname == '/candles':
+        return candles.layout()
+    elif pathname == '/watchlist':
+        return watchlist.layout()
     else:
         # Default to Real-time if none selected
         return realtime.layout()
 
 if __name__ == '__main__':
-    app.run_server(debug=True, host="0.0.0.0", port=8050)
+    debug = True
+    # The debug reloader runs this file twice: a watcher, and the server it
+    # restarts (WERKZEUG_RUN_MAIN set). Only the server maintains the rollup.
+    if Config.ROLLUP_INTERVAL_SECONDS > 0 and (not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        RollupMaintainer(get_db_handler(), Config.ROLLUP_INTERVAL_SECONDS, Config.ROLLUP_LAG_SECONDS).start()
+    app.run(debug=debug, host="0.0.0.0", port=8050)
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict, deque
+from datetime import timedelta
+import pandas as pd
+
+# Selectable bar widths, in seconds; the labels are TIME_BUCKET widths.
+CANDLE_INTERVALS = OrderedDict([('1s', 1), ('5s', 5), ('1m', 60), ('5m', 300), ('1h', 3600)])
+
+
+def _floor(ts, seconds):
+    return pd.Timestamp(ts).floor(f"{seconds}s").to_pydatetime()
+
+
+class _Series:
+    def __init__(self, bars):
+        self.completed = deque(maxlen=bars)
+        self.open_bars = []
+        self.open_from = None  # start of the first bar that may still change
+        self.lock = threading.Lock()
+
+
+class CandleCache:
+    """
+    OHLCV bars per ticker and interval, computed in SQL.
+
+    A bar is final once the ticker's newest trade is ``settle_seconds`` past
+    its end; final bars are kept here and never queried again. Each refresh
+    therefore only re-aggregates trades from the first bar still open. On
+    first load, bars of a minute or longer that are older than the rollup
+    lag come from ``live_trades_1m`` instead of raw trades.
+    """
+
+    def __init__(self, db_handler, bars, settle_seconds, rollup_lag_seconds, max_series=64):
+        self.db_handler = db_handler
+        self.bars = bars
+        self.settle = timedelta(seconds=settle_seconds)
+        self.rollup_lag = timedelta(seconds=rollup_lag_seconds)
+        self.max_series = max_series
+        self.series = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _series(self, ticker, interval):
+        with self.lock:
+            series = self.series.get((ticker, interval))
+            if series is None:
+                series = self.series[(ticker, interval)] = _Series(self.bars)
+                while len(self.series) > self.max_series:
+                    self.series.popitem(last=False)
+            self.series.move_to_end((ticker, interval))
+            return series
+
+    def get(self, ticker, interval):
+        """Refresh and return the latest bars, oldest first, as OHLCV rows."""
+        series = self._series(ticker, interval)
+        with series.lock:
+            if series.open_from is None:
+                self._backfill(series, ticker, interval)
+            else:
+                self._absorb(series, interval, self.db_handler.fetch_ohlcv(ticker, interval, series.open_from))
+            return (list(series.completed) + series.open_bars)[-self.bars:]
+
+    def _backfill(self, series, ticker, interval):
+        seconds = CANDLE_INTERVALS[interval]
+        _, last = self.db_handler.fetch_time_range([ticker])
+        if last is None:
+            return
+        start = _floor(pd.Timestamp(last) - pd.Timedelta(seconds=seconds * (self.bars - 1)), seconds)
+        rows = []
+        if seconds >= 60:
+            raw_from = max(_floor(pd.Timestamp(last) - self.rollup_lag, seconds), start)
+            if raw_from > start:
+                rows = self.db_handler.fetch_ohlcv(ticker, interval, start, raw_from, rollup=True)
+            start = raw_from
+        rows += self.db_handler.fetch_ohlcv(ticker, interval, start)
+        # Only mark the series loaded once every query succeeded.
+        series.open_from = start
+        self._absorb(series, interval, rows)
+
+    def _absorb(self, series, interval, rows):
+        if not rows:
+            return
+        final_before = max(row[7] for row in rows) - self.settle
+        width = timedelta(seconds=CANDLE_INTERVALS[interval])
+        open_bars = []
+        for row in rows:
+            if not open_bars and row[0] + width <= final_before:
+                series.completed.append(row)
+                series.open_from = row[0] + width
+            else:
+                open_bars.append(row)
+        series.open_bars = open_bars
+
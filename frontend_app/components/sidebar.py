@@ -8,7 +8,9 @@ def sidebar(active_page=None):
     """
     nav_items = [
         {"label": "Real-time Trading", "href": "/realtime", "icon": "fas fa-chart-line"},
-        {"label": "Analytics", "href": "/analytics", "icon": "fas fa-chart-bar"}
+        {"label": "Analytics", "href": "/analytics", "icon": "fas fa-chart-bar"},
+        {"label": "Candles", "href": "/candles", "icon": "fas fa-chart-area"},
+        {"label": "Watchlist", "href": "/watchlist", "icon": "fas fa-list"}
     ]
 
     def nav_link(item):
@@ -31,6 +33,8 @@ def sidebar(active_page=None):
                 ]
             ),
             nav_link(nav_items[0]),
-            nav_link(nav_items[1])
+            nav_link(nav_items[1]),
+            nav_link(nav_items[2]),
+            nav_link(nav_items[3])
         ]
     )
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,4 +9,45 @@ class Config:
     Configuration class for environment variables and settings.
     """
     SINGLESTORE_DB_URL = os.environ.get("SINGLESTORE_DB_URL", "")
-    UPDATE_INTERVAL_MS = 2000  # 2 seconds for real-time updates
+    UPDATE_INTERVAL_MS = int(os.environ.get("UPDATE_INTERVAL_MS", "2000"))  # realtime callback per browser
+    POLL_INTERVAL_MS = int(os.environ.get("POLL_INTERVAL_MS", "500"))  # one DB refresh per watched ticker
+    WATCH_TIMEOUT_SECONDS = int(os.environ.get("WATCH_TIMEOUT_SECONDS", "30"))  # stop polling tickers nobody views
+    REALTIME_BUFFER_SIZE = int(os.environ.get("REALTIME_BUFFER_SIZE", "300"))  # trades kept per ticker
+    REALTIME_MAX_BUFFERS = int(os.environ.get("REALTIME_MAX_BUFFERS", "64"))  # tickers with a trade buffer
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "5"))  # seconds to wait for a free connection
+    PRICE_TREND_POINTS = int(os.environ.get("PRICE_TREND_POINTS", "600"))  # about one bucket per chart pixel
+    ROLLUP_INTERVAL_SECONDS = int(os.environ.get("ROLLUP_INTERVAL_SECONDS", "10"))  # 0: run frontend_app.rollups separately
+    ROLLUP_LAG_SECONDS = int(os.environ.get("ROLLUP_LAG_SECONDS", "60"))  # re-aggregate this far back for late rows
+    EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "neon_exports"))
+    EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", "50000"))  # rows per fetch and write
+    EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "1"))  # exports run at once
+    EXPORT_RETENTION_SECONDS = int(os.environ.get("EXPORT_RETENTION_SECONDS", "86400"))  # then files are deleted
+    SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "neon_query_cache.sqlite"))
+    SERVE_HOST = os.environ.get("SERVE_HOST", "0.0.0.0")
+    SERVE_PORT = int(os.environ.get("SERVE_PORT", "8050"))
+    SERVE_WORKERS = int(os.environ.get("SERVE_WORKERS", str(os.cpu_count() or 2)))  # processes, each with its own pool
+    SERVE_THREADS = int(os.environ.get("SERVE_THREADS", "8"))  # concurrent requests per worker
+    ROLLUP_LOCK_PATH = os.environ.get("ROLLUP_LOCK_PATH", os.path.join(tempfile.gettempdir(), "neon_rollup.lock"))  # held by the worker running the rollup
+    WARMUP_TICKERS = [t.strip().upper() for t in os.environ.get("WARMUP_TICKERS", "AAPL").split(",") if t.strip()]
+    CANDLE_BARS = int(os.environ.get("CANDLE_BARS", "300"))  # bars drawn per chart
+    CANDLE_REFRESH_MS = int(os.environ.get("CANDLE_REFRESH_MS", "1000"))
+    CANDLE_SETTLE_SECONDS = int(os.environ.get("CANDLE_SETTLE_SECONDS", "2"))  # wait for late trades before a bar is final
+    CANDLE_SERIES = int(os.environ.get("CANDLE_SERIES", "64"))  # ticker/interval pairs kept in memory
+    WATCHLIST_TICKERS = os.environ.get("WATCHLIST_TICKERS", "AAPL, MSFT, GOOGL, AMZN, TSLA")  # default watchlist
+    WATCHLIST_REFRESH_MS = int(os.environ.get("WATCHLIST_REFRESH_MS", "1000"))  # one query per refresh for all viewers
+    WATCHLIST_WINDOW_SECONDS = int(os.environ.get("WATCHLIST_WINDOW_SECONDS", "120"))  # sparkline and change window
+    QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", "512"))  # cached results kept
+    # Seconds a cached result stays fresh, per fetch_* method; 0 or missing disables caching.
+    # Realtime tail and watermark queries are left out: the poller already issues them once per ticker.
+    QUERY_CACHE_TTLS = {
+        "fetch_aggregated_data": 5,
+        "fetch_exchange_distribution": 5,
+        "fetch_trade_breakdown": 5,
+        "fetch_time_range": 5,
+        "fetch_price_trend": 5,
+        "fetch_live_trades": 1,
+        "fetch_ohlcv": 1,  # the open bar, shared by every viewer of a ticker and interval
+        "fetch_latest_events": 30,
+        "fetch_latest_news": 30,
+    }
@@ -1,16 +1,64 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 import singlestoredb as s2
+from frontend_app.config import Config
+from frontend_app.db_pool import ConnectionPool
+from frontend_app.query_cache import CachedDBHandler, QueryCache
+
+logger = logging.getLogger(__name__)
+
+
+class QueryError(Exception):
+    """A dashboard query failed (database error or no pooled connection in time)."""
+
 
 class SingleStoreDBHandler:
     """
     Database handler for SingleStore. Provides methods to query the database.
     Modified to handle limit=None for full history fetch.
+    Queries run on connections borrowed from a bounded ConnectionPool.
     """
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, pool_size=None, pool_timeout=None):
         self.db_url = db_url
+        self.pool = ConnectionPool(
+            self.create_connection,
+            max_size=pool_size or Config.DB_POOL_SIZE,
+            timeout=pool_timeout or Config.DB_POOL_TIMEOUT,
+        )
+        # Independent queries of one callback run side by side, at most one per pooled connection.
+        self.executor = ThreadPoolExecutor(max_workers=self.pool.max_size, thread_name_prefix='db-query')
 
     def create_connection(self):
         return s2.connect(self.db_url)
 
+    def reset_after_fork(self):
+        """
+        Give a forked worker its own connections and query threads. The
+        inherited connections are dropped, not closed: closing them would
+        end the parent's sessions on the shared sockets.
+        """
+        self.pool._init_state()
+        self.executor = ThreadPoolExecutor(max_workers=self.pool.max_size, thread_name_prefix='db-query')
+
+    def _fetchall(self, query, params):
+        """
+        Run ``query`` and return its rows. Failures raise QueryError rather
+        than returning no rows, so the query cache never keeps an outage's
+        empty result and callers can tell "no data" from "no answer".
+        """
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    return cur.fetchall()
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise QueryError(str(e)) from e
+
     def fetch_live_trades(self, tickers, limit=200):
         """
         Fetch latest trades for given tickers from live_trades.
@@ -37,56 +85,212 @@ class SingleStoreDBHandler:
             """
             params = tickers
 
-        conn = self.create_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                rows = cur.fetchall()
-            return rows
-        except:
+        return self._fetchall(query, params)
+
+    def fetch_trade_tail(self, ticker, limit=300):
+        """
+        The newest ``limit`` trades for one ticker, returned oldest first.
+        Rows are (localTS, id, price, size, exchange).
+        """
+        query = f"""
+            SELECT localTS, id, price, size, exchange
+            FROM live_trades
+            WHERE ticker = %s
+            ORDER BY localTS DESC, id DESC
+            LIMIT {int(limit)}
+        """
+        rows = self._fetchall(query, [ticker])
+        return list(reversed(rows))
+
+    def fetch_trades_since(self, ticker, local_ts, trade_id, limit=300):
+        """
+        Trades for one ticker after the ``(local_ts, trade_id)`` cursor,
+        oldest first, so trades of the cursor's own second are not read again.
+        """
+        query = f"""
+            SELECT localTS, id, price, size, exchange
+            FROM live_trades
+            WHERE ticker = %s AND localTS >= %s AND (localTS > %s OR id > %s)
+            ORDER BY localTS, id
+            LIMIT {int(limit)}
+        """
+        return self._fetchall(query, [ticker, local_ts, local_ts, trade_id])
+
+    def fetch_time_range(self, tickers):
+        """(first localTS, last localTS) over the given tickers' trades."""
+        if not tickers:
+            return None, None
+        query = f"""
+            SELECT MIN(localTS), MAX(localTS)
+            FROM live_trades
+            WHERE ticker IN ({",".join(["%s"] * len(tickers))})
+        """
+        rows = self._fetchall(query, tickers)
+        return tuple(rows[0]) if rows else (None, None)
+
+    def fetch_price_trend(self, tickers, start=None, end=None, points=600):
+        """
+        Price per ticker downsampled in SQL to about ``points`` time buckets
+        between ``start`` and ``end`` (the whole history when omitted).
+        Rows are (bucket, ticker, price), with price the last trade of the
+        bucket. Buckets of a minute or more are rounded to whole minutes and
+        read from the live_trades_1m rollup, so long ranges never scan raw
+        trades; the newest minute is then as fresh as the last rollup pass.
+        """
+        if not tickers:
+            return []
+        if start is None or end is None:
+            first, last = self.fetch_time_range(tickers)
+            start = start if start is not None else first
+            end = end if end is not None else last
+            if start is None or end is None:
+                return []
+        span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+        bucket_seconds = max(1, math.ceil(span / points))
+        if bucket_seconds >= 60:
+            query = f"""
+                SELECT TIME_BUCKET('{math.ceil(bucket_seconds / 60)}m', minute) AS bucket, ticker,
+                    LAST(price_last, last_ts) AS price
+                FROM live_trades_1m
+                WHERE ticker IN ({",".join(["%s"] * len(tickers))})
+                AND minute BETWEEN TIME_BUCKET('1m', %s) AND %s
+                GROUP BY 1, 2
+                ORDER BY 2, 1
+            """
+        else:
+            query = f"""
+                SELECT TIME_BUCKET('{bucket_seconds}s', localTS) AS bucket, ticker, LAST(price, localTS) AS price
+                FROM live_trades
+                WHERE ticker IN ({",".join(["%s"] * len(tickers))})
+                AND localTS BETWEEN %s AND %s
+                GROUP BY 1, 2
+                ORDER BY 2, 1
+            """
+        return self._fetchall(query, list(tickers) + [start, end])
+
+    def fetch_ohlcv(self, ticker, interval, start, end=None, rollup=False):
+        """
+        OHLCV bars of ``interval`` (a TIME_BUCKET width such as '5s' or '1h')
+        from ``start`` up to ``end``. With ``rollup`` the bars are built from
+        live_trades_1m, so only whole-minute intervals apply. Rows are
+        (bucket, open, high, low, close, volume, trades, last_ts).
+        """
+        if rollup:
+            query = f"""
+                SELECT TIME_BUCKET('{interval}', minute) AS bucket, FIRST(price_first, first_ts), MAX(price_max),
+                    MIN(price_min), LAST(price_last, last_ts), SUM(size_sum), SUM(trade_count), MAX(last_ts)
+                FROM live_trades_1m
+                WHERE ticker = %s AND minute >= %s {"AND minute < %s" if end is not None else ""}
+                GROUP BY 1
+                ORDER BY 1
+            """
+        else:
+            query = f"""
+                SELECT TIME_BUCKET('{interval}', localTS) AS bucket, FIRST(price, localTS), MAX(price),
+                    MIN(price), LAST(price, localTS), SUM(size), COUNT(*), MAX(localTS)
+                FROM live_trades
+                WHERE ticker = %s AND localTS >= %s {"AND localTS < %s" if end is not None else ""}
+                GROUP BY 1
+                ORDER BY 1
+            """
+        params = [ticker, start] if end is None else [ticker, start, end]
+        return self._fetchall(query, params)
+
+    def fetch_watchlist(self, since, window_seconds):
+        """
+        Per-second buckets for many tickers in one query. ``since`` maps each
+        ticker to the bucket to re-aggregate from, or to None for a ticker
+        not loaded yet, which gets the ``window_seconds`` before its newest
+        trade. Rows are (ticker, bucket, price, trades, last_ts), with price
+        the bucket's last trade.
+        """
+        if not since:
             return []
-        finally:
-            conn.close()
+        clauses, params = [], []
+        for ticker, start in since.items():
+            if start is None:
+                clauses.append("(ticker = %s AND localTS >= "
+                               "(SELECT MAX(localTS) FROM live_trades WHERE ticker = %s) - INTERVAL %s SECOND)")
+                params += [ticker, ticker, window_seconds]
+            else:
+                clauses.append("(ticker = %s AND localTS >= %s)")
+                params += [ticker, start]
+        query = f"""
+            SELECT ticker, TIME_BUCKET('1s', localTS) AS bucket, LAST(price, localTS), COUNT(*), MAX(localTS)
+            FROM live_trades
+            WHERE {" OR ".join(clauses)}
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+        """
+        return self._fetchall(query, params)
 
     def fetch_aggregated_data(self, tickers):
         if not tickers:
             return []
         query = f"""
-            SELECT ticker, AVG(size) as avg_size, COUNT(*) as trade_count
-            FROM live_trades
+            SELECT ticker, SUM(size_sum) / SUM(size_count) as avg_size, SUM(trade_count) as trade_count
+            FROM live_trades_1m
             WHERE ticker IN ({",".join(["%s"] * len(tickers))})
             GROUP BY ticker
         """
-        conn = self.create_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(query, tickers)
-                rows = cur.fetchall()
-            return rows
-        except:
-            return []
-        finally:
-            conn.close()
+        return self._fetchall(query, tickers)
 
     def fetch_exchange_distribution(self, tickers):
         if not tickers:
             return []
         query = f"""
-            SELECT ticker, exchange, COUNT(*) as count_ex
-            FROM live_trades
+            SELECT ticker, exchange, SUM(trade_count) as count_ex
+            FROM live_trades_1m
             WHERE ticker IN ({",".join(["%s"] * len(tickers))})
             GROUP BY ticker, exchange
         """
-        conn = self.create_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(query, tickers)
-                rows = cur.fetchall()
-            return rows
-        except:
-            return []
-        finally:
-            conn.close()
+        return self._fetchall(query, tickers)
+
+    def fetch_trade_breakdown(self, tickers):
+        """
+        Per-ticker and per-exchange trade stats from a single scan of the
+        live_trades_1m rollup. Returns (aggregated, exchange_distribution)
+        shaped like fetch_aggregated_data and fetch_exchange_distribution.
+        """
+        if not tickers:
+            return [], []
+        query = f"""
+            SELECT ticker, exchange, SUM(trade_count) as count_ex, SUM(size_sum) as size_sum,
+            SUM(size_count) as size_count
+            FROM live_trades_1m
+            WHERE ticker IN ({",".join(["%s"] * len(tickers))})
+            GROUP BY ticker, exchange
+        """
+        rows = self._fetchall(query, tickers)
+        totals = {}
+        for ticker, _, count_ex, size_sum, size_count in rows:
+            trade_count, sizes, sized = totals.get(ticker, (0, 0, 0))
+            totals[ticker] = (trade_count + count_ex, sizes + (size_sum or 0), sized + size_count)
+        aggregated = [(ticker, sizes / sized if sized else None, trade_count)
+                      for ticker, (trade_count, sizes, sized) in totals.items()]
+        exchange_distribution = [(ticker, exchange, count_ex) for ticker, exchange, count_ex, _, _ in rows]
+        return aggregated, exchange_distribution
+
+    def run_concurrently(self, queries, label="queries"):
+        """
+        Run ``{name: (method, args)}`` on the query executor and return
+        ``{name: result}``. Callback latency becomes roughly that of the
+        slowest query, and each query's time is logged.
+        """
+        def timed(method, args):
+            start = time.monotonic()
+            result = method(*args)
+            return result, time.monotonic() - start
+
+        start = time.monotonic()
+        futures = {name: self.executor.submit(timed, method, args) for name, (method, args) in queries.items()}
+        results, timings = {}, {}
+        for name, future in futures.items():
+            results[name], timings[name] = future.result()
+        elapsed = time.monotonic() - start
+        logger.info(f"Ran {label} in {elapsed * 1000:.0f} ms: "
+                    + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+        return results
 
     def fetch_latest_events(self, tickers, limit=20):
         if not tickers:
@@ -98,13 +302,45 @@ class SingleStoreDBHandler:
             ORDER BY event_date DESC
             LIMIT {limit}
         """
-        conn = self.create_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(query, tickers)
-                rows = cur.fetchall()
-            return rows
-        except:
+        return self._fetchall(query, tickers)
+
+    def fetch_latest_news(self, tickers, limit=20):
+        """
+        Latest articles mentioning any of the given tickers, newest first.
+        Resolved through the news_tickers index, so each ticker is a seek
+        rather than a JSON search over every article.
+        """
+        if not tickers:
             return []
-        finally:
-            conn.close()
+        query = f"""
+            SELECT n.id, latest.published_utc, n.title, n.author, n.article_url, n.tickers
+            FROM (
+                SELECT news_id, MAX(published_utc) AS published_utc
+                FROM news_tickers
+                WHERE ticker IN ({",".join(["%s"] * len(tickers))})
+                GROUP BY news_id
+                ORDER BY published_utc DESC
+                LIMIT {int(limit)}
+            ) latest
+            JOIN ticker_news n ON n.id = latest.news_id
+            ORDER BY latest.published_utc DESC
+        """
+        return self._fetchall(query, tickers)
+
+
+_shared_handler = None
+_shared_handler_lock = threading.Lock()
+
+def get_db_handler():
+    """
+    The process-wide handler, so every page draws from one connection pool
+    and one query cache.
+    """
+    global _shared_handler
+    with _shared_handler_lock:
+        if _shared_handler is None:
+            _shared_handler = CachedDBHandler(
+                SingleStoreDBHandler(Config.SINGLESTORE_DB_URL),
+                QueryCache(Config.QUERY_CACHE_SIZE, Config.QUERY_CACHE_TTLS),
+            )
+        return _shared_handler
@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection frees up within the acquire timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections shared by every Dash callback.
+
+    At most ``max_size`` connections exist at once; callers beyond that
+    wait up to ``timeout`` seconds and then get a ``PoolTimeout``. Idle
+    connections are reused most-recently-used first, so a quiet period
+    lets the older ones go stale instead of keeping all of them warm.
+    Every idle connection is health-checked with ``is_connected()``
+    before it is handed out. A connection whose query raised is closed
+    rather than returned.
+    """
+
+    def __init__(self, connect, max_size=8, timeout=5.0):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self._init_state()
+
+    def _init_state(self):
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1000)
+        self._in_use = 0
+        self._acquired = 0
+        self._created = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            return conn.is_connected()
+        except Exception:
+            return False
+
+    def _close(self, conn):
+        with self._lock:
+            self._discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            logger.warning(f"Timed out after {self.timeout}s waiting for a database connection")
+            raise PoolTimeout(f"No database connection available within {self.timeout}s")
+        waited = time.monotonic() - start
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self.connect()
+                    with self._lock:
+                        self._created += 1
+                    break
+                if not self._healthy(conn):
+                    self._close(conn)
+                    conn = None
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._waits.append(waited)
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._lock:
+            self._in_use -= 1
+        if discard:
+            self._close(conn)
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+
+    def close(self):
+        """Close every idle connection; checked-out ones close on release."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'max_size': self.max_size,
+                'idle': self._idle.qsize(),
+                'in_use': self._in_use,
+                'acquired': self._acquired,
+                'created': self._created,
+                'discarded': self._discarded,
+                'timeouts': self._timeouts,
+                'wait_seconds_total': self._wait_total,
+                'wait_seconds_max': self._wait_max,
+                'wait_seconds_p95': waits[int(0.95 * (len(waits) - 1))] if waits else None,
+            }
@@ -0,0 +1,279 @@
+import csv
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import singlestoredb as s2
+from flask import abort, send_file
+from frontend_app.config import Config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Columns and Parquet types of each exportable source.
+EXPORT_SOURCES = {
+    'trades': {
+        'table': 'live_trades',
+        'time_column': 'localTS',
+        'columns': ['localTS', 'ticker', 'id', 'exchange', 'price', 'size'],
+        'types': ['timestamp', 'string', 'string', 'int64', 'float64', 'float64'],
+        # The rollup gives a cheap row-count estimate for progress.
+        'estimate': "SELECT SUM(trade_count) FROM live_trades_1m WHERE {where}",
+        'estimate_time_column': 'minute',
+    },
+    'rollup_1m': {
+        'table': 'live_trades_1m',
+        'time_column': 'minute',
+        'columns': ['minute', 'ticker', 'exchange', 'trade_count', 'size_sum', 'size_count', 'notional',
+                    'price_min', 'price_max', 'price_first', 'price_last'],
+        'types': ['timestamp', 'string', 'int64', 'int64', 'float64', 'int64', 'float64',
+                  'float64', 'float64', 'float64', 'float64'],
+        'estimate': "SELECT COUNT(*) FROM live_trades_1m WHERE {where}",
+        'estimate_time_column': 'minute',
+    },
+}
+
+
+# Export data and state files; the retention sweep only ever deletes these.
+_EXPORT_FILE = re.compile(r'[0-9a-f]{32}\.(json|csv\.gz|parquet)(\.tmp)?')
+_NAME_TICKERS = 3
+
+
+def parquet_available():
+    return pq is not None
+
+
+def download_name(source, tickers, extension, stamp):
+    """A readable file name for the browser; files on disk are named by job id."""
+    names = [name for name in (re.sub(r'[^A-Za-z0-9.-]', '', t).strip('.')[:16] for t in tickers) if name]
+    label = '_'.join(names[:_NAME_TICKERS]) or 'export'
+    if len(tickers) > _NAME_TICKERS:
+        label += f"_and_{len(tickers) - _NAME_TICKERS}_more"
+    return f"{source}_{label}_{stamp}.{extension}"
+
+
+def _where(tickers, time_column, start, end):
+    clauses = [f"ticker IN ({','.join(['%s'] * len(tickers))})"]
+    params = list(tickers)
+    if start:
+        clauses.append(f"{time_column} >= %s")
+        params.append(start)
+    if end:
+        clauses.append(f"{time_column} <= %s")
+        params.append(end)
+    return " AND ".join(clauses), params
+
+
+class ExportJob:
+    def __init__(self, source, tickers, start, end, fmt, export_dir):
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.tickers = tickers
+        self.start = start
+        self.end = end
+        self.fmt = fmt
+        extension = 'parquet' if fmt == 'parquet' else 'csv.gz'
+        self.path = os.path.join(export_dir, f"{self.id}.{extension}")
+        self.filename = download_name(source, tickers, extension, time.strftime('%Y%m%d_%H%M%S'))
+        self.status = 'queued'
+        self.rows = 0
+        self.estimated_rows = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @classmethod
+    def from_state(cls, state):
+        job = cls.__new__(cls)
+        job.filename = os.path.basename(state['path'])  # state saved before download names existed
+        job.__dict__.update(state)
+        return job
+
+    def progress(self):
+        if self.status == 'done':
+            return 1.0
+        if not self.estimated_rows:
+            return None
+        return min(self.rows / self.estimated_rows, 0.99)
+
+
+class ExportManager:
+    """
+    Streams raw trades or the minute rollup for a ticker and time range to a
+    gzip'd CSV or a Parquet file.
+
+    Jobs run on their own worker thread with a dedicated unbuffered
+    connection. They never hold a pooled connection, so exports cannot
+    starve the interactive callbacks. Rows come off the server-side cursor
+    ``chunk_rows`` at a time, in storage order (there is no ORDER BY, which
+    would make the server sort the whole result first), and are written as
+    they arrive. So memory stays bounded by one chunk whatever the export
+    size. ``job.rows`` counts progress against an estimate taken from the
+    rollup.
+
+    Exports are stored as ``<job id>.csv.gz`` or ``<job id>.parquet``, and
+    the job state next to them as ``<job id>.json``, so any worker process
+    can report progress and serve the download. Each submit sweeps out
+    export files older than ``retention_seconds``.
+    """
+
+    def __init__(self, db_url, export_dir, chunk_rows, workers=1, retention_seconds=86400):
+        self.db_url = db_url
+        self.export_dir = export_dir
+        self.chunk_rows = chunk_rows
+        self.retention_seconds = retention_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, source, tickers, start=None, end=None, fmt='csv'):
+        if source not in EXPORT_SOURCES:
+            raise ValueError(f"Unknown export source: {source}")
+        if fmt == 'parquet' and not parquet_available():
+            raise ValueError("Parquet export needs pyarrow installed")
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.sweep()
+        job = ExportJob(source, tickers, start, end, fmt, self.export_dir)
+        with self.lock:
+            self.jobs[job.id] = job
+        self._save(job)
+        self.executor.submit(self._run, job)
+        logger.info(f"Queued export {job.id}: {source} for {tickers} ({start} to {end}) as {fmt}")
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None and re.fullmatch(r'[0-9a-f]{32}', job_id or ''):
+            # Submitted by another worker process.
+            try:
+                with open(os.path.join(self.export_dir, f"{job_id}.json")) as f:
+                    job = ExportJob.from_state(json.load(f))
+            except (OSError, ValueError):
+                return None
+        return job
+
+    def sweep(self):
+        """Delete export and job state files not written to for ``retention_seconds``."""
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        for name in os.listdir(self.export_dir):
+            if not _EXPORT_FILE.fullmatch(name):
+                continue
+            path = os.path.join(self.export_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue  # another worker removed it first
+        with self.lock:
+            for job_id in [i for i, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+                del self.jobs[job_id]
+        if removed:
+            logger.info(f"Removed {removed} expired export files from {self.export_dir}")
+        return removed
+
+    def _save(self, job):
+        path = os.path.join(self.export_dir, f"{job.id}.json")
+        with open(path + '.tmp', 'w') as f:
+            json.dump(vars(job), f, default=str)
+        os.replace(path + '.tmp', path)
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = time.time()
+        self._save(job)
+        source = EXPORT_SOURCES[job.source]
+        conn = None
+        try:
+            conn = s2.connect(self.db_url, buffered=False)
+            where, params = _where(job.tickers, source['estimate_time_column'], job.start, job.end)
+            with conn.cursor() as cur:
+                cur.execute(source['estimate'].format(where=where), params)
+                row = cur.fetchone()
+                job.estimated_rows = int(row[0]) if row and row[0] is not None else None
+
+            where, params = _where(job.tickers, source['time_column'], job.start, job.end)
+            query = f"SELECT {', '.join(source['columns'])} FROM {source['table']} WHERE {where}"
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                if job.fmt == 'parquet':
+                    self._write_parquet(job, source, cur)
+                else:
+                    self._write_csv(job, source, cur)
+            job.status = 'done'
+            logger.info(f"Export {job.id} wrote {job.rows} rows to {job.path} "
+                        f"in {time.time() - job.started_at:.1f}s")
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            logger.error(f"Exception while exporting {job.id}: {e}")
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            if conn is not None:
+                conn.close()
+
+    def _chunks(self, cur):
+        while True:
+            rows = cur.fetchmany(self.chunk_rows)
+            if not rows:
+                return
+            yield rows
+
+    def _write_csv(self, job, source, cur):
+        with gzip.open(job.path, 'wt', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(source['columns'])
+            for rows in self._chunks(cur):
+                writer.writerows(rows)
+                job.rows += len(rows)
+                self._save(job)
+
+    def _write_parquet(self, job, source, cur):
+        types = {'timestamp': pa.timestamp('us'), 'string': pa.string(), 'int64': pa.int64(), 'float64': pa.float64()}
+        schema = pa.schema([(name, types[kind]) for name, kind in zip(source['columns'], source['types'])])
+        with pq.ParquetWriter(job.path, schema, compression='zstd') as writer:
+            for rows in self._chunks(cur):
+                columns = list(zip(*rows))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+                job.rows += len(rows)
+                self._save(job)
+
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_export_manager():
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = ExportManager(Config.SINGLESTORE_DB_URL, Config.EXPORT_DIR,
+                                            Config.EXPORT_CHUNK_ROWS, Config.EXPORT_WORKERS,
+                                            Config.EXPORT_RETENTION_SECONDS)
+        return _shared_manager
+
+
+def register_routes(server, manager):
+    """Serve finished exports from disk, so large files never pass through a callback."""
+
+    @server.route('/exports/<job_id>')
+    def download_export(job_id):
+        job = manager.get(job_id)
+        if job is None or job.status != 'done':
+            abort(404)
+        return send_file(job.path, as_attachment=True, download_name=job.filename)
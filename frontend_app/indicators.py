@@ -0,0 +1,177 @@
+import math
+from collections import deque
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class Indicators(NamedTuple):
+    rsi: float
+    ema: float
+    vwap: float
+    bollinger_upper: float
+    bollinger_lower: float
+    volatility: float
+
+
+def _ewm_step(weighted, value, alpha):
+    """
+    One step of ``Series.ewm(alpha=alpha, adjust=False).mean()``, with the
+    same operations pandas performs, so streamed values equal recomputed ones
+    bit for bit.
+    """
+    if weighted != value:
+        old_wt = 1.0 - alpha
+        weighted = (old_wt * weighted + alpha * value) / (old_wt + alpha)
+    return weighted
+
+
+def _rsi(gain, loss):
+    if loss == 0:
+        # x/0 the way numpy divides: +-inf, or NaN for 0/0.
+        rs = math.copysign(math.inf, loss) if gain > 0 else math.nan
+    else:
+        rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+class _RollingStd:
+    """Sample standard deviation over the last ``window`` values."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def seed(self, values):
+        self.values.clear()
+        self.values.extend(float(v) for v in values[-self.window:])
+        self.total = sum(self.values)
+        self.total_sq = sum(v * v for v in self.values)
+
+    def push(self, value):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    def mean(self):
+        return self.total / len(self.values) if len(self.values) == self.window else math.nan
+
+    def std(self):
+        n = len(self.values)
+        if n < self.window or n < 2:
+            return math.nan
+        return math.sqrt(max(self.total_sq - self.total * self.total / n, 0.0) / (n - 1))
+
+
+def _rolling(values, window):
+    """Vectorized rolling mean and sample std, NaN until the window fills."""
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) >= window and window >= 2:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        mean[window - 1:] = windows.mean(axis=1)
+        std[window - 1:] = windows.std(axis=1, ddof=1)
+    return mean, std
+
+
+class IndicatorState:
+    """
+    Streaming indicators for one ticker.
+
+    ``seed`` computes the whole history in one vectorized pass and keeps
+    only the running state; ``update`` then folds in one trade in O(1).
+    RSI and EMA follow pandas' ``ewm(adjust=False)`` recurrence exactly, so
+    the RSI series equals ``compute_rsi`` over the same prices. VWAP is
+    cumulative since the seed; trades without a size are left out of it,
+    as ``Series.sum`` skips them. Bollinger bands and volatility (sample std
+    of log returns) use a rolling ``window``.
+    """
+
+    def __init__(self, rsi_period=14, ema_span=20, window=20, num_std=2.0):
+        self.rsi_alpha = 1 / rsi_period
+        self.ema_alpha = 2 / (ema_span + 1)
+        self.window = window
+        self.num_std = num_std
+        self.reset()
+
+    def reset(self):
+        self.last_price = None
+        self.avg_gain = None
+        self.avg_loss = None
+        self.ema = None
+        self.notional = 0.0
+        self.volume = 0.0
+        self.prices = _RollingStd(self.window)
+        self.returns = _RollingStd(self.window)
+
+    def seed(self, prices, sizes) -> List[Indicators]:
+        self.reset()
+        if len(prices) == 0:
+            return []
+        prices = np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)  # None becomes NaN
+        sizes = np.where(np.isnan(sizes), 0.0, sizes)
+
+        delta = pd.Series(prices).diff()
+        gain = delta.where(delta > 0, 0).ewm(alpha=self.rsi_alpha, adjust=False).mean()
+        loss = (-delta.where(delta < 0, 0)).ewm(alpha=self.rsi_alpha, adjust=False).mean()
+        rsi = (100 - (100 / (1 + gain / loss))).to_numpy()
+        ema = pd.Series(prices).ewm(alpha=self.ema_alpha, adjust=False).mean().to_numpy()
+
+        notional = np.cumsum(prices * sizes)
+        volume = np.cumsum(sizes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = notional / volume
+            log_returns = np.log(prices[1:] / prices[:-1])
+        mean, std = _rolling(prices, self.window)
+        volatility = np.full(len(prices), np.nan)
+        volatility[1:] = _rolling(log_returns, self.window)[1]
+
+        self.last_price = float(prices[-1])
+        self.avg_gain = float(gain.iloc[-1])
+        self.avg_loss = float(loss.iloc[-1])
+        self.ema = float(ema[-1])
+        self.notional = float(notional[-1])
+        self.volume = float(volume[-1])
+        self.prices.seed(prices)
+        self.returns.seed(log_returns)
+
+        return [Indicators(*row) for row in zip(
+            rsi.tolist(), ema.tolist(), vwap.tolist(),
+            (mean + self.num_std * std).tolist(), (mean - self.num_std * std).tolist(), volatility.tolist(),
+        )]
+
+    def update(self, price, size) -> Indicators:
+        if self.last_price is None:
+            return self.seed([price], [size])[0]
+        price = float(price)
+        delta = price - self.last_price
+        self.avg_gain = _ewm_step(self.avg_gain, delta if delta > 0 else 0.0, self.rsi_alpha)
+        self.avg_loss = _ewm_step(self.avg_loss, -(delta if delta < 0 else 0.0), self.rsi_alpha)
+        self.ema = _ewm_step(self.ema, price, self.ema_alpha)
+        size = math.nan if size is None else float(size)
+        if not math.isnan(size):
+            self.notional += price * size
+            self.volume += size
+        if self.last_price > 0 and price > 0:
+            self.returns.push(math.log(price / self.last_price))
+        self.last_price = price
+        self.prices.push(price)
+
+        mean = self.prices.mean()
+        std = self.prices.std()
+        return Indicators(
+            _rsi(self.avg_gain, self.avg_loss),
+            self.ema,
+            self.notional / self.volume if self.volume else math.nan,
+            mean + self.num_std * std,
+            mean - self.num_std * std,
+            self.returns.std(),
+        )
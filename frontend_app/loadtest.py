@@ -0,0 +1,421 @@
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from frontend_app.config import Config
+from frontend_app.db_handler import SingleStoreDBHandler, get_db_handler
+from frontend_app.query_cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP = re.compile(r'^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(\.\d+)?$')
+BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+SCHEMA = [
+    "CREATE TABLE live_trades (localTS TEXT, ticker TEXT, id TEXT, exchange INTEGER, price REAL, size REAL)",
+    "CREATE INDEX live_trades_ticker_ts ON live_trades (ticker, localTS)",
+    """CREATE TABLE live_trades_1m (minute TEXT, ticker TEXT, exchange INTEGER, trade_count INTEGER,
+        size_sum REAL, size_count INTEGER, notional REAL, price_min REAL, price_max REAL,
+        price_first REAL, price_last REAL, first_ts TEXT, last_ts TEXT)""",
+    "CREATE INDEX live_trades_1m_ticker ON live_trades_1m (ticker, minute)",
+    "CREATE TABLE ticker_events (ticker TEXT, event_date TEXT, event_type TEXT, name TEXT)",
+]
+
+BUILD_ROLLUP = """
+INSERT INTO live_trades_1m
+SELECT TIME_BUCKET('1m', localTS), ticker, exchange, COUNT(*), SUM(size), COUNT(size), SUM(price * size),
+    MIN(price), MAX(price), FIRST(price, localTS), LAST(price, localTS), MIN(localTS), MAX(localTS)
+FROM live_trades
+GROUP BY 1, 2, 3
+"""
+
+
+def _format_ts(value):
+    return value.isoformat(sep=' ', timespec='microseconds')
+
+
+def _time_bucket(width, value):
+    seconds = int(width[:-1]) * BUCKET_UNITS[width[-1]]
+    ts = datetime.fromisoformat(value)
+    return _format_ts(datetime.fromtimestamp(ts.timestamp() // seconds * seconds))
+
+
+class _Last:
+    """``LAST(value, ts)``: the value with the latest ts in the group."""
+
+    def __init__(self):
+        self.value = None
+        self.ts = None
+
+    def step(self, value, ts):
+        if self.ts is None or ts >= self.ts:
+            self.value, self.ts = value, ts
+
+    def finalize(self):
+        return self.value
+
+
+class _First(_Last):
+    def step(self, value, ts):
+        if self.ts is None or ts < self.ts:
+            self.value, self.ts = value, ts
+
+
+def connect_sqlite(path):
+    """A SQLite connection that understands the SingleStore functions the dashboard queries use."""
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.create_function('TIME_BUCKET', 2, _time_bucket, deterministic=True)
+    conn.create_aggregate('FIRST', 2, _First)
+    conn.create_aggregate('LAST', 2, _Last)
+    return conn
+
+
+class SQLiteCursor:
+    def __init__(self, db, cursor):
+        self.db = db
+        self.cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cursor.close()
+
+    def execute(self, query, params=None):
+        params = [_format_ts(p) if isinstance(p, datetime) else p for p in params or []]
+        with self.db.lock:
+            self.db.queries += 1
+        self.cursor.execute(query.replace('%s', '?'), params)
+
+    def fetchall(self):
+        # Timestamps come back as text; hand them over as datetimes like the real driver.
+        return [tuple(datetime.fromisoformat(v) if isinstance(v, str) and TIMESTAMP.match(v) else v for v in row)
+                for row in self.cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+
+class SQLiteConnection:
+    def __init__(self, db):
+        self.db = db
+        self.conn = connect_sqlite(db.path)
+
+    def cursor(self):
+        return SQLiteCursor(self.db, self.conn.cursor())
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class LocalDBHandler(SingleStoreDBHandler):
+    """
+    Local stand-in for SingleStore. The real fetch_* methods build and run
+    their SQL unchanged against a SQLite file; only the connection is
+    swapped, and every query is counted.
+    """
+
+    def __init__(self, path, pool_size=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.queries = 0
+        super().__init__(db_url='', pool_size=pool_size)
+
+    def create_connection(self):
+        return SQLiteConnection(self)
+
+
+def load_synthetic_trades(path, tickers, minutes, trades_per_minute, seed=0):
+    """Fill ``path`` with ``minutes`` of random-walk trades per ticker, ending now, plus their rollup."""
+    rng = random.Random(seed)
+    conn = connect_sqlite(path)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    end = datetime.now()
+    start = end - timedelta(minutes=minutes)
+    count = minutes * trades_per_minute
+    step = (end - start) / count
+    prices = {}
+    for ticker in tickers:
+        price = rng.uniform(20, 500)
+        rows = []
+        for i in range(count):
+            price = max(price + rng.gauss(0, price * 0.0005), 0.01)
+            rows.append((_format_ts(start + step * i), ticker, f"{ticker}-{i:09d}", rng.randint(1, 20),
+                         round(price, 2), rng.randint(1, 500)))
+        conn.executemany("INSERT INTO live_trades VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO ticker_events VALUES (?, ?, ?, ?)",
+                         [(ticker, _format_ts(end - timedelta(days=d)), 'ticker_change', f"{ticker} event {d}")
+                          for d in range(30)])
+        prices[ticker] = price
+    conn.execute(BUILD_ROLLUP)
+    conn.commit()
+    conn.close()
+    return prices
+
+
+class TradeWriter:
+    """Appends live trades at a steady rate, so realtime clients see new data."""
+
+    def __init__(self, path, prices, trades_per_second):
+        self.path = path
+        self.prices = dict(prices)
+        self.trades_per_second = trades_per_second
+        self.stop_event = threading.Event()
+        self.written = 0
+
+    def run(self):
+        conn = connect_sqlite(self.path)
+        rng = random.Random(1)
+        tickers = list(self.prices)
+        while not self.stop_event.wait(0.1):
+            rows = []
+            for _ in range(max(1, int(self.trades_per_second / 10))):
+                ticker = rng.choice(tickers)
+                self.prices[ticker] = max(self.prices[ticker] + rng.gauss(0, self.prices[ticker] * 0.0005), 0.01)
+                self.written += 1
+                rows.append((_format_ts(datetime.now()), ticker, f"{ticker}-live-{self.written:09d}",
+                             rng.randint(1, 20), round(self.prices[ticker], 2), rng.randint(1, 500)))
+            conn.executemany("INSERT INTO live_trades VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+        conn.close()
+
+
+def _percentile(values, percentile):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(round(percentile / 100 * (len(values) - 1))), len(values) - 1)]
+
+
+class CallbackClient:
+    """Calls one Dash callback over HTTP the way a browser does and records each response."""
+
+    def __init__(self, http, dependency):
+        self.http = http
+        self.output = dependency['output']
+        self.outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1)))
+                        for part in self.output.strip('.').split('...')]
+        self.inputs = dependency['inputs']
+        self.state = dependency['state']
+
+    def call(self, values, changed):
+        body = {
+            'output': self.output,
+            'outputs': self.outputs if len(self.outputs) > 1 else self.outputs[0],
+            'inputs': [dict(i, value=values.get(f"{i['id']}.{i['property']}")) for i in self.inputs],
+            'state': [dict(s, value=values.get(f"{s['id']}.{s['property']}")) for s in self.state],
+            'changedPropIds': [changed],
+        }
+        start = time.monotonic()
+        response = self.http.post('/_dash-update-component', json=body)
+        elapsed = time.monotonic() - start
+        if response.status_code == 204:
+            return elapsed, 0, {}
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return elapsed, len(response.data), response.get_json().get('response', {})
+
+
+def _find_dependency(dependencies, output):
+    for dependency in dependencies:
+        if output in dependency['output']:
+            return dependency
+    raise LookupError(f"No callback outputs {output}")
+
+
+def simulate_client(kind, client, ticker, interval, stop_event, results, lock):
+    samples = []
+    errors = 0
+    values = {
+        'realtime-ticker-input.value': ticker,
+        'realtime-update-button.n_clicks': 0,
+        'analytics-ticker-input.value': ticker,
+        'analytics-update-button.n_clicks': 0,
+    }
+    n = 0
+    while not stop_event.is_set():
+        started = time.monotonic()
+        try:
+            if kind == 'realtime':
+                values['realtime-interval.n_intervals'] = n
+                changed = 'realtime-ticker-input.value' if n == 0 else 'realtime-interval.n_intervals'
+                elapsed, size, response = client.call(values, changed)
+                state = response.get('realtime-chart-state', {})
+                if 'data' in state:
+                    values['realtime-chart-state.data'] = state['data']
+            else:
+                values['analytics-update-button.n_clicks'] = n
+                elapsed, size, _ = client.call(values, 'analytics-update-button.n_clicks')
+            samples.append((elapsed, size))
+        except Exception as e:
+            errors += 1
+            logger.warning(f"{kind} callback failed: {e}")
+        n += 1
+        stop_event.wait(max(interval - (time.monotonic() - started), 0.0))
+    with lock:
+        results[kind]['samples'] += samples
+        results[kind]['errors'] += errors
+
+
+def summarize(samples, errors, elapsed):
+    latencies = [s[0] * 1000 for s in samples]
+    sizes = [s[1] for s in samples]
+    return {
+        'calls': len(samples),
+        'errors': errors,
+        'calls_per_second': len(samples) / elapsed,
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'max_ms': max(latencies) if latencies else None,
+        'payload_bytes_mean': sum(sizes) / len(sizes) if sizes else None,
+        'payload_bytes_total': sum(sizes),
+    }
+
+
+def run_loadtest(args):
+    tickers = [t.strip().upper() for t in args.tickers.split(',') if t.strip()]
+    db_dir = tempfile.mkdtemp(prefix='neon_loadtest_')
+    path = os.path.join(db_dir, 'trades.sqlite')
+    prices = load_synthetic_trades(path, tickers, args.minutes, args.trades_per_minute, seed=args.seed)
+
+    # The pages keep the shared handler, so swap what is behind it before any callback runs.
+    local = LocalDBHandler(path, pool_size=args.pool_size)
+    shared = get_db_handler()
+    shared.handler = local
+    shared.cache = QueryCache(Config.QUERY_CACHE_SIZE, {} if args.no_cache else Config.QUERY_CACHE_TTLS)
+    from frontend_app.app import app
+
+    writer = TradeWriter(path, prices, args.trades_per_second)
+    writer_thread = threading.Thread(target=writer.run, name='loadtest-writer', daemon=True)
+    writer_thread.start()
+
+    dependencies = app.server.test_client().get('/_dash-dependencies').get_json()
+    realtime = _find_dependency(dependencies, 'realtime-price-chart.figure')
+    analytics = _find_dependency(dependencies, 'analytics-avg-volume-chart.figure')
+    analytics_clients = int(round(args.clients * args.analytics_share))
+
+    results = {'realtime': {'samples': [], 'errors': 0}, 'analytics': {'samples': [], 'errors': 0}}
+    lock = threading.Lock()
+    stop_event = threading.Event()
+    threads = []
+    for i in range(args.clients):
+        kind = 'analytics' if i < analytics_clients else 'realtime'
+        client = CallbackClient(app.server.test_client(), analytics if kind == 'analytics' else realtime)
+        interval = (args.analytics_interval_ms if kind == 'analytics' else args.interval_ms) / 1000.0
+        threads.append(threading.Thread(
+            target=simulate_client, name=f"client-{i}",
+            args=(kind, client, tickers[i % len(tickers)], interval, stop_event, results, lock), daemon=True))
+
+    queries_before = local.queries
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop_event.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    queries = local.queries - queries_before
+    writer.stop_event.set()
+    writer_thread.join()
+
+    return {
+        'clients': args.clients,
+        'realtime_clients': args.clients - analytics_clients,
+        'analytics_clients': analytics_clients,
+        'tickers': len(tickers),
+        'duration_seconds': elapsed,
+        'query_cache': not args.no_cache,
+        'callbacks': {kind: summarize(result['samples'], result['errors'], elapsed)
+                      for kind, result in results.items()},
+        'db_queries': queries,
+        'db_queries_per_second': queries / elapsed,
+        'trades_written': writer.written,
+        'cache': shared.cache.stats(),
+        'pool': local.pool.stats(),
+    }
+
+
+def check_report(report, max_p99_ms=None, max_queries_per_second=None, baseline=None, tolerance=0.2):
+    """Return a list of regressions; empty means the gate passes."""
+    failures = []
+    for kind, stats in report['callbacks'].items():
+        if stats['errors']:
+            failures.append(f"{kind}: {stats['errors']} callback errors")
+        if max_p99_ms is not None and stats['p99_ms'] is not None and stats['p99_ms'] > max_p99_ms:
+            failures.append(f"{kind}: p99 {stats['p99_ms']:.0f} ms exceeds {max_p99_ms:.0f} ms")
+        previous = (baseline or {}).get('callbacks', {}).get(kind)
+        if previous and stats['p95_ms'] is not None and previous.get('p95_ms'):
+            if stats['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                failures.append(f"{kind}: p95 {stats['p95_ms']:.0f} ms is over {tolerance:.0%} worse "
+                                f"than the baseline {previous['p95_ms']:.0f} ms")
+    if max_queries_per_second is not None and report['db_queries_per_second'] > max_queries_per_second:
+        failures.append(f"{report['db_queries_per_second']:.1f} DB queries/s exceeds {max_queries_per_second}")
+    if baseline and baseline.get('db_queries_per_second'):
+        if report['db_queries_per_second'] > baseline['db_queries_per_second'] * (1 + tolerance):
+            failures.append(f"{report['db_queries_per_second']:.1f} DB queries/s is over {tolerance:.0%} "
+                            f"more than the baseline {baseline['db_queries_per_second']:.1f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Load-test the dashboard callbacks with simulated clients against a local SQLite stand-in.')
+    parser.add_argument('--clients', type=int, default=50, help='Simulated browsers')
+    parser.add_argument('--analytics-share', type=float, default=0.2, help='Fraction of clients on /analytics')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--interval-ms', type=float, default=Config.UPDATE_INTERVAL_MS,
+                        help='Realtime polling interval per client')
+    parser.add_argument('--analytics-interval-ms', type=float, default=5000,
+                        help='Interval between analytics updates per client')
+    parser.add_argument('--tickers', default='AAPL,MSFT,GOOGL,AMZN,TSLA')
+    parser.add_argument('--minutes', type=int, default=60, help='Minutes of synthetic history per ticker')
+    parser.add_argument('--trades-per-minute', type=int, default=120)
+    parser.add_argument('--trades-per-second', type=float, default=20, help='Live trades appended during the run')
+    parser.add_argument('--pool-size', type=int, default=Config.DB_POOL_SIZE)
+    parser.add_argument('--no-cache', action='store_true', help='Disable the query cache')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-p99-ms', type=float, default=2000, help='Fail if any callback p99 exceeds this')
+    parser.add_argument('--max-queries-per-second', type=float, help='Fail if DB queries/s exceeds this')
+    parser.add_argument('--baseline', help='Earlier report to compare p95 latency and DB queries/s against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed regression against the baseline')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    for handler in logging.getLogger().handlers:
+        # The pages log every callback at INFO.
+        handler.setLevel(logging.WARNING)
+
+    report = run_loadtest(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report['failures'] = check_report(report, args.max_p99_ms, args.max_queries_per_second, baseline, args.tolerance)
+    print(json.dumps(report, indent=2, default=str))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    sys.exit(1 if report['failures'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,42 @@
 import pandas as pd
 from dash import html, dcc, Input, Output, callback, State
+from dash.exceptions import PreventUpdate
 import plotly.express as px
-from frontend_app.db_handler import SingleStoreDBHandler
+from frontend_app.db_handler import QueryError, get_db_handler
 from frontend_app.config import Config
+from frontend_app.export import get_export_manager, parquet_available
 import dash_bootstrap_components as dbc
 import logging
 
-db_handler = SingleStoreDBHandler(Config.SINGLESTORE_DB_URL)
+db_handler = get_db_handler()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+def build_price_trend(tickers, start=None, end=None):
+    price_data = db_handler.fetch_price_trend(tickers, start, end, points=Config.PRICE_TREND_POINTS)
+    return price_trend_figure(price_data, start, end)
+
+def analytics_queries(tickers):
+    """The queries behind update_analytics, run side by side."""
+    return {
+        'trade_breakdown': (db_handler.fetch_trade_breakdown, (tickers,)),
+        'price_trend': (db_handler.fetch_price_trend, (tickers, None, None, Config.PRICE_TREND_POINTS)),
+        'latest_events': (db_handler.fetch_latest_events, (tickers, 20)),
+    }
+
+def price_trend_figure(price_data, start=None, end=None):
+    df_price = pd.DataFrame(price_data, columns=["localTS","ticker","price"]) if price_data else pd.DataFrame()
+    if df_price.empty:
+        fig_price_trend = px.line(title="No Price Data")
+    else:
+        df_price['price'] = df_price['price'].astype(float)
+        fig_price_trend = px.line(df_price, x="localTS", y="price", color="ticker", title="Price Trend", line_shape='linear')
+    fig_price_trend.update_layout(template="plotly_dark", paper_bgcolor="#1C1B1E", plot_bgcolor="#1C1B1E")
+    fig_price_trend.update_xaxes(tickformat="%H:%M")
+    if start is not None and end is not None:
+        fig_price_trend.update_xaxes(range=[start, end])
+    return fig_price_trend
+
 def layout():
     return html.Div(
         className="page-content",
@@ -83,7 +110,37 @@ def layout():
                     html.Div(id='analytics-latest-events', style={"maxHeight":"200px","overflowY":"auto"})
                 ]
             ),
-            dcc.Download(id="analytics-download-data")
+            html.Div(
+                className="chart-container",
+                style={"marginTop":"20px"},
+                children=[
+                    html.H3("Export Raw Data", style={"marginBottom":"10px","color":"#FFFFFF","fontSize":"18px"}),
+                    html.Div(
+                        className="filter-section",
+                        children=[
+                            dcc.Dropdown(
+                                id='analytics-export-source',
+                                options=[{"label":"Raw trades","value":"trades"},{"label":"1-minute rollup","value":"rollup_1m"}],
+                                value='trades', clearable=False, style={"width":"180px","color":"#000000"}
+                            ),
+                            dcc.Input(id='analytics-export-start', type='text', className='filter-input', placeholder='From (YYYY-MM-DD HH:MM)'),
+                            dcc.Input(id='analytics-export-end', type='text', className='filter-input', placeholder='To (YYYY-MM-DD HH:MM)'),
+                            dcc.Dropdown(
+                                id='analytics-export-format',
+                                options=[{"label":"CSV (gzip)","value":"csv"},{"label":"Parquet","value":"parquet","disabled":not parquet_available()}],
+                                value='csv', clearable=False, style={"width":"140px","color":"#000000"}
+                            ),
+                            html.Button("Export", id='analytics-export-button', className='download-btn', n_clicks=0)
+                        ]
+                    ),
+                    html.Div(id='analytics-export-status', style={"color":"#E0E0E0"}),
+                    dcc.Interval(id='analytics-export-interval', interval=1000, disabled=True),
+                    dcc.Store(id='analytics-export-job')
+                ]
+            ),
+            dcc.Download(id="analytics-download-data"),
+            # Tickers of the last Update, for zoom refetches of the price trend.
+            dcc.Store(id="analytics-tickers")
         ]
     )
 
@@ -93,6 +150,7 @@ def layout():
     Output('analytics-price-trend-chart', 'figure'),
     Output('analytics-latest-events', 'children'),
     Output('analytics-exchange-distribution-chart', 'figure'),
+    Output('analytics-tickers', 'data'),
     Input('analytics-update-button', 'n_clicks'),
     State('analytics-ticker-input', 'value')
 )
@@ -104,7 +162,13 @@ def update_analytics(n_clicks, ticker_value):
     tickers = [t.strip().upper() for t in ticker_value.split(",") if t.strip()]
 
     logger.info(f"Fetching analytics data for {tickers}")
-    agg_data = db_handler.fetch_aggregated_data(tickers)
+    # Independent queries run concurrently; trade stats and the exchange split share one scan.
+    try:
+        results = db_handler.run_concurrently(analytics_queries(tickers), label=f"analytics queries for {tickers}")
+    except QueryError:
+        # Keep the charts already shown rather than drawing an outage as "No Data".
+        raise PreventUpdate
+    agg_data, exchange_data = results['trade_breakdown']
     df_agg = pd.DataFrame(agg_data, columns=["ticker","avg_size","trade_count"]) if agg_data else pd.DataFrame({"ticker":[],"avg_size":[],"trade_count":[]})
 
     # Average Trade Volume Chart
@@ -126,20 +190,11 @@ def update_analytics(n_clicks, ticker_value):
     fig_most_traded.update_layout(template="plotly_dark", paper_bgcolor="#1C1B1E", plot_bgcolor="#1C1B1E")
     fig_most_traded.update_xaxes(tickformat="%H:%M")
 
-    # Price Trend: fetch full history
-    price_data = db_handler.fetch_live_trades(tickers, limit=None)
-    df_price = pd.DataFrame(price_data, columns=["localTS","ticker","price","size","exchange"]) if price_data else pd.DataFrame()
-    if df_price.empty:
-        fig_price_trend = px.line(title="No Price Data")
-    else:
-        df_price['price'] = df_price['price'].astype(float)
-        df_price.sort_values(["ticker","localTS"], inplace=True)
-        fig_price_trend = px.line(df_price, x="localTS", y="price", color="ticker", title="Price Trend", line_shape='linear')
-    fig_price_trend.update_layout(template="plotly_dark", paper_bgcolor="#1C1B1E", plot_bgcolor="#1C1B1E")
-    fig_price_trend.update_xaxes(tickformat="%H:%M")
+    # Price Trend: downsampled in SQL to the chart's resolution
+    fig_price_trend = price_trend_figure(results['price_trend'])
 
     # Latest Events
-    events_data = db_handler.fetch_latest_events(tickers, limit=20)
+    events_data = results['latest_events']
     df_events = pd.DataFrame(events_data, columns=["ticker","event_date","event_type","name"]) if events_data else pd.DataFrame()
     if df_events.empty:
         events_content = html.Div("No recent events found.", style={"color":"red"})
@@ -161,7 +216,6 @@ def update_analytics(n_clicks, ticker_value):
         )
 
     # Exchange Distribution
-    exchange_data = db_handler.fetch_exchange_distribution(tickers)
     df_exchange = pd.DataFrame(exchange_data, columns=["ticker","exchange","count_ex"]) if exchange_data else pd.DataFrame()
     if df_exchange.empty:
         fig_exchange_dist = px.bar(title="No Data")
@@ -170,7 +224,30 @@ def update_analytics(n_clicks, ticker_value):
     fig_exchange_dist.update_layout(template="plotly_dark", paper_bgcolor="#1C1B1E", plot_bgcolor="#1C1B1E")
     fig_exchange_dist.update_xaxes(tickformat="%H:%M")
 
-    return fig_avg_vol, fig_most_traded, fig_price_trend, events_content, fig_exchange_dist
+    return fig_avg_vol, fig_most_traded, fig_price_trend, events_content, fig_exchange_dist, tickers
+
+@callback(
+    Output('analytics-price-trend-chart', 'figure', allow_duplicate=True),
+    Input('analytics-price-trend-chart', 'relayoutData'),
+    State('analytics-tickers', 'data'),
+    prevent_initial_call=True
+)
+def zoom_price_trend(relayout_data, tickers):
+    """
+    Refetch the price trend for the visible range when the user zooms, so
+    the buckets get finer; double-click (autorange) goes back to the full
+    history.
+    """
+    if not relayout_data or not tickers:
+        raise PreventUpdate
+    try:
+        if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+            return build_price_trend(tickers, relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]'])
+        if relayout_data.get('xaxis.autorange'):
+            return build_price_trend(tickers)
+    except QueryError:
+        pass
+    raise PreventUpdate
 
 @callback(
     Output("analytics-download-data", "data"),
@@ -184,7 +261,54 @@ def download_analytics(n_clicks, ticker_value):
     """
     ticker_value = ticker_value.strip().upper() if ticker_value else "AAPL"
     tickers = [t.strip().upper() for t in ticker_value.split(",") if t.strip()]
-    data = db_handler.fetch_aggregated_data(tickers)
+    try:
+        data = db_handler.fetch_aggregated_data(tickers)
+    except QueryError:
+        raise PreventUpdate
     df = pd.DataFrame(data, columns=["ticker","avg_size","trade_count"]) if data else pd.DataFrame({"ticker":[],"avg_size":[],"trade_count":[]})
 
     return dcc.send_data_frame(df.to_csv, "analytics_data.csv")
+
+@callback(
+    Output('analytics-export-job', 'data'),
+    Output('analytics-export-interval', 'disabled'),
+    Output('analytics-export-status', 'children'),
+    Input('analytics-export-button', 'n_clicks'),
+    State('analytics-ticker-input', 'value'),
+    State('analytics-export-source', 'value'),
+    State('analytics-export-start', 'value'),
+    State('analytics-export-end', 'value'),
+    State('analytics-export-format', 'value'),
+    prevent_initial_call=True
+)
+def start_export(n_clicks, ticker_value, source, start, end, fmt):
+    """
+    Queue an export in the background; the export-interval callback reports
+    its progress, so this returns at once.
+    """
+    ticker_value = ticker_value.strip().upper() if ticker_value else "AAPL"
+    tickers = [t.strip().upper() for t in ticker_value.split(",") if t.strip()]
+    try:
+        job = get_export_manager().submit(source, tickers, start or None, end or None, fmt)
+    except ValueError as e:
+        return None, True, html.Div(str(e), style={"color":"red"})
+    return job.id, False, f"Export queued for {', '.join(tickers)}..."
+
+@callback(
+    Output('analytics-export-status', 'children', allow_duplicate=True),
+    Output('analytics-export-interval', 'disabled', allow_duplicate=True),
+    Input('analytics-export-interval', 'n_intervals'),
+    State('analytics-export-job', 'data'),
+    prevent_initial_call=True
+)
+def poll_export(n_intervals, job_id):
+    job = get_export_manager().get(job_id) if job_id else None
+    if job is None:
+        return "Export not found.", True
+    if job.status == 'failed':
+        return html.Div(f"Export failed: {job.error}", style={"color":"red"}), True
+    if job.status == 'done':
+        return html.A(f"Download {job.filename} ({job.rows:,} rows)", href=f"/exports/{job.id}"), True
+    progress = job.progress()
+    percent = f" ({progress:.0%})" if progress is not None else ""
+    return f"Exporting {job.source}: {job.rows:,} rows written{percent}...", False
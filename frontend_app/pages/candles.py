@@ -0,0 +1,101 @@
+from dash import html, dcc, Input, Output, callback
+from dash.exceptions import PreventUpdate
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from frontend_app.db_handler import QueryError, get_db_handler
+from frontend_app.config import Config
+from frontend_app.candles import CANDLE_INTERVALS, CandleCache
+import logging
+
+db_handler = get_db_handler()
+candle_cache = CandleCache(db_handler, Config.CANDLE_BARS, Config.CANDLE_SETTLE_SECONDS,
+                           Config.ROLLUP_LAG_SECONDS, Config.CANDLE_SERIES)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def layout():
+    return html.Div(
+        className="page-content",
+        children=[
+            html.H1("Candles", style={"color":"#FFFFFF","fontSize":"24px","marginBottom":"20px"}),
+            html.Div(
+                className="filter-section",
+                children=[
+                    html.Label("Ticker:", style={"color":"#E0E0E0"}),
+                    dcc.Input(id='candles-ticker-input', type='text', value='AAPL', className='filter-input', placeholder='e.g. AAPL'),
+                    html.Label("Interval:", style={"color":"#E0E0E0","marginLeft":"20px"}),
+                    dcc.RadioItems(
+                        id='candles-interval',
+                        options=[{"label": label, "value": label} for label in CANDLE_INTERVALS],
+                        value='1m',
+                        inline=True,
+                        inputStyle={"marginLeft":"10px","marginRight":"4px"},
+                        style={"color":"#E0E0E0"}
+                    )
+                ]
+            ),
+            html.Div(
+                className="chart-container",
+                children=[
+                    dcc.Graph(id='candles-chart', style={"height":"600px"}),
+                    dcc.Interval(id='candles-interval-timer', interval=Config.CANDLE_REFRESH_MS, n_intervals=0)
+                ]
+            )
+        ]
+    )
+
+def candle_figure(bars, ticker, interval):
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    if bars:
+        timestamps = [bar[0] for bar in bars]
+        fig.add_trace(
+            go.Candlestick(
+                x=timestamps,
+                open=[bar[1] for bar in bars],
+                high=[bar[2] for bar in bars],
+                low=[bar[3] for bar in bars],
+                close=[bar[4] for bar in bars],
+                increasing_line_color='#A980FF',
+                decreasing_line_color='#FF6B6B',
+                name='Price'
+            ),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Bar(x=timestamps, y=[bar[5] for bar in bars], marker_color='#7A45D1', name='Volume'),
+            row=2, col=1
+        )
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor="#1C1B1E",
+        plot_bgcolor="#1C1B1E",
+        title=f"{ticker} {interval}" if bars else "No Data Available",
+        margin=dict(l=20, r=20, t=50, b=20),
+        showlegend=False,
+        xaxis_rangeslider_visible=False,
+        # Keep the user's zoom across refreshes of the same chart.
+        uirevision=f"{ticker}-{interval}"
+    )
+    fig.update_yaxes(title_text="Price", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+    return fig
+
+@callback(
+    Output('candles-chart', 'figure'),
+    Input('candles-interval-timer', 'n_intervals'),
+    Input('candles-ticker-input', 'value'),
+    Input('candles-interval', 'value')
+)
+def update_candles(n_intervals, ticker_value, interval):
+    """
+    Redraw the candles. Completed bars come from the candle cache, so only
+    the bar still open is aggregated again on each refresh.
+    """
+    ticker_value = ticker_value.strip().upper() if ticker_value else "AAPL"
+    if interval not in CANDLE_INTERVALS:
+        interval = '1m'
+    try:
+        bars = candle_cache.get(ticker_value, interval)
+    except QueryError:
+        raise PreventUpdate
+    return candle_figure(bars, ticker_value, interval)
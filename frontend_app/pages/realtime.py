@@ -1,12 +1,17 @@
 import pandas as pd
 import numpy as np
-from dash import html, dcc, Input, Output, callback
-from frontend_app.db_handler import SingleStoreDBHandler
+from dash import html, dcc, Input, Output, State, callback, ctx, no_update
+from dash.exceptions import PreventUpdate
+from frontend_app.db_handler import QueryError, get_db_handler
 from frontend_app.config import Config
+from frontend_app.trade_buffer import TradeBuffers, trades_after
+from frontend_app.poller import TradePoller
 import plotly.graph_objects as go
 import logging
 
-db_handler = SingleStoreDBHandler(Config.SINGLESTORE_DB_URL)
+db_handler = get_db_handler()
+trade_buffers = TradeBuffers(db_handler, Config.REALTIME_BUFFER_SIZE, Config.REALTIME_MAX_BUFFERS)
+trade_poller = TradePoller(trade_buffers, Config.POLL_INTERVAL_MS / 1000.0, Config.WATCH_TIMEOUT_SECONDS)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -27,8 +32,9 @@ def layout():
                 className="filter-section",
                 children=[
                     html.Label("Ticker:", style={"color":"#E0E0E0"}),
-                    # Default ticker: AAPL
-                    dcc.Input(id='realtime-ticker-input', type='text', value='AAPL', className='filter-input', placeholder='e.g. AAPL'),
+                    # Default ticker: AAPL. Debounced: a half-typed ticker would load a buffer of its own.
+                    dcc.Input(id='realtime-ticker-input', type='text', value='AAPL', className='filter-input',
+                              placeholder='e.g. AAPL', debounce=True),
                     html.Button("Update", id='realtime-update-button', className='download-btn', n_clicks=0)
                 ]
             ),
@@ -40,6 +46,8 @@ def layout():
                         style={"flex":"2","marginRight":"20px"},
                         children=[
                             dcc.Graph(id='realtime-price-chart', style={"height":"400px"}),
+                            # Ticker and last trade sequence number drawn in this browser.
+                            dcc.Store(id='realtime-chart-state'),
                             dcc.Interval(
                                 id='realtime-interval',
                                 interval=Config.UPDATE_INTERVAL_MS,
@@ -63,6 +71,13 @@ def layout():
                                     html.Div("Trades (last 10s)", className="metric-title"),
                                     html.Div(id="realtime-total-trades", className="metric-value")
                                 ]
+                            ),
+                            html.Div(
+                                className="metric-card",
+                                children=[
+                                    html.Div("VWAP", className="metric-title"),
+                                    html.Div(id="realtime-vwap", className="metric-value")
+                                ]
                             )
                         ]
                     )
@@ -71,44 +86,28 @@ def layout():
         ]
     )
 
-@callback(
-    Output('realtime-price-chart', 'figure'),
-    Output('realtime-current-price', 'children'),
-    Output('realtime-total-trades', 'children'),
-    Input('realtime-interval', 'n_intervals'),
-    Input('realtime-update-button', 'n_clicks'),
-    Input('realtime-ticker-input', 'value')
-)
-def update_realtime_chart(n_intervals, n_clicks, ticker_value):
-    ticker_value = ticker_value.strip().upper() if ticker_value else "AAPL"
-    logger.info(f"Fetching real-time trades for {ticker_value}")
+def trades_in_last_10s(trades):
+    window_start = trades[-1].localTS - pd.Timedelta(seconds=10)
+    count = 0
+    for trade in reversed(trades):
+        if trade.localTS < window_start:
+            break
+        count += 1
+    return count
 
-    # Fetch up to 300 trades
-    data = db_handler.fetch_live_trades([ticker_value], limit=300)
-    if not data:
+def build_figure(trades):
+    fig = go.Figure()
+    if not trades:
         # No data at all
-        fig = go.Figure()
         fig.update_layout(template="plotly_dark", paper_bgcolor="#1C1B1E", plot_bgcolor="#1C1B1E", title="No Data Available")
-        return fig, "N/A", "0"
-
-    df = pd.DataFrame(data, columns=["localTS","ticker","price","size","exchange"])
-    df['localTS'] = pd.to_datetime(df['localTS'])
-    df.sort_values(by="localTS", inplace=True)
-    df['price'] = df['price'].astype(float)
-    df['RSI'] = compute_rsi(df['price'])
-
-    latest_price = df['price'].iloc[-1]
-    latest_time = df["localTS"].max()
-    window_start = latest_time - pd.Timedelta(seconds=10)
-    recent_trades = df[df["localTS"] >= window_start]
-    total_trades_10s = len(recent_trades)
+        return fig
 
-    # Plot all available data as a line chart.
-    fig = go.Figure()
+    # Plot all buffered data as a line chart.
+    timestamps = [t.localTS for t in trades]
     fig.add_trace(
         go.Scatter(
-            x=df["localTS"],
-            y=df["price"],
+            x=timestamps,
+            y=[t.price for t in trades],
             mode='lines',
             line=dict(color='#A980FF', width=2, shape='linear'),
             name='Price'
@@ -116,8 +115,8 @@ def update_realtime_chart(n_intervals, n_clicks, ticker_value):
     )
     fig.add_trace(
         go.Scatter(
-            x=df["localTS"],
-            y=df["RSI"],
+            x=timestamps,
+            y=[t.indicators.rsi for t in trades],
             mode='lines',
             line=dict(color='#7A45D1', width=2, dash='dot', shape='linear'),
             name='RSI',
@@ -135,5 +134,61 @@ def update_realtime_chart(n_intervals, n_clicks, ticker_value):
         yaxis2=dict(title='RSI', overlaying='y', side='right', showgrid=False),
         transition=dict(duration=500)
     )
+    return fig
 
-    return fig, f"{latest_price:.2f}", str(total_trades_10s)
+@callback(
+    Output('realtime-price-chart', 'figure'),
+    Output('realtime-price-chart', 'extendData'),
+    Output('realtime-chart-state', 'data'),
+    Output('realtime-current-price', 'children'),
+    Output('realtime-total-trades', 'children'),
+    Output('realtime-vwap', 'children'),
+    Input('realtime-interval', 'n_intervals'),
+    Input('realtime-update-button', 'n_clicks'),
+    Input('realtime-ticker-input', 'value'),
+    State('realtime-chart-state', 'data')
+)
+def update_realtime_chart(n_intervals, n_clicks, ticker_value, chart_state):
+    """
+    Draw the full chart when the ticker changes or the browser fell behind
+    the server-side buffer; otherwise send only the trades it has not seen
+    as ``extendData``. The buffer is kept fresh by the shared poller, so
+    this callback does not query the database once a ticker is loaded.
+    """
+    ticker_value = ticker_value.strip().upper() if ticker_value else "AAPL"
+    buffer = trade_poller.watch(ticker_value)
+    if not buffer.loaded:
+        # First viewer of this ticker: load the tail now rather than on the next poll.
+        try:
+            buffer.refresh(db_handler)
+        except QueryError:
+            # The poller keeps retrying; draw once the tail has loaded.
+            raise PreventUpdate
+    trades = buffer.snapshot()
+
+    delta = None
+    if ctx.triggered_id == 'realtime-interval' and chart_state and chart_state.get('ticker') == ticker_value:
+        delta = trades_after(trades, chart_state['seq'])
+        if delta == []:
+            return no_update, no_update, no_update, no_update, no_update, no_update
+
+    if not trades:
+        return build_figure([]), no_update, None, "N/A", "0", "N/A"
+
+    # Indicator values were computed incrementally as each trade arrived.
+    state = {'ticker': ticker_value, 'seq': trades[-1].seq}
+    latest_price = f"{trades[-1].price:.2f}"
+    total_trades_10s = str(trades_in_last_10s(trades))
+    vwap = f"{trades[-1].indicators.vwap:.2f}"
+
+    if delta is None:
+        logger.info(f"Drawing {len(trades)} buffered trades for {ticker_value}")
+        return build_figure(trades), no_update, state, latest_price, total_trades_10s, vwap
+
+    timestamps = [t.localTS for t in delta]
+    extend = (
+        dict(x=[timestamps, timestamps], y=[[t.price for t in delta], [t.indicators.rsi for t in delta]]),
+        [0, 1],
+        buffer.capacity,
+    )
+    return no_update, extend, state, latest_price, total_trades_10s, vwap
@@ -0,0 +1,102 @@
+from dash import html, dcc, Input, Output, State, callback, ctx, no_update, Patch
+from dash.exceptions import PreventUpdate
+import plotly.graph_objects as go
+from frontend_app.db_handler import QueryError, get_db_handler
+from frontend_app.config import Config
+from frontend_app.watchlist import WatchlistStore
+import logging
+
+db_handler = get_db_handler()
+watchlist_store = WatchlistStore(db_handler, Config.WATCHLIST_WINDOW_SECONDS,
+                                 Config.WATCHLIST_REFRESH_MS / 1000.0, Config.WATCH_TIMEOUT_SECONDS)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def layout():
+    return html.Div(
+        className="page-content",
+        children=[
+            html.H1("Watchlist", style={"color":"#FFFFFF","fontSize":"24px","marginBottom":"20px"}),
+            html.Div(
+                className="filter-section",
+                children=[
+                    html.Label("Tickers:", style={"color":"#E0E0E0"}),
+                    dcc.Input(id='watchlist-ticker-input', type='text', value=Config.WATCHLIST_TICKERS,
+                              className='filter-input', placeholder='e.g. AAPL, MSFT', style={"width":"400px"}),
+                    html.Button("Update", id='watchlist-update-button', className='download-btn', n_clicks=0)
+                ]
+            ),
+            html.Table(
+                className="data-table",
+                children=[
+                    html.Thead(html.Tr([html.Th("Ticker"), html.Th("Last"), html.Th("Change"),
+                                        html.Th("Trades (10s)"), html.Th("Trend")])),
+                    html.Tbody(id='watchlist-rows')
+                ]
+            ),
+            # Tickers shown in this browser and the row version each was drawn from.
+            dcc.Store(id='watchlist-state'),
+            dcc.Interval(id='watchlist-interval', interval=Config.WATCHLIST_REFRESH_MS, n_intervals=0)
+        ]
+    )
+
+def sparkline(points):
+    # No template and no x values (the axes are hidden) keep each row's payload to about 2 KB.
+    fig = go.Figure(go.Scatter(
+        y=[p[1] for p in points], mode='lines',
+        line=dict(color='#A980FF', width=1.5), hoverinfo='skip'
+    ))
+    fig.update_layout(
+        template="none", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=0, r=0, t=0, b=0), showlegend=False,
+        xaxis=dict(visible=False), yaxis=dict(visible=False)
+    )
+    return dcc.Graph(figure=fig, config={"displayModeBar": False, "staticPlot": True},
+                     style={"height":"32px","width":"160px"})
+
+def watch_row(ticker, row):
+    if row is None:
+        return html.Tr([html.Td(ticker), html.Td("N/A"), html.Td("N/A"), html.Td("0"), html.Td("")])
+    color = "#4CAF50" if row.change >= 0 else "#FF6B6B"
+    return html.Tr([
+        html.Td(ticker),
+        html.Td(f"{row.price:.2f}"),
+        html.Td(f"{row.change:+.2f} ({row.change_pct:+.2f}%)", style={"color": color}),
+        html.Td(str(row.trades_10s)),
+        html.Td(sparkline(row.sparkline))
+    ])
+
+@callback(
+    Output('watchlist-rows', 'children'),
+    Output('watchlist-state', 'data'),
+    Input('watchlist-interval', 'n_intervals'),
+    Input('watchlist-update-button', 'n_clicks'),
+    State('watchlist-ticker-input', 'value'),
+    State('watchlist-state', 'data')
+)
+def update_watchlist(n_intervals, n_clicks, ticker_value, watch_state):
+    """
+    Draw every row when the ticker list changes; otherwise patch only the
+    rows whose ticker traded since this browser last drew them. All
+    viewers share the store's single query per refresh.
+    """
+    ticker_value = ticker_value.strip().upper() if ticker_value else Config.WATCHLIST_TICKERS
+    tickers = list(dict.fromkeys(t.strip().upper() for t in ticker_value.split(",") if t.strip()))
+    try:
+        rows = watchlist_store.get(tickers)
+    except QueryError:
+        raise PreventUpdate
+    versions = {ticker: row.version if row else 0 for ticker, row in rows.items()}
+    state = {'tickers': tickers, 'versions': versions}
+
+    if ctx.triggered_id == 'watchlist-interval' and watch_state and watch_state.get('tickers') == tickers:
+        changed = [i for i, ticker in enumerate(tickers) if versions[ticker] != watch_state['versions'].get(ticker)]
+        if not changed:
+            return no_update, no_update
+        patch = Patch()
+        for i in changed:
+            patch[i] = watch_row(tickers[i], rows[tickers[i]])
+        return patch, state
+
+    logger.info(f"Drawing watchlist for {tickers}")
+    return [watch_row(ticker, rows[ticker]) for ticker in tickers], state
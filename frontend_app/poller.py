@@ -0,0 +1,65 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TradePoller:
+    """
+    One background thread that keeps the trade buffers of every watched
+    ticker fresh, so dashboard callbacks only read memory.
+
+    A callback calls ``watch(ticker)`` on every tick. Tickers nobody has
+    watched for ``watch_timeout`` seconds are dropped from the poll set,
+    and their buffers freed. So the database sees one query per watched ticker per ``interval``,
+    however many browsers have that ticker open. The thread starts on the
+    first ``watch`` in each process.
+    """
+
+    def __init__(self, trade_buffers, interval, watch_timeout):
+        self.trade_buffers = trade_buffers
+        self.interval = interval
+        self.watch_timeout = watch_timeout
+        self.watched = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.polls = 0
+        self.last_poll_seconds = 0.0
+
+    def watch(self, ticker):
+        with self.lock:
+            self.watched[ticker] = time.monotonic()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='trade-poller', daemon=True)
+                self.thread.start()
+        return self.trade_buffers.get(ticker)
+
+    def watched_tickers(self):
+        cutoff = time.monotonic() - self.watch_timeout
+        with self.lock:
+            for ticker in [t for t, seen in self.watched.items() if seen < cutoff]:
+                del self.watched[ticker]
+                self.trade_buffers.discard(ticker)
+                logger.info(f"No viewers left for {ticker}; stopped polling it.")
+            return list(self.watched)
+
+    def poll_once(self):
+        start = time.monotonic()
+        for ticker in self.watched_tickers():
+            try:
+                self.trade_buffers.refresh(ticker)
+            except Exception as e:
+                logger.error(f"Exception while polling trades for {ticker}: {e}")
+        self.polls += 1
+        self.last_poll_seconds = time.monotonic() - start
+
+    def _run(self):
+        while True:
+            self.poll_once()
+            time.sleep(max(self.interval - self.last_poll_seconds, 0.0))
+
+    def stats(self):
+        with self.lock:
+            watched = len(self.watched)
+        return {'watched': watched, 'polls': self.polls, 'last_poll_seconds': self.last_poll_seconds}
@@ -0,0 +1,233 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class _Flight:
+    """One in-progress load that concurrent callers of the same key wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedResultStore:
+    """
+    Query results shared by every worker process on one host, in a SQLite
+    file. Each process opens its own connection (per thread, reopened after
+    a fork), and WAL mode lets workers read while another writes.
+
+    ``claim`` takes a short lease on a key, so when several workers miss
+    the same key at once only one of them queries the database and the
+    others poll for its result. Any SQLite error is logged and treated as a
+    miss: the store can only save queries, never fail a callback.
+    """
+
+    def __init__(self, path, lease_seconds=5.0, poll_interval=0.02):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.local = threading.local()
+        self.puts = 0
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires REAL, value BLOB)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL)")
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.lease_seconds, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return ``(value, seconds_left)``, or None if the key is missing or expired."""
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires FROM results WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+            return (pickle.loads(row[0]), row[1] - time.time()) if row else None
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+
+    def claim(self, key):
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+            return conn.execute("INSERT OR IGNORE INTO leases VALUES (?, ?)",
+                                (key, now + self.lease_seconds)).rowcount == 1
+        except Exception as e:
+            logger.warning(f"Shared cache lease failed: {e}")
+            return True
+
+    def put(self, key, value, ttl):
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                         (key, now + ttl, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+            conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+            self.puts += 1
+            if self.puts % 100 == 0:
+                conn.execute("DELETE FROM results WHERE expires <= ?", (now,))
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+
+class QueryCache:
+    """
+    Size-bounded LRU of query results with a TTL per query type.
+
+    Concurrent misses for the same key are coalesced: the first caller runs
+    the query and the others wait for its result (single flight). So a
+    burst of identical requests costs one database query per key per TTL.
+    A TTL of 0 disables caching for that query type.
+
+    With a SharedResultStore, a local miss first looks in the store, so
+    worker processes also share results and coalesce across each other.
+    """
+
+    def __init__(self, max_entries, ttls, default_ttl=0.0, store=None):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.store = store
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def get(self, name, args, kwargs, loader):
+        ttl = self.ttls.get(name, self.default_ttl)
+        if ttl <= 0:
+            return loader()
+        key = (name, _freeze(args), _freeze(kwargs))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value, ttl = self._load(key, ttl, loader)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                if flight.error is None:
+                    self.entries[key] = (time.monotonic() + ttl, flight.value)
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+                        self.evictions += 1
+                del self.inflight[key]
+            flight.event.set()
+
+    def _load(self, key, ttl, loader):
+        """Run the query, or take its result from the shared store; returns ``(value, ttl)``."""
+        if self.store is None:
+            return loader(), ttl
+        shared_key = repr(key)
+        deadline = time.monotonic() + self.store.lease_seconds
+        while True:
+            found = self.store.get(shared_key)
+            if found is not None:
+                with self.lock:
+                    self.shared_hits += 1
+                return found
+            # Another worker holds the lease: wait for its result, up to the lease.
+            if self.store.claim(shared_key) or time.monotonic() >= deadline:
+                break
+            time.sleep(self.store.poll_interval)
+        value = loader()
+        self.store.put(shared_key, value, ttl)
+        return value, ttl
+
+    def reset_after_fork(self):
+        """
+        A forked child inherits the lock and in-flight loads as they were at
+        the fork, possibly held by threads that do not exist in the child.
+        """
+        self.lock = threading.Lock()
+        self.inflight = {}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'shared_hits': self.shared_hits,
+            }
+
+
+class CachedDBHandler:
+    """
+    Puts a QueryCache in front of a SingleStoreDBHandler. ``fetch_*`` calls
+    go through the cache, keyed by method and arguments (which determine
+    the SQL and its parameters). Everything else passes straight through.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, handler, cache):
+        self.handler = handler
+        self.cache = cache
+
+    def reset_after_fork(self):
+        self.handler.reset_after_fork()
+        self.cache.reset_after_fork()
+
+    def __getattr__(self, name):
+        attr = getattr(self.handler, name)
+        if not name.startswith('fetch_') or not callable(attr):
+            return attr
+
+        def cached(*args, **kwargs):
+            return self.cache.get(name, args, kwargs, lambda: attr(*args, **kwargs))
+        cached.__name__ = name
+        return cached
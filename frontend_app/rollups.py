@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from frontend_app.config import Config
+from frontend_app.db_handler import get_db_handler
+
+logger = logging.getLogger(__name__)
+
+CREATE_ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS live_trades_1m (
+    minute DATETIME NOT NULL,
+    ticker VARCHAR(32) NOT NULL,
+    exchange INT NOT NULL,
+    trade_count BIGINT NOT NULL,
+    size_sum DOUBLE,
+    size_count BIGINT NOT NULL,
+    notional DOUBLE,
+    price_min DOUBLE,
+    price_max DOUBLE,
+    price_first DOUBLE,
+    price_last DOUBLE,
+    first_ts DATETIME(6),
+    last_ts DATETIME(6),
+    PRIMARY KEY (ticker, exchange, minute),
+    SHARD KEY (ticker),
+    SORT KEY (minute)
+)
+"""
+
+# Whole minutes are recomputed from live_trades, so rerunning a minute is
+# idempotent and a partially filled minute is simply overwritten later.
+REFRESH_ROLLUP = """
+INSERT INTO live_trades_1m (minute, ticker, exchange, trade_count, size_sum, size_count, notional,
+    price_min, price_max, price_first, price_last, first_ts, last_ts)
+SELECT TIME_BUCKET('1m', localTS), ticker, exchange, COUNT(*), SUM(size), COUNT(size), SUM(price * size),
+    MIN(price), MAX(price), FIRST(price, localTS), LAST(price, localTS), MIN(localTS), MAX(localTS)
+FROM live_trades
+WHERE localTS >= %s
+GROUP BY 1, 2, 3
+ON DUPLICATE KEY UPDATE
+trade_count=VALUES(trade_count),
+size_sum=VALUES(size_sum),
+size_count=VALUES(size_count),
+notional=VALUES(notional),
+price_min=VALUES(price_min),
+price_max=VALUES(price_max),
+price_first=VALUES(price_first),
+price_last=VALUES(price_last),
+first_ts=VALUES(first_ts),
+last_ts=VALUES(last_ts)
+"""
+
+
+class RollupMaintainer:
+    """
+    Keeps ``live_trades_1m`` (per ticker, exchange and minute) up to date.
+
+    Each pass re-aggregates only the minutes from the newest rolled-up
+    trade, less ``lag_seconds`` for late commits, onwards. The cost of a
+    pass follows the trade rate, not the size of ``live_trades``. The
+    watermark is read back from the rollup itself, so the job keeps no
+    state of its own and an empty rollup is backfilled on the first pass.
+    """
+
+    def __init__(self, db_handler, interval, lag_seconds):
+        self.db_handler = db_handler
+        self.interval = interval
+        self.lag_seconds = lag_seconds
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def create_table(self):
+        with self.db_handler.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT CHARACTER_MAXIMUM_LENGTH FROM information_schema.columns "
+                    "WHERE table_schema = DATABASE() AND table_name = 'live_trades_1m' AND column_name = 'ticker'")
+                row = cur.fetchone()
+                if row and row[0] < 32:
+                    # ticker is the shard key, so it cannot be widened in place. The
+                    # rollup is derived data: drop it and the first pass backfills it.
+                    logger.info("Rebuilding live_trades_1m with VARCHAR(32) tickers.")
+                    cur.execute("DROP TABLE live_trades_1m")
+                cur.execute(CREATE_ROLLUP_TABLE)
+            conn.commit()
+
+    def refresh_once(self):
+        start = time.monotonic()
+        with self.db_handler.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT TIME_BUCKET('1m', MAX(last_ts) - INTERVAL %s SECOND) FROM live_trades_1m",
+                    (self.lag_seconds,))
+                watermark = cur.fetchone()[0]
+                cur.execute(REFRESH_ROLLUP, (watermark or '1970-01-01 00:00:00',))
+                rows = cur.rowcount
+            conn.commit()
+        logger.info(f"Refreshed live_trades_1m from {watermark or 'the beginning'} "
+                    f"({rows} rows touched in {time.monotonic() - start:.2f}s).")
+
+    def run(self):
+        try:
+            self.create_table()
+        except Exception as e:
+            logger.error(f"Exception while creating live_trades_1m: {e}")
+        while not self.stop_event.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error(f"Exception while refreshing live_trades_1m: {e}")
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='rollup-maintainer', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    """Run the maintainer on its own, e.g. when the dashboard runs many workers."""
+    logging.basicConfig(level=logging.INFO)
+    maintainer = RollupMaintainer(get_db_handler(), Config.ROLLUP_INTERVAL_SECONDS or 10, Config.ROLLUP_LAG_SECONDS)
+    maintainer.run()
+
+
+if __name__ == '__main__':
+    main()
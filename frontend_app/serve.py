@@ -0,0 +1,105 @@
+import fcntl
+import logging
+import time
+from frontend_app.config import Config
+from frontend_app.db_handler import get_db_handler
+from frontend_app.query_cache import SharedResultStore
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # only needed for multi-worker serving
+    BaseApplication = object
+
+logger = logging.getLogger(__name__)
+
+# Held open for the life of the worker that maintains the rollup.
+_rollup_lock = None
+
+
+def warm_up(tickers):
+    """
+    Load the default tickers' realtime buffers before the workers fork, so
+    their first refresh is a delta query. Query results are not warmed:
+    their TTLs are seconds, shorter than it takes users to arrive.
+    """
+    from frontend_app.pages import realtime
+
+    start = time.monotonic()
+    for ticker in tickers:
+        realtime.trade_buffers.refresh(ticker)
+    logger.info(f"Loaded trade buffers for {tickers} in {time.monotonic() - start:.2f}s")
+
+
+def start_rollup_maintainer(lock_path):
+    """
+    Start the rollup maintainer if this worker is the first to lock
+    ``lock_path``. The lock goes away with the worker, so the worker that
+    replaces it takes the job over. Returns whether it started.
+    """
+    global _rollup_lock
+    lock = open(lock_path, 'a')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return False
+    _rollup_lock = lock
+    from frontend_app.rollups import RollupMaintainer
+    RollupMaintainer(get_db_handler(), Config.ROLLUP_INTERVAL_SECONDS, Config.ROLLUP_LAG_SECONDS).start()
+    logger.info("This worker maintains live_trades_1m.")
+    return True
+
+
+def post_fork(server, worker):
+    get_db_handler().reset_after_fork()
+    # One rollup maintainer for the whole server, in a single worker.
+    if Config.ROLLUP_INTERVAL_SECONDS > 0:
+        start_rollup_maintainer(Config.ROLLUP_LOCK_PATH)
+
+
+class DashboardServer(BaseApplication):
+    """
+    Gunicorn serving the preloaded dashboard from ``workers`` processes of
+    ``threads`` threads each. The app is imported and its trade buffers
+    loaded once in the master, then forked; every worker gets fresh
+    connections, query threads and cache locks in ``post_fork``.
+    """
+
+    def __init__(self, wsgi_app, options):
+        self.wsgi_app = wsgi_app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.wsgi_app
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if BaseApplication is object:
+        raise SystemExit("Multi-worker serving needs gunicorn: pip install gunicorn")
+
+    # Workers share query results through one on-disk store.
+    get_db_handler().cache.store = SharedResultStore(Config.SHARED_CACHE_PATH)
+    from frontend_app.app import server
+    try:
+        warm_up(Config.WARMUP_TICKERS)
+    except Exception as e:
+        logger.error(f"Exception while loading trade buffers: {e}")
+
+    DashboardServer(server, {
+        'bind': f"{Config.SERVE_HOST}:{Config.SERVE_PORT}",
+        'workers': Config.SERVE_WORKERS,
+        'worker_class': 'gthread',
+        'threads': Config.SERVE_THREADS,
+        'preload_app': True,
+        'post_fork': post_fork,
+    }).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,25 @@
+import datetime
+import gzip
+import os
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import patch
-from frontend_app.db_handler import SingleStoreDBHandler
+from unittest.mock import patch, MagicMock
+from frontend_app.db_handler import QueryError, SingleStoreDBHandler
 from frontend_app.config import Config
+from frontend_app.db_pool import ConnectionPool, PoolTimeout
+from frontend_app.trade_buffer import TradeBuffers, TradeRingBuffer, trades_after
+from frontend_app.poller import TradePoller
+from frontend_app.indicators import IndicatorState
+from frontend_app.pages.realtime import compute_rsi
+from frontend_app.rollups import RollupMaintainer
+from frontend_app.export import ExportManager, download_name
+from frontend_app.candles import CandleCache
+from frontend_app.watchlist import WatchlistStore
+from frontend_app.loadtest import LocalDBHandler, check_report, load_synthetic_trades
+from frontend_app.query_cache import CachedDBHandler, QueryCache, SharedResultStore
+import numpy as np
 import pandas as pd
 
 class TestApp(unittest.TestCase):
@@ -18,6 +36,408 @@ class TestApp(unittest.TestCase):
         data = self.db_handler.fetch_aggregated_data(['FAKE'])
         self.assertEqual(data, [])
 
+    @patch('frontend_app.db_handler.s2.connect')
+    def test_latest_news_uses_ticker_index(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("n1", "2024-01-01 00:00:00", "Title", "Author", "url", '["AAPL"]')]
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        rows = self.db_handler.fetch_latest_news(['AAPL', 'MSFT'], limit=5)
+        self.assertEqual(rows[0][0], "n1")
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertIn("FROM news_tickers", query)
+        self.assertIn("LIMIT 5", query)
+        self.assertEqual(params, ['AAPL', 'MSFT'])
+
+    @patch('frontend_app.db_handler.s2.connect')
+    def test_pool_reuses_healthy_connections(self, mock_connect):
+        conn = mock_connect.return_value
+        conn.is_connected.return_value = True
+        conn.cursor.return_value.__enter__.return_value.fetchall.return_value = [("AAPL", 10.0, 3)]
+        self.db_handler.fetch_aggregated_data(['AAPL'])
+        self.db_handler.fetch_aggregated_data(['AAPL'])
+        self.assertEqual(mock_connect.call_count, 1)
+
+        conn.is_connected.return_value = False
+        self.db_handler.fetch_aggregated_data(['AAPL'])
+        self.assertEqual(mock_connect.call_count, 2)
+        conn.close.assert_called_once()
+        stats = self.db_handler.pool.stats()
+        self.assertEqual(stats['acquired'], 3)
+        self.assertEqual(stats['in_use'], 0)
+
+    def test_pool_acquire_timeout(self):
+        pool = ConnectionPool(MagicMock, max_size=1, timeout=0.05)
+        held = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        pool.release(held)
+        self.assertIs(pool.acquire(), held)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_trade_buffer_fetches_past_watermark(self):
+        db = MagicMock()
+        db.fetch_trade_tail.return_value = [(1, "a", 10.0, 5, 1), (2, "b", 11.0, 5, 1)]
+        db.fetch_trades_since.return_value = [(3, "c", 12.0, 5, 1)]
+        buffer = TradeRingBuffer("AAPL", capacity=3)
+        buffer.refresh(db)
+        buffer.refresh(db)
+        db.fetch_trade_tail.assert_called_once_with("AAPL", limit=3)
+        db.fetch_trades_since.assert_called_once_with("AAPL", 2, "b", limit=3)
+        trades = buffer.snapshot()
+        self.assertEqual([t.price for t in trades], [10.0, 11.0, 12.0])
+        self.assertEqual([t.id for t in trades_after(trades, 2)], ["c"])
+        self.assertEqual(trades_after(trades, 3), [])
+
+        db.fetch_trades_since.return_value = [(4, "d", 13.0, 5, 1)]
+        buffer.refresh(db)
+        db.fetch_trades_since.assert_called_with("AAPL", 3, "c", limit=3)
+        trades = buffer.snapshot()
+        self.assertEqual([t.id for t in trades], ["b", "c", "d"])
+        # Trade 1 was evicted, so a client that only drew it must redraw.
+        self.assertIsNone(trades_after(trades, 0))
+        self.assertEqual([t.id for t in trades_after(trades, 1)], ["b", "c", "d"])
+
+        db.fetch_trades_since.return_value = []
+        self.assertEqual(buffer.refresh(db), 0)
+        db.fetch_trades_since.assert_called_with("AAPL", 4, "d", limit=3)
+
+    def test_trade_buffer_does_not_reseed_on_a_busy_second(self):
+        trades = [(7, f"{i:04d}", 10.0 + i, 5, 1) for i in range(10)]
+        db = MagicMock()
+        db.fetch_trade_tail.return_value = trades[-3:]
+        buffer = TradeRingBuffer("AAPL", capacity=3)
+        buffer.refresh(db)
+
+        # Every trade shares second 7; only the one past the cursor comes back.
+        db.fetch_trades_since.side_effect = lambda ticker, ts, trade_id, limit: [
+            row for row in trades + [(7, "0010", 20.0, 5, 1)] if (row[0], row[1]) > (ts, trade_id)][:limit]
+        self.assertEqual(buffer.refresh(db), 1)
+        self.assertEqual(buffer.refresh(db), 0)
+        db.fetch_trade_tail.assert_called_once()
+        self.assertEqual([t.id for t in trades_after(buffer.snapshot(), 3)], ["0010"])
+
+    def test_trade_buffers_are_bounded_and_freed_when_unwatched(self):
+        buffers = TradeBuffers(MagicMock(), capacity=10, max_buffers=2)
+        aapl = buffers.get("AAPL")
+        buffers.get("MSFT")
+        buffers.get("AAPL")
+        buffers.get("A")
+        self.assertEqual(list(buffers.buffers), ["AAPL", "A"])
+        self.assertIs(buffers.get("AAPL"), aapl)
+
+        poller = TradePoller(buffers, interval=60, watch_timeout=30)
+        with patch('frontend_app.poller.threading.Thread'):
+            poller.watch("AAPL")
+        with patch('frontend_app.poller.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(poller.watched_tickers(), [])
+        self.assertNotIn("AAPL", buffers.buffers)
+
+    def test_poller_refreshes_each_watched_ticker_once(self):
+        buffers = MagicMock()
+        poller = TradePoller(buffers, interval=60, watch_timeout=30)
+        with patch('frontend_app.poller.threading.Thread'):
+            for _ in range(5):
+                poller.watch("AAPL")
+            poller.watch("MSFT")
+        poller.poll_once()
+        self.assertEqual(sorted(c.args[0] for c in buffers.refresh.call_args_list), ["AAPL", "MSFT"])
+
+        poller.watched["MSFT"] -= 31
+        self.assertEqual(poller.watched_tickers(), ["AAPL"])
+
+    def test_streamed_rsi_matches_compute_rsi(self):
+        rng = np.random.default_rng(7)
+        prices = np.round(100 + np.cumsum(rng.normal(0, 0.05, 300)), 2)
+        sizes = rng.integers(1, 100, 300)
+        state = IndicatorState()
+        values = state.seed(prices[:100], sizes[:100])
+        values += [state.update(p, s) for p, s in zip(prices[100:], sizes[100:])]
+        expected = compute_rsi(pd.Series(prices)).to_numpy()
+        self.assertTrue(np.array_equal([v.rsi for v in values], expected, equal_nan=True))
+        self.assertAlmostEqual(values[-1].vwap, float(np.sum(prices * sizes) / np.sum(sizes)))
+        self.assertAlmostEqual(values[-1].bollinger_upper,
+                               prices[-20:].mean() + 2 * prices[-20:].std(ddof=1))
+
+    def test_trades_without_size_are_left_out_of_vwap(self):
+        state = IndicatorState()
+        seeded = state.seed([10.0, 11.0, 12.0], [2, None, 2])
+        self.assertEqual(seeded[-1].vwap, 11.0)
+        self.assertEqual(state.update(13.0, None).vwap, 11.0)
+        self.assertEqual(state.update(13.0, float('nan')).vwap, 11.0)
+        self.assertEqual(state.update(14.0, 4).vwap, 12.5)
+        self.assertEqual(state.last_price, 14.0)
+
+    def test_price_trend_buckets_match_requested_points(self):
+        with patch.object(SingleStoreDBHandler, '_fetchall', return_value=[]) as mock_fetch:
+            self.db_handler.fetch_price_trend(['AAPL'], '2024-01-01 00:00:00', '2024-01-01 01:00:00', points=600)
+        query, params = mock_fetch.call_args[0]
+        self.assertIn("TIME_BUCKET('6s', localTS)", query)
+        self.assertEqual(params, ['AAPL', '2024-01-01 00:00:00', '2024-01-01 01:00:00'])
+
+    def test_long_price_trend_reads_the_minute_rollup(self):
+        with patch.object(SingleStoreDBHandler, '_fetchall', return_value=[]) as mock_fetch:
+            self.db_handler.fetch_price_trend(['AAPL'], '2024-01-01 00:00:00', '2024-01-02 00:00:00', points=600)
+        query, params = mock_fetch.call_args[0]
+        # 86400 s / 600 points is 144 s, rounded up to whole rollup minutes.
+        self.assertIn("TIME_BUCKET('3m', minute)", query)
+        self.assertIn("LAST(price_last, last_ts)", query)
+        self.assertIn("FROM live_trades_1m", query)
+        self.assertNotIn("FROM live_trades\n", query)
+        self.assertEqual(params, ['AAPL', '2024-01-01 00:00:00', '2024-01-02 00:00:00'])
+
+    def test_trade_breakdown_derives_both_groupings_from_one_scan(self):
+        rows = [("AAPL", 1, 3, 300, 3), ("AAPL", 2, 1, 100, 1), ("MSFT", 1, 2, 50, 2)]
+        with patch.object(SingleStoreDBHandler, '_fetchall', return_value=rows) as mock_fetch:
+            aggregated, exchanges = self.db_handler.fetch_trade_breakdown(['AAPL', 'MSFT'])
+        mock_fetch.assert_called_once()
+        self.assertEqual(sorted(aggregated), [("AAPL", 100.0, 4), ("MSFT", 25.0, 2)])
+        self.assertEqual(exchanges, [("AAPL", 1, 3), ("AAPL", 2, 1), ("MSFT", 1, 2)])
+
+    def test_run_concurrently_overlaps_queries(self):
+        barrier = threading.Barrier(3, timeout=5)
+        def query(name):
+            barrier.wait()
+            return name
+        results = self.db_handler.run_concurrently({name: (query, (name,)) for name in ("a", "b", "c")})
+        self.assertEqual(results, {"a": "a", "b": "b", "c": "c"})
+
+    @patch('frontend_app.db_handler.s2.connect')
+    def test_rollup_refresh_starts_from_rolled_up_watermark(self, mock_connect):
+        cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = ("2024-01-01 09:59:00",)
+        RollupMaintainer(self.db_handler, interval=10, lag_seconds=60).refresh_once()
+        watermark_query, refresh_query = [c.args for c in cursor.execute.call_args_list]
+        self.assertIn("FROM live_trades_1m", watermark_query[0])
+        self.assertEqual(watermark_query[1], (60,))
+        self.assertIn("INSERT INTO live_trades_1m", refresh_query[0])
+        self.assertEqual(refresh_query[1], ("2024-01-01 09:59:00",))
+        mock_connect.return_value.commit.assert_called_once()
+
+    @patch('frontend_app.db_handler.s2.connect')
+    def test_rollup_table_with_narrow_ticker_is_rebuilt(self, mock_connect):
+        cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (16,)
+        RollupMaintainer(self.db_handler, interval=10, lag_seconds=60).create_table()
+        queries = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertEqual(queries[1], "DROP TABLE live_trades_1m")
+        self.assertIn("ticker VARCHAR(32)", queries[2])
+
+        cursor.reset_mock()
+        cursor.fetchone.return_value = (32,)
+        RollupMaintainer(self.db_handler, interval=10, lag_seconds=60).create_table()
+        self.assertEqual(cursor.execute.call_count, 2)
+
+    @patch('frontend_app.export.s2.connect')
+    def test_export_streams_chunks_to_gzip_csv(self, mock_connect):
+        cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (3,)
+        cursor.fetchmany.side_effect = [
+            [("2024-01-01 00:00:00", "AAPL", "a", 1, 10.0, 5), ("2024-01-01 00:00:01", "AAPL", "b", 1, 10.5, 2)],
+            [("2024-01-01 00:00:02", "AAPL", "c", 2, 11.0, 1)],
+            [],
+        ]
+        with tempfile.TemporaryDirectory() as export_dir:
+            manager = ExportManager('', export_dir, chunk_rows=2)
+            job = manager.submit('trades', ['AAPL'], start='2024-01-01 00:00')
+            manager.executor.shutdown(wait=True)
+            self.assertEqual(job.status, 'done')
+            self.assertEqual(job.rows, 3)
+            self.assertEqual(job.progress(), 1.0)
+            with gzip.open(job.path, 'rt') as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0], "localTS,ticker,id,exchange,price,size")
+        self.assertEqual(len(lines), 4)
+        mock_connect.assert_called_once_with('', buffered=False)
+        cursor.fetchmany.assert_called_with(2)
+        self.assertNotIn("ORDER BY", cursor.execute.call_args_list[1].args[0])
+        self.assertEqual(os.path.basename(job.path), f"{job.id}.csv.gz")
+
+    def test_export_names_are_safe_and_old_files_are_swept(self):
+        name = download_name('trades', ['../../etc', 'A B', 'MSFT', 'GOOG', 'TSLA'], 'csv.gz', '20240101_000000')
+        self.assertEqual(name, "trades_etc_AB_MSFT_and_2_more_20240101_000000.csv.gz")
+        self.assertEqual(download_name('trades', ['/', 'BRK.B'], 'parquet', 'x'), "trades_BRK.B_x.parquet")
+
+        with tempfile.TemporaryDirectory() as export_dir:
+            manager = ExportManager('', export_dir, chunk_rows=2, retention_seconds=60)
+            old = [f"{'a' * 32}.json", f"{'a' * 32}.csv.gz", f"{'b' * 32}.parquet.tmp", "notes.txt"]
+            for name in old + [f"{'c' * 32}.json"]:
+                with open(os.path.join(export_dir, name), 'w'):
+                    pass
+            for name in old:
+                os.utime(os.path.join(export_dir, name), (time.time() - 120, time.time() - 120))
+            self.assertEqual(manager.sweep(), 3)
+            self.assertEqual(sorted(os.listdir(export_dir)), sorted(["notes.txt", f"{'c' * 32}.json"]))
+
+    def test_query_cache_coalesces_concurrent_misses(self):
+        calls = []
+        release = threading.Event()
+        def fetch_aggregated_data(tickers):
+            calls.append(tickers)
+            release.wait(5)
+            return [("AAPL", 10.0, 3)]
+        handler = MagicMock(fetch_aggregated_data=fetch_aggregated_data)
+        cached = CachedDBHandler(handler, QueryCache(16, {'fetch_aggregated_data': 60}))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cached.fetch_aggregated_data(['AAPL'])))
+                   for _ in range(20)]
+        for t in threads:
+            t.start()
+        while cached.cache.stats()['coalesced'] < 19:
+            pass
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[("AAPL", 10.0, 3)]] * 20)
+        cached.fetch_aggregated_data(['AAPL'])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cached.cache.stats()['hits'], 1)
+
+    def test_query_cache_expires_and_evicts(self):
+        cache = QueryCache(2, {'a': 60, 'b': 0.01})
+        loader = MagicMock(side_effect=lambda: loader.call_count)
+        cache.get('b', (1,), {}, loader)
+        cache.get('b', (1,), {}, loader)
+        self.assertEqual(loader.call_count, 1)
+        with patch('frontend_app.query_cache.time.monotonic', return_value=10 ** 9):
+            cache.get('b', (1,), {}, loader)
+        self.assertEqual(loader.call_count, 2)
+
+        cache.get('a', (1,), {}, loader)
+        cache.get('a', (2,), {}, loader)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        # Untracked query types are never cached.
+        cache.get('c', (), {}, loader)
+        cache.get('c', (), {}, loader)
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(loader.call_count, 6)
+
+    def test_only_one_worker_maintains_the_rollup(self):
+        from frontend_app import serve
+        with tempfile.TemporaryDirectory() as lock_dir, \
+                patch('frontend_app.rollups.RollupMaintainer.start') as mock_start, \
+                patch.object(serve, '_rollup_lock', None):
+            lock_path = f"{lock_dir}/rollup.lock"
+            self.assertTrue(serve.start_rollup_maintainer(lock_path))
+            self.assertFalse(serve.start_rollup_maintainer(lock_path))
+            mock_start.assert_called_once()
+            serve._rollup_lock.close()
+            # The lock dies with its worker, so a replacement takes over.
+            self.assertTrue(serve.start_rollup_maintainer(lock_path))
+            serve._rollup_lock.close()
+
+    def test_query_cache_reset_after_fork(self):
+        cache = QueryCache(16, {'fetch_aggregated_data': 60.0})
+        cache.lock.acquire()
+        cache.inflight['stuck'] = object()
+        cache.reset_after_fork()
+        self.assertEqual(cache.get('fetch_aggregated_data', (['AAPL'],), {}, lambda: [1]), [1])
+        self.assertEqual(cache.inflight, {})
+
+    def test_shared_store_serves_other_workers(self):
+        loader = MagicMock(return_value=[("AAPL", 10.0, 3)])
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = f"{cache_dir}/cache.sqlite"
+            workers = [QueryCache(16, {'fetch_trade_breakdown': 60}, store=SharedResultStore(path)) for _ in range(2)]
+            results = [cache.get('fetch_trade_breakdown', (['AAPL'],), {}, loader) for cache in workers]
+            # A lease held by a worker that died is taken over once it expires.
+            store = SharedResultStore(path, lease_seconds=0.05)
+            self.assertTrue(store.claim(repr(('x', (), ()))))
+            self.assertFalse(store.claim(repr(('x', (), ()))))
+            self.assertEqual(QueryCache(16, {'x': 60}, store=store).get('x', (), {}, lambda: 'late'), 'late')
+        loader.assert_called_once()
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(workers[1].stats()['shared_hits'], 1)
+
+    def test_export_job_visible_to_other_workers(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            manager = ExportManager('', export_dir, chunk_rows=2)
+            with patch('frontend_app.export.s2.connect', side_effect=RuntimeError("no database")):
+                job = manager.submit('trades', ['AAPL'])
+                manager.executor.shutdown(wait=True)
+            other = ExportManager('', export_dir, chunk_rows=2)
+            self.assertIsNone(other.get('../' + job.id))
+            seen = other.get(job.id)
+            self.assertEqual(seen.status, 'failed')
+            self.assertEqual(seen.error, "no database")
+            self.assertEqual(seen.filename, job.filename)
+
+    def test_candles_requery_only_open_bars(self):
+        t = lambda minute, second=0: datetime.datetime(2024, 1, 1, 10, minute, second)
+        bar = lambda minute, last: (t(minute), 1.0, 2.0, 0.5, 1.5, 100.0, 10, last)
+        db = MagicMock()
+        db.fetch_time_range.return_value = (t(0), t(10, 30))
+        db.fetch_ohlcv.side_effect = [
+            [bar(6, t(6, 59)), bar(7, t(7, 59)), bar(8, t(8, 59))],
+            [bar(9, t(9, 59)), bar(10, t(10, 30))],
+            [bar(10, t(10, 59)), bar(11, t(11, 5))],
+        ]
+        cache = CandleCache(db, bars=5, settle_seconds=2, rollup_lag_seconds=60)
+        self.assertEqual([b[0] for b in cache.get('AAPL', '1m')], [t(m) for m in range(6, 11)])
+        self.assertEqual(db.fetch_ohlcv.call_args_list[0].args, ('AAPL', '1m', t(6), t(9)))
+        self.assertTrue(db.fetch_ohlcv.call_args_list[0].kwargs['rollup'])
+        self.assertEqual(db.fetch_ohlcv.call_args_list[1].args, ('AAPL', '1m', t(9)))
+
+        bars = cache.get('AAPL', '1m')
+        self.assertEqual(db.fetch_ohlcv.call_args.args, ('AAPL', '1m', t(10)))
+        self.assertEqual([b[0] for b in bars], [t(m) for m in range(7, 12)])
+        self.assertEqual(bars[3][7], t(10, 59))
+
+    def test_watchlist_refreshes_all_viewers_with_one_delta_query(self):
+        t = lambda second: datetime.datetime(2024, 1, 1, 10, 0, second)
+        db = MagicMock()
+        db.fetch_watchlist.side_effect = [
+            [("AAPL", t(0), 10.0, 2, t(0)), ("AAPL", t(5), 11.0, 1, t(5)), ("MSFT", t(3), 20.0, 4, t(3))],
+            # MSFT's newest bucket comes back unchanged; AAPL traded again.
+            [("AAPL", t(5), 12.0, 3, t(5)), ("AAPL", t(6), 12.5, 1, t(6)), ("MSFT", t(3), 20.0, 4, t(3))],
+        ]
+        store = WatchlistStore(db, window_seconds=120, interval=60, watch_timeout=30)
+        first = store.get(["AAPL", "MSFT"])
+        self.assertEqual(store.get(["MSFT", "AAPL"]), first)
+        db.fetch_watchlist.assert_called_once_with({"AAPL": None, "MSFT": None}, 120)
+        self.assertEqual((first["AAPL"].price, first["AAPL"].change, first["AAPL"].trades_10s), (11.0, 1.0, 3))
+
+        store.refreshed_at -= 60
+        second = store.get(["AAPL", "MSFT"])
+        self.assertEqual(db.fetch_watchlist.call_args.args[0], {"AAPL": t(5), "MSFT": t(3)})
+        self.assertEqual(second["AAPL"].trades_10s, 6)
+        self.assertEqual(second["AAPL"].sparkline, [(t(0), 10.0), (t(5), 12.0), (t(6), 12.5)])
+        self.assertGreater(second["AAPL"].version, first["AAPL"].version)
+        self.assertIs(second["MSFT"], first["MSFT"])
+
+    def test_loadtest_stand_in_runs_dashboard_queries(self):
+        with tempfile.TemporaryDirectory() as db_dir:
+            path = f"{db_dir}/trades.sqlite"
+            load_synthetic_trades(path, ['AAPL', 'MSFT'], minutes=5, trades_per_minute=60)
+            db = LocalDBHandler(path, pool_size=2)
+            tail = db.fetch_trade_tail('AAPL', limit=10)
+            aggregated, exchanges = db.fetch_trade_breakdown(['AAPL', 'MSFT'])
+            trend = db.fetch_price_trend(['AAPL'], points=30)
+            db.pool.close()
+        self.assertEqual(len(tail), 10)
+        self.assertIsInstance(tail[-1][0], datetime.datetime)
+        self.assertEqual(sorted((ticker, count) for ticker, _, count in aggregated), [('AAPL', 300), ('MSFT', 300)])
+        self.assertEqual(sum(count for _, _, count in exchanges), 600)
+        self.assertLessEqual(len(trend), 31)
+        self.assertEqual(db.queries, 4)
+
+        report = {'callbacks': {'realtime': {'errors': 0, 'p95_ms': 30.0, 'p99_ms': 50.0}},
+                  'db_queries_per_second': 10.0}
+        self.assertEqual(check_report(report, max_p99_ms=2000), [])
+        baseline = {'callbacks': {'realtime': {'p95_ms': 20.0}}, 'db_queries_per_second': 10.0}
+        self.assertEqual(len(check_report(report, max_p99_ms=40, baseline=baseline)), 2)
+
+    def test_failed_query_raises_and_is_not_cached(self):
+        handler = SingleStoreDBHandler(Config.SINGLESTORE_DB_URL, pool_size=1, pool_timeout=0.05)
+        cached = CachedDBHandler(handler, QueryCache(16, {'fetch_aggregated_data': 60.0}))
+        with patch.object(handler.pool, 'acquire', side_effect=PoolTimeout("pool exhausted")):
+            with self.assertRaises(QueryError):
+                cached.fetch_aggregated_data(['AAPL'])
+        with patch.object(SingleStoreDBHandler, '_fetchall', return_value=[("AAPL", 10.0, 3)]) as mock_fetch:
+            self.assertEqual(cached.fetch_aggregated_data(['AAPL']), [("AAPL", 10.0, 3)])
+        mock_fetch.assert_called_once()
+        self.assertEqual(cached.cache.stats()['entries'], 1)
+
     def test_csv_generation(self):
         # Testing CSV download with a sample df
         df = pd.DataFrame({"ticker":["AAPL"],"avg_size":[500],"trade_count":[10000]})
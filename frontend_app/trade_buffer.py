@@ -0,0 +1,126 @@
+import threading
+from collections import OrderedDict, deque
+from typing import NamedTuple
+from frontend_app.indicators import IndicatorState, Indicators
+
+
+class Trade(NamedTuple):
+    seq: int
+    localTS: object
+    id: str
+    price: float
+    size: float
+    exchange: object
+    indicators: Indicators
+
+
+class TradeRingBuffer:
+    """
+    The newest ``capacity`` trades of one ticker, kept server side.
+
+    The first refresh loads the tail with a descending query. After that
+    only trades past the ``(localTS, id)`` of the newest one read are
+    fetched, so a busy second is never read twice. Every trade gets a
+    sequence number, so a client that remembers the last one it drew only
+    needs the trades after it (see ``trades_after``). Each trade carries
+    its indicator values, computed incrementally as it arrives.
+    """
+
+    def __init__(self, ticker, capacity):
+        self.ticker = ticker
+        self.capacity = capacity
+        self.trades = deque(maxlen=capacity)
+        self.next_seq = 1
+        self.cursor = None  # (localTS, id) of the newest trade read
+        self.loaded = False
+        self.indicators = IndicatorState()
+        self.lock = threading.Lock()
+
+    def _seed(self, rows):
+        values = self.indicators.seed([row[2] for row in rows], [row[3] for row in rows])
+        for (local_ts, trade_id, price, size, exchange), indicators in zip(rows, values):
+            self.trades.append(Trade(self.next_seq, local_ts, trade_id, float(price), size, exchange, indicators))
+            self.next_seq += 1
+
+    def _append(self, rows):
+        for local_ts, trade_id, price, size, exchange in rows:
+            indicators = self.indicators.update(price, size)
+            self.trades.append(Trade(self.next_seq, local_ts, trade_id, float(price), size, exchange, indicators))
+            self.next_seq += 1
+
+    def refresh(self, db_handler):
+        """Pull new trades from the database; returns how many were added."""
+        with self.lock:
+            if self.cursor is None:
+                rows = db_handler.fetch_trade_tail(self.ticker, limit=self.capacity)
+                self._seed(rows)
+            else:
+                rows = db_handler.fetch_trades_since(self.ticker, *self.cursor, limit=self.capacity)
+                if len(rows) >= self.capacity:
+                    # At least a buffer's worth of new trades: the tail is all we keep anyway.
+                    rows = db_handler.fetch_trade_tail(self.ticker, limit=self.capacity)
+                    self.trades.clear()
+                    self._seed(rows)
+                else:
+                    self._append(rows)
+            if rows:
+                self.cursor = tuple(rows[-1][:2])
+            self.loaded = True
+            return len(rows)
+
+    @property
+    def last_seq(self):
+        return self.next_seq - 1
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.trades)
+
+
+def trades_after(trades, seq):
+    """
+    The trades of a snapshot after sequence number ``seq``, or None when
+    some of them were already evicted (or ``seq`` is from an earlier
+    buffer) and the client has to redraw from the whole snapshot.
+    """
+    if not trades or seq > trades[-1].seq:
+        return None
+    first = trades[0].seq
+    if seq < first - 1:
+        return None
+    return trades[seq - first + 1:]
+
+
+class TradeBuffers:
+    """
+    One TradeRingBuffer per ticker, created on first use; together they are
+    the per-ticker indicator engine. At most ``max_buffers`` are kept, least
+    recently used first out, and the poller discards a ticker's buffer once
+    nobody watches it.
+    """
+
+    def __init__(self, db_handler, capacity, max_buffers=64):
+        self.db_handler = db_handler
+        self.capacity = capacity
+        self.max_buffers = max_buffers
+        self.buffers = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, ticker):
+        with self.lock:
+            buffer = self.buffers.get(ticker)
+            if buffer is None:
+                buffer = self.buffers[ticker] = TradeRingBuffer(ticker, self.capacity)
+                while len(self.buffers) > self.max_buffers:
+                    self.buffers.popitem(last=False)
+            self.buffers.move_to_end(ticker)
+            return buffer
+
+    def discard(self, ticker):
+        with self.lock:
+            self.buffers.pop(ticker, None)
+
+    def refresh(self, ticker):
+        buffer = self.get(ticker)
+        buffer.refresh(self.db_handler)
+        return buffer
@@ -0,0 +1,116 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import List, NamedTuple
+
+
+class WatchRow(NamedTuple):
+    ticker: str
+    price: float
+    change: float
+    change_pct: float
+    trades_10s: int
+    sparkline: List[tuple]  # (bucket, price)
+    version: int
+
+
+class _Ticker:
+    def __init__(self):
+        self.buckets = OrderedDict()  # bucket -> (price, trades, last_ts)
+        self.last_ts = None
+        self.loaded = False
+        self.row = None
+        self.seen = time.monotonic()
+
+
+class WatchlistStore:
+    """
+    Last price, change over the window, 10 s trade count and a sparkline
+    for every ticker on any open watchlist.
+
+    One ``fetch_watchlist`` query per ``interval`` covers every watched
+    ticker, however many browsers watch them. Loaded tickers are only
+    re-aggregated from their newest one-second bucket on, and a ticker's
+    row is rebuilt, with a new ``version``, only when it traded. Clients
+    compare versions and redraw just the rows that changed. Tickers no
+    watchlist asked for in ``watch_timeout`` seconds are dropped.
+    """
+
+    def __init__(self, db_handler, window_seconds, interval, watch_timeout):
+        self.db_handler = db_handler
+        self.window = timedelta(seconds=window_seconds)
+        self.interval = interval
+        self.watch_timeout = watch_timeout
+        self.tickers = {}
+        self.versions = itertools.count(1)
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.refreshed_at = 0.0
+        self.queries = 0
+
+    def get(self, tickers):
+        """Return ``{ticker: WatchRow or None}``, refreshing first if the data is older than ``interval``."""
+        with self.lock:
+            now = time.monotonic()
+            for ticker in tickers:
+                self.tickers.setdefault(ticker, _Ticker()).seen = now
+        if self._stale(tickers):
+            with self.refresh_lock:
+                # Another viewer may have refreshed while we waited.
+                if self._stale(tickers):
+                    self.refresh()
+        with self.lock:
+            return {ticker: self.tickers[ticker].row for ticker in tickers}
+
+    def _stale(self, tickers):
+        with self.lock:
+            return (time.monotonic() - self.refreshed_at >= self.interval
+                    or not all(self.tickers[t].loaded for t in tickers))
+
+    def refresh(self):
+        cutoff = time.monotonic() - self.watch_timeout
+        with self.lock:
+            for ticker in [t for t, state in self.tickers.items() if state.seen < cutoff]:
+                del self.tickers[ticker]
+            since = {ticker: next(reversed(state.buckets), None) for ticker, state in self.tickers.items()}
+        self.refreshed_at = time.monotonic()
+        rows = self.db_handler.fetch_watchlist(since, int(self.window.total_seconds()))
+        self.queries += 1
+
+        updates = {}
+        for ticker, bucket, price, trades, last_ts in rows:
+            updates.setdefault(ticker, []).append((bucket, float(price), trades, last_ts))
+        with self.lock:
+            changed = 0
+            for ticker, buckets in updates.items():
+                state = self.tickers.get(ticker)
+                # A loaded ticker's newest bucket comes back even without new trades.
+                if state is None or buckets[-1][3] == state.last_ts:
+                    continue
+                for bucket, price, trades, last_ts in buckets:
+                    state.buckets[bucket] = (price, trades, last_ts)
+                self._rebuild(ticker, state)
+                changed += 1
+            for ticker in since:
+                if ticker in self.tickers:
+                    self.tickers[ticker].loaded = True
+        return changed
+
+    def _rebuild(self, ticker, state):
+        newest = next(reversed(state.buckets))
+        while next(iter(state.buckets)) < newest - self.window:
+            state.buckets.popitem(last=False)
+        price, _, state.last_ts = state.buckets[newest]
+        first = next(iter(state.buckets.values()))[0]
+        recent = newest - timedelta(seconds=9)
+        trades_10s = sum(trades for bucket, (_, trades, _) in state.buckets.items() if bucket >= recent)
+        state.row = WatchRow(
+            ticker, price, price - first, (price - first) / first * 100 if first else 0.0, trades_10s,
+            [(bucket, value[0]) for bucket, value in state.buckets.items()], next(self.versions),
+        )
+
+    def stats(self):
+        with self.lock:
+            return {'tickers': len(self.tickers), 'queries': self.queries}
@@ -1,30 +1,111 @@
 import requests
+import json
 import logging
+import sqlite3
+import time
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from requests.exceptions import HTTPError, ConnectionError, Timeout
 from typing import Any, Dict, List, Optional
 from utils import RateLimiter
+from cache import CachedResponse, ResponseCache
+from replay import ResponseArchive
+from metrics import metrics, endpoint_label
 
 logger = logging.getLogger(__name__)
 
+def _count_retry(retry_state):
+    endpoint = retry_state.args[1] if len(retry_state.args) > 1 else retry_state.kwargs.get('endpoint', '')
+    metrics.inc('api_retries', endpoint=endpoint_label(endpoint))
+
 class PolygonAPIClient:
-    def __init__(self, api_key: str, rate_limiter: RateLimiter):
+    def __init__(self, api_key: str, rate_limiter: RateLimiter, cache: Optional[ResponseCache] = None,
+                 base_url: str = 'https://api.polygon.io', recorder: Optional[ResponseArchive] = None):
         self.api_key = api_key
-        self.base_url = 'https://api.polygon.io'
+        self.base_url = base_url
         self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.recorder = recorder
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        # One cache lookup per call; retries below only repeat the HTTP request.
+        cached = None
+        if self.cache:
+            try:
+                cached = self.cache.lookup(endpoint, params)
+            except sqlite3.Error as e:
+                # The cache only saves requests; never let it cost us the data.
+                logger.warning(f"Response cache lookup failed for {endpoint}: {e}")
+        if cached and cached.fresh:
+            metrics.inc('api_cache_hits', endpoint=endpoint_label(endpoint))
+            if self.recorder:
+                self.recorder.record(endpoint, params, json.dumps(cached.data).encode('utf-8'))
+            return cached.data
+        return self._fetch(endpoint, params, cached)
 
     @retry(
         stop=stop_after_attempt(5),
         wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((HTTPError, ConnectionError, Timeout))
+        retry=retry_if_exception_type((HTTPError, ConnectionError, Timeout)),
+        before_sleep=_count_retry
     )
-    def get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _fetch(self, endpoint: str, params: Dict[str, Any], cached: Optional[CachedResponse]) -> Dict[str, Any]:
+        label = endpoint_label(endpoint)
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        response = self._request(endpoint, params, headers)
+        if response.status_code == 304:
+            if cached:
+                try:
+                    self.cache.revalidated(cached)
+                except sqlite3.Error as e:
+                    logger.warning(f"Response cache revalidation failed for {endpoint}: {e}")
+                if self.recorder:
+                    self.recorder.record(endpoint, params, json.dumps(cached.data).encode('utf-8'))
+                return cached.data
+            # Nothing cached to reuse (e.g. an intermediary answered): fetch the body unconditionally.
+            logger.warning(f"Got 304 for {endpoint} without a cached copy; refetching")
+            response = self._request(endpoint, params, {'Cache-Control': 'no-cache'})
+        try:
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            metrics.inc('api_errors', endpoint=label, error=type(e).__name__)
+            raise
+        if self.recorder:
+            self.recorder.record(endpoint, params, response.content)
+        # Error and empty-result bodies can come back with a 2xx; replaying
+        # them for a whole TTL would hide the data once upstream recovers.
+        if self.cache and data.get('status') == 'OK':
+            try:
+                self.cache.store(endpoint, params, response.content,
+                                 etag=response.headers.get('ETag'),
+                                 last_modified=response.headers.get('Last-Modified'))
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache store failed for {endpoint}: {e}")
+        return data
+
+    def _request(self, endpoint: str, params: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        label = endpoint_label(endpoint)
         with self.rate_limiter():
             url = f"{self.base_url}{endpoint}"
-            params['apiKey'] = self.api_key
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            request_params = dict(params, apiKey=self.api_key)
+            metrics.inc('api_requests', endpoint=label)
+            start = time.monotonic()
+            try:
+                response = requests.get(url, params=request_params, headers=headers, timeout=10)
+            except Exception as e:
+                metrics.inc('api_errors', endpoint=label, error=type(e).__name__)
+                raise
+            finally:
+                metrics.observe('api_request_seconds', time.monotonic() - start, endpoint=label)
+        metrics.inc('api_responses', endpoint=label, status=str(response.status_code))
+        metrics.inc('api_bytes', len(response.content), endpoint=label)
+        return response
 
 
     def get_ticker_events(self, ticker: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,102 @@
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Any, Callable, Dict, List
+from models import JSON_ENCODER, StockFundamental, to_rows
+from replay import ResponseArchive
+
+logger = logging.getLogger(__name__)
+
+# The model as it was before slots, from_api and to_rows: a plain dataclass
+# built from keyword arguments and encoded one dict-of-params row at a time.
+LegacyStockFundamental = make_dataclass('LegacyStockFundamental', [f.name for f in fields(StockFundamental)])
+
+
+def legacy_rows(payload: List[Dict[str, Any]], ticker: str) -> List[Dict[str, Any]]:
+    records = [LegacyStockFundamental(
+        ticker=ticker,
+        company_name=record.get('company_name'),
+        cik=record.get('cik'),
+        start_date=record.get('start_date'),
+        end_date=record.get('end_date'),
+        filing_date=record.get('filing_date'),
+        fiscal_period=record.get('fiscal_period') or '',
+        fiscal_year=record.get('fiscal_year') or '',
+        timeframe=record.get('timeframe') or 'quarterly',
+        source_filing_url=record.get('source_filing_url'),
+        financials=record.get('financials'),
+    ) for record in payload]
+    return [{
+        'ticker': r.ticker,
+        'company_name': r.company_name,
+        'cik': r.cik,
+        'start_date': r.start_date,
+        'end_date': r.end_date,
+        'filing_date': r.filing_date,
+        'fiscal_period': r.fiscal_period,
+        'fiscal_year': r.fiscal_year,
+        'timeframe': r.timeframe,
+        'source_filing_url': r.source_filing_url,
+        'financials': json.dumps(r.financials),
+    } for r in records]
+
+
+def model_rows(payload: List[Dict[str, Any]], ticker: str) -> List[tuple]:
+    return to_rows([StockFundamental.from_api(record, ticker, 'quarterly') for record in payload])
+
+
+def load_fundamentals(archive: ResponseArchive) -> List[Dict[str, Any]]:
+    payload = []
+    for entry in archive.entries.values():
+        if entry['endpoint'] == '/vX/reference/financials':
+            payload.extend(json.loads(entry['body']).get('results', []))
+    return payload
+
+
+def measure(build: Callable, payload: List[Dict[str, Any]], iterations: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build(payload, 'BENCH')
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    rows = build(payload, 'BENCH')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    records = len(payload) * iterations
+    return {
+        'seconds': elapsed,
+        'records_per_second': records / elapsed if elapsed else None,
+        'peak_bytes_per_record': peak / len(payload),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Micro-benchmark building and encoding fundamentals rows from a recorded payload.')
+    parser.add_argument('--archive', required=True, help='Recorded responses (.jsonl.gz)')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--scale', type=int, default=10, help='Repeat the recorded payload this many times')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    payload = load_fundamentals(ResponseArchive.load(args.archive)) * args.scale
+    if not payload:
+        parser.error(f"No /vX/reference/financials responses in {args.archive}")
+    result = {
+        'records': len(payload),
+        'iterations': args.iterations,
+        'json_encoder': JSON_ENCODER,
+        'legacy': measure(legacy_rows, payload, args.iterations),
+        'models': measure(model_rows, payload, args.iterations),
+    }
+    result['speedup'] = result['legacy']['seconds'] / result['models']['seconds']
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
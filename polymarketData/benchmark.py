@@ -0,0 +1,150 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+from api_client import PolygonAPIClient
+from db_handler import SingleStoreDBHandler
+from fanout import EndpointFanout
+from metrics import metrics
+from pipeline import IngestionPipeline, fetch_ticker_news
+from replay import ResponseArchive, StubServer, add_stub_arguments
+from utils import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class NullCursor:
+    """Accepts writes without a database, optionally sleeping per statement."""
+
+    def __init__(self, db: 'LocalDBHandler'):
+        self.db = db
+
+    def execute(self, query: str, params: Any = None):
+        self._write(1)
+
+    def executemany(self, query: str, rows: List[Any]):
+        self._write(len(rows))
+
+    def _write(self, rows: int):
+        if self.db.latency_ms:
+            time.sleep(self.db.latency_ms / 1000.0)
+        with self.db.lock:
+            self.db.statements += 1
+            self.db.rows += rows
+
+    def fetchone(self):
+        return (None,)
+
+    def fetchall(self):
+        return []
+
+
+class NullConnection:
+    def __init__(self, db: 'LocalDBHandler'):
+        self.db = db
+
+    def cursor(self):
+        return NullCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class LocalDBHandler(SingleStoreDBHandler):
+    """
+    Local stand-in for SingleStore. The real insert_* methods still run
+    their parameter building, JSON encoding and instrumentation. Only the
+    connection is swapped for one that counts rows.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__(db_url='')
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.statements = 0
+        self.rows = 0
+
+    def create_connection(self):
+        return NullConnection(self)
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    archive = ResponseArchive.load(args.archive)
+    tickers = archive.tickers()
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(',') if t.strip()]
+    tickers = tickers * args.repeat
+
+    stub = StubServer(archive, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                      rate_429=args.rate_429, error_rate=args.error_rate, seed=args.seed).start()
+    rate_limiter = RateLimiter(args.rate_limit)
+    api_client = PolygonAPIClient('benchmark', rate_limiter, base_url=stub.base_url)
+    db_handler = LocalDBHandler(latency_ms=args.db_latency_ms)
+    fanout = None
+    if args.endpoint_concurrency > 0:
+        fanout = EndpointFanout(args.endpoint_concurrency, hedge_percentile=95, hedge_min_samples=20,
+                                hedge_budget=0.1, hedge_min_delay=0.25, rate_limiter=rate_limiter)
+    pipeline = IngestionPipeline(api_client, db_handler,
+                                 fetch_workers=args.fetch_workers, write_workers=args.write_workers,
+                                 queue_size=1000, batch_size=args.batch_size, flush_interval=1.0,
+                                 report_interval=30.0, fanout=fanout)
+
+    start = time.monotonic()
+    pipeline.start()
+    for ticker in tickers:
+        pipeline.submit(ticker)
+    pipeline.put_records('ticker_news', fetch_ticker_news(api_client, limit=100))
+    pipeline_stats = pipeline.close()
+    elapsed = time.monotonic() - start
+
+    if fanout:
+        fanout.shutdown()
+    stub.stop()
+
+    report = metrics.report()
+    api_calls = sum(endpoint.get('requests', 0) for endpoint in report['endpoints'].values())
+    return {
+        'tickers': len(tickers),
+        'elapsed_seconds': elapsed,
+        'tickers_per_minute': len(tickers) / elapsed * 60,
+        'api_calls': api_calls,
+        'api_calls_per_second': api_calls / elapsed,
+        'rows_written': db_handler.rows,
+        'rows_written_per_second': db_handler.rows / elapsed,
+        'db_statements': db_handler.statements,
+        'pipeline': pipeline_stats,
+        'endpoints': report['endpoints'],
+        'tables': report['tables'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the ingestion pipeline offline against recorded responses.')
+    add_stub_arguments(parser)
+    parser.add_argument('--tickers', help='Comma separated tickers (default: every ticker in the archive)')
+    parser.add_argument('--repeat', type=int, default=1, help='Process the ticker list this many times')
+    parser.add_argument('--rate-limit', type=int, default=1000, help='Client requests per second')
+    parser.add_argument('--fetch-workers', type=int, default=8)
+    parser.add_argument('--write-workers', type=int, default=2)
+    parser.add_argument('--endpoint-concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help='Simulated latency per statement')
+    parser.add_argument('--output', help='Also write the JSON result to this file')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    result = run_benchmark(args)
+    print(json.dumps(result, indent=2, default=str))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+
+def parse_ttl_map(spec: str) -> Dict[str, int]:
+    """Parse an ``endpoint_prefix=seconds`` list separated by commas."""
+    ttls = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        prefix, _, seconds = item.rpartition('=')
+        if not prefix:
+            logger.warning(f"Ignoring malformed cache TTL entry: {item}")
+            continue
+        ttls[prefix.strip()] = int(seconds)
+    return ttls
+
+
+def make_cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+    key_params = sorted((k, str(v)) for k, v in params.items() if k != 'apiKey')
+    return json.dumps([endpoint, key_params], separators=(',', ':'))
+
+
+def _is_locked(e: BaseException) -> bool:
+    return isinstance(e, sqlite3.OperationalError) and 'locked' in str(e)
+
+
+# Shard processes share one cache file; a writer can outlast the busy timeout.
+_retry_locked = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=0.1, max=2),
+    retry=retry_if_exception(_is_locked),
+    reraise=True,
+)
+
+
+@dataclass
+class CachedResponse:
+    key: str
+    data: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache backed by a local SQLite file.
+
+    Entries are keyed by endpoint and params (never the API key), expire after
+    a per-endpoint TTL and are evicted least-recently-used once the stored
+    bodies exceed ``max_bytes``. Expired entries that carry an ETag or
+    Last-Modified header are kept so the client can revalidate them with a
+    conditional request instead of downloading the body again.
+
+    Several processes may share the file, so the stored size is always read
+    from the table inside the write transaction rather than tracked per
+    process, and writes that hit ``database is locked`` are retried.
+    """
+
+    def __init__(self, path: str, max_bytes: int, default_ttl: int, ttls: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # Longest prefix wins, so check the most specific endpoints first.
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                last_access REAL,
+                size INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        # Covers SUM(size) so sizing the cache does not read the bodies.
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_size ON responses (size)")
+        self.conn.commit()
+
+    @contextmanager
+    def _transaction(self):
+        with self.lock:
+            try:
+                yield self.conn
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+    def _total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def ttl_for(self, endpoint: str) -> int:
+        for prefix, ttl in self.ttls:
+            if endpoint.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    @_retry_locked
+    def lookup(self, endpoint: str, params: Dict[str, Any]) -> Optional[CachedResponse]:
+        key = make_cache_key(endpoint, params)
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            fresh = row is not None and now - row[3] < self.ttl_for(endpoint)
+            usable = row is not None and bool(fresh or row[1] or row[2])
+            if usable:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        # Counted once the transaction commits, so a retried lookup counts once.
+        # A stale entry is not a miss yet: a 304 may still revalidate it.
+        with self.lock:
+            if not usable:
+                self.misses += 1
+            elif fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+        if not usable:
+            return None
+        body, etag, last_modified, _ = row
+        return CachedResponse(key=key, data=json.loads(body), etag=etag, last_modified=last_modified, fresh=fresh)
+
+    @_retry_locked
+    def revalidated(self, cached: CachedResponse):
+        """Mark a stale entry as fresh again after a 304 Not Modified."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, cached.key))
+        with self.lock:
+            self.revalidations += 1
+
+    @_retry_locked
+    def store(self, endpoint: str, params: Dict[str, Any], body: bytes,
+              etag: Optional[str] = None, last_modified: Optional[str] = None):
+        key = make_cache_key(endpoint, params)
+        now = time.time()
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, last_modified, now, now, size)
+            )
+            evicted = self._evict(conn)
+        with self.lock:
+            self.evictions += evicted
+
+    def _evict(self, conn) -> int:
+        # Runs inside the write transaction, so no other process changes the total meanwhile.
+        total = self._total_bytes()
+        evicted = 0
+        while total > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+                if total <= self.max_bytes:
+                    break
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'revalidations': self.revalidations,
+                'evictions': self.evictions,
+                'bytes': self._total_bytes(),
+            }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -5,7 +5,44 @@ load_dotenv()
 
 class Config:
     API_KEY = os.getenv('POLYGON_API_KEY')
+    BASE_URL = os.getenv('POLYGON_BASE_URL', 'https://api.polygon.io')
+    RECORD_ARCHIVE = os.getenv('RECORD_ARCHIVE')  # when set, responses are recorded to this .jsonl.gz
     DB_URL = os.getenv('SINGLESTORE_DB_URL')
     MAX_WORKERS = int(os.getenv('MAX_WORKERS', '8'))
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+    UNIVERSE_ACTIVE_ONLY = os.getenv('UNIVERSE_ACTIVE_ONLY', 'true').lower() == 'true'
     RATE_LIMIT = int(os.getenv('API_RATE_LIMIT', '5'))  # requests per second
+    INGEST_PROCESSES = int(os.getenv('INGEST_PROCESSES', '1'))  # >1 shards tickers across processes
+    FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', str(MAX_WORKERS)))
+    ENDPOINT_CONCURRENCY = int(os.getenv('ENDPOINT_CONCURRENCY', '16'))  # 0 disables per-ticker fan-out
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '95'))
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', '20'))
+    HEDGE_BUDGET = float(os.getenv('HEDGE_BUDGET', '0.1'))  # max hedged requests per primary request
+    HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', '0.25'))  # seconds
+    WRITE_WORKERS = int(os.getenv('WRITE_WORKERS', '2'))
+    QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '1000'))
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', '5000'))  # records per bulk insert
+    WRITE_FLUSH_INTERVAL = float(os.getenv('WRITE_FLUSH_INTERVAL', '2.0'))  # seconds
+    QUEUE_REPORT_INTERVAL = float(os.getenv('QUEUE_REPORT_INTERVAL', '10.0'))  # seconds
+    CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH', '.cache/polygon_responses.sqlite')
+    CACHE_MAX_MB = int(os.getenv('RESPONSE_CACHE_MAX_MB', '512'))
+    CACHE_DEFAULT_TTL = int(os.getenv('RESPONSE_CACHE_DEFAULT_TTL', '3600'))  # seconds
+    # Comma separated endpoint_prefix=seconds pairs; the longest matching prefix wins.
+    CACHE_TTLS = os.getenv(
+        'RESPONSE_CACHE_TTLS',
+        '/v3/reference/tickers/=86400,/v1/related-companies/=86400,'
+        '/vX/reference/financials=86400,/vX/reference/tickers/=21600,/v2/reference/news=60'
+    )
+    RUN_REPORT_DIR = os.getenv('RUN_REPORT_DIR', '.')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # 0 disables the Prometheus endpoint
+    # Continuous ingestion daemon (daemon.py); cadences are in seconds
+    NEWS_REFRESH_SECONDS = float(os.getenv('NEWS_REFRESH_SECONDS', '60'))
+    EVENTS_REFRESH_SECONDS = float(os.getenv('EVENTS_REFRESH_SECONDS', '3600'))
+    DETAILS_REFRESH_SECONDS = float(os.getenv('DETAILS_REFRESH_SECONDS', str(7 * 86400)))
+    RELATED_REFRESH_SECONDS = float(os.getenv('RELATED_REFRESH_SECONDS', str(7 * 86400)))
+    FUNDAMENTALS_REFRESH_SECONDS = float(os.getenv('FUNDAMENTALS_REFRESH_SECONDS', '86400'))
+    BOOST_WINDOW_SECONDS = int(os.getenv('BOOST_WINDOW_SECONDS', '900'))  # "recently traded" window
+    BOOST_FACTOR = float(os.getenv('BOOST_FACTOR', '0.25'))  # cadence multiplier for recently traded tickers
+    UNIVERSE_SYNC_SECONDS = float(os.getenv('UNIVERSE_SYNC_SECONDS', '300'))
+    DAEMON_STATE_PATH = os.getenv('DAEMON_STATE_PATH', '.cache/daemon_schedule.json')
@@ -0,0 +1,249 @@
+import datetime
+import heapq
+import json
+import logging
+import os
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from api_client import PolygonAPIClient
+from config import Config
+from db_handler import SingleStoreDBHandler
+from main import build_api_client, build_pipeline, setup_logging
+from metrics import start_metrics_server, write_run_report
+from pipeline import IngestionPipeline, TICKER_FETCHERS, fetch_ticker_news, flatten_fundamentals
+from utils import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# News is not per ticker; it is scheduled under this placeholder.
+NEWS_TICKER = '*'
+
+
+@dataclass(order=True)
+class ScheduledFetch:
+    due: float
+    priority: int
+    ticker: str = field(compare=False)
+    endpoint: str = field(compare=False)
+
+    @property
+    def key(self) -> str:
+        return f"{self.endpoint}:{self.ticker}"
+
+
+class RefreshScheduler:
+    """
+    Keeps every (ticker, endpoint) pair fresh on its own cadence.
+
+    Work sits in a heap of (next_due, priority, ticker, endpoint). Tickers
+    that traded within ``boost_window`` are refreshed ``boost_factor`` times
+    as often and win ties for the same due time. Records go to the
+    pipeline's writer stage. So API usage follows the cadences rather than
+    spiking on full runs. Pairs with no saved due time start at a random
+    point within their first cadence, so a cold start does not fetch the
+    whole universe at once. The next-due times, including those of fetches
+    still in flight, are saved to ``state_path`` on shutdown, so a restart
+    resumes the schedule instead of refetching everything.
+    """
+
+    def __init__(self, api_client: PolygonAPIClient, db_handler: SingleStoreDBHandler,
+                 pipeline: IngestionPipeline, cadences: Dict[str, float], workers: int,
+                 state_path: str, boost_window: int, boost_factor: float, universe_sync_interval: float):
+        self.api_client = api_client
+        self.db_handler = db_handler
+        self.pipeline = pipeline
+        self.cadences = cadences
+        self.workers = workers
+        self.state_path = state_path
+        self.boost_window = boost_window
+        self.boost_factor = boost_factor
+        self.universe_sync_interval = universe_sync_interval
+        self.condition = threading.Condition()
+        self.heap: List[ScheduledFetch] = []
+        self.scheduled: Set[str] = set()
+        self.in_flight: Dict[str, ScheduledFetch] = {}
+        self.tickers: Set[str] = set()
+        self.boosted: Set[str] = set()
+        self.saved_due: Dict[str, float] = {}
+        self.stop_event = threading.Event()
+        self.fetches = 0
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                self.saved_due = json.load(f)
+            logger.info(f"Resuming {len(self.saved_due)} scheduled fetches from {self.state_path}")
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load scheduler state from {self.state_path}: {e}")
+
+    def save_state(self):
+        with self.condition:
+            state = {item.key: item.due for item in self.heap}
+            # Not in the heap until they are rescheduled; keep their old due time.
+            state.update((key, item.due) for key, item in self.in_flight.items())
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        logger.info(f"Saved {len(state)} scheduled fetches to {self.state_path}")
+
+    def _schedule(self, ticker: str, endpoint: str, due: float):
+        item = ScheduledFetch(due=due, priority=0 if ticker in self.boosted else 1, ticker=ticker, endpoint=endpoint)
+        heapq.heappush(self.heap, item)
+        self.scheduled.add(item.key)
+        self.condition.notify()
+
+    def _initial_due(self, key: str, endpoint: str, now: float) -> float:
+        if key in self.saved_due:
+            return self.saved_due[key]
+        return now + random.uniform(0, self.cadences[endpoint])
+
+    def sync_universe(self):
+        self.db_handler.refresh_ticker_universe()
+        tickers = set(self.db_handler.get_universe_tickers(active_only=Config.UNIVERSE_ACTIVE_ONLY))
+        boosted = set(self.db_handler.get_recently_traded_tickers(self.boost_window))
+        now = time.time()
+        with self.condition:
+            self.tickers = tickers
+            self.boosted = boosted
+            news_key = f"news:{NEWS_TICKER}"
+            if news_key not in self.scheduled and 'news' in self.cadences:
+                self._schedule(NEWS_TICKER, 'news', self._initial_due(news_key, 'news', now))
+            for ticker in tickers:
+                for endpoint in TICKER_FETCHERS:
+                    key = f"{endpoint}:{ticker}"
+                    if key not in self.scheduled:
+                        self._schedule(ticker, endpoint, self._initial_due(key, endpoint, now))
+        logger.info(f"Universe synced: {len(tickers)} tickers, {len(boosted)} recently traded, "
+                    f"{len(self.heap)} scheduled fetches.")
+
+    def _next(self) -> Optional[ScheduledFetch]:
+        with self.condition:
+            while not self.stop_event.is_set():
+                if not self.heap:
+                    self.condition.wait(1.0)
+                    continue
+                wait = self.heap[0].due - time.time()
+                if wait > 0:
+                    self.condition.wait(min(wait, 1.0))
+                    continue
+                item = heapq.heappop(self.heap)
+                if item.ticker != NEWS_TICKER and item.ticker not in self.tickers:
+                    # Dropped from the universe since it was scheduled.
+                    self.scheduled.discard(item.key)
+                    continue
+                self.in_flight[item.key] = item
+                return item
+        return None
+
+    def _reschedule(self, item: ScheduledFetch):
+        cadence = self.cadences[item.endpoint]
+        with self.condition:
+            self.in_flight.pop(item.key, None)
+            if item.ticker in self.boosted:
+                cadence *= self.boost_factor
+            self._schedule(item.ticker, item.endpoint, time.time() + cadence)
+
+    def _fetch(self, item: ScheduledFetch):
+        if item.endpoint == 'news':
+            self.pipeline.put_records('ticker_news', fetch_ticker_news(self.api_client, limit=100))
+            return
+        records = TICKER_FETCHERS[item.endpoint](item.ticker, self.api_client)
+        self.pipeline.put_records(item.endpoint, records)
+        if item.endpoint == 'stock_fundamentals':
+            self.pipeline.put_records('fundamentals_metrics', flatten_fundamentals(records))
+
+    def _worker_loop(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            try:
+                self._fetch(item)
+                with self.condition:
+                    self.fetches += 1
+            except Exception as e:
+                logger.error(f"Exception while refreshing {item.key}: {e}")
+            finally:
+                self._reschedule(item)
+
+    def stop(self, *_):
+        logger.info("Shutdown requested; finishing in-flight fetches.")
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+
+    def run(self):
+        self.load_state()
+        self.sync_universe()
+        threads = [threading.Thread(target=self._worker_loop, name=f"refresh-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        while not self.stop_event.wait(self.universe_sync_interval):
+            try:
+                self.sync_universe()
+                self.save_state()
+            except Exception as e:
+                logger.error(f"Exception while syncing ticker universe: {e}")
+        for thread in threads:
+            thread.join()
+        self.save_state()
+
+
+def main():
+    setup_logging()
+    logger.info("Starting continuous ingestion daemon.")
+    if Config.METRICS_PORT:
+        start_metrics_server(Config.METRICS_PORT)
+
+    # The schedule decides when data is refreshed; cached responses with TTLs
+    # longer than a cadence would turn those refreshes into stale reads.
+    api_client, cache, _ = build_api_client(RateLimiter(Config.RATE_LIMIT), record=False, use_cache=False)
+    db_handler = SingleStoreDBHandler(Config.DB_URL)
+    db_handler.create_tables()
+    # The scheduler's own workers fetch; the pipeline only runs the writer stage.
+    pipeline = build_pipeline(api_client, db_handler, fetch_workers=0)
+    pipeline.start()
+
+    scheduler = RefreshScheduler(
+        api_client,
+        db_handler,
+        pipeline,
+        cadences={
+            'news': Config.NEWS_REFRESH_SECONDS,
+            'ticker_events': Config.EVENTS_REFRESH_SECONDS,
+            'ticker_details': Config.DETAILS_REFRESH_SECONDS,
+            'related_companies': Config.RELATED_REFRESH_SECONDS,
+            'stock_fundamentals': Config.FUNDAMENTALS_REFRESH_SECONDS,
+        },
+        workers=Config.FETCH_WORKERS,
+        state_path=Config.DAEMON_STATE_PATH,
+        boost_window=Config.BOOST_WINDOW_SECONDS,
+        boost_factor=Config.BOOST_FACTOR,
+        universe_sync_interval=Config.UNIVERSE_SYNC_SECONDS,
+    )
+    signal.signal(signal.SIGINT, scheduler.stop)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    scheduler.run()
+
+    stats = {'pipeline': pipeline.close(), 'fetches': scheduler.fetches}
+    if cache:
+        stats['response_cache'] = cache.stats()
+        cache.close()
+    report_path = os.path.join(Config.RUN_REPORT_DIR,
+                               datetime.datetime.now().strftime("daemon_report_%Y%m%d_%H%M%S.json"))
+    write_run_report(report_path, **stats)
+    logger.info("Continuous ingestion daemon stopped.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 import singlestoredb as s2
 import logging
-from typing import Any, Dict, List
-from models import TickerEvent, TickerNews, TickerDetail, RelatedCompany, StockFundamental
-import json
+import re
+from typing import Any, Dict, List, Optional
+from models import TickerEvent, TickerNews, TickerDetail, RelatedCompany, StockFundamental, FundamentalMetric, to_rows
+from metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -14,37 +15,55 @@ class SingleStoreDBHandler:
         return s2.connect(self.db_url)
 
     def create_tables(self):
+        """
+        Create any missing tables, then migrate existing ones and backfill
+        news_tickers. Each step runs and commits on its own, so a failed
+        migration or backfill neither blocks table creation nor the other
+        step, and is simply retried on the next start.
+        """
         conn = self.create_connection()
-        cursor = conn.cursor()
         try:
-            self.create_ticker_events_table(cursor)
-            self.create_ticker_news_table(cursor)
-            self.create_ticker_details_table(cursor)
-            self.create_related_companies_table(cursor)
-            self.create_stock_fundamentals_table(cursor)
-            conn.commit()
-            logger.info("Tables created successfully.")
-        except Exception as e:
-            logger.error(f"Exception while creating tables: {e}")
+            for step in (self.create_all_tables, self.migrate_tables, self.backfill_news_tickers):
+                cursor = conn.cursor()
+                try:
+                    step(cursor)
+                    conn.commit()
+                except Exception as e:
+                    logger.error(f"Exception in {step.__name__}: {e}")
+                finally:
+                    cursor.close()
         finally:
             conn.close()
 
-    def create_ticker_events_table(self, cursor):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS ticker_events (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            ticker VARCHAR(32),
-            event_date DATE,
-            event_type VARCHAR(100),
+    def create_all_tables(self, cursor):
+        self.create_ticker_events_table(cursor)
+        self.create_ticker_news_table(cursor)
+        self.create_news_tickers_table(cursor)
+        self.create_ticker_details_table(cursor)
+        self.create_related_companies_table(cursor)
+        self.create_stock_fundamentals_table(cursor)
+        self.create_fundamentals_metrics_table(cursor)
+        self.create_ticker_universe_table(cursor)
+        logger.info("Tables created successfully.")
+
+    def create_ticker_events_table(self, cursor, table_name: str = 'ticker_events'):
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            ticker VARCHAR(32) NOT NULL,
+            event_date DATE NOT NULL,
+            event_type VARCHAR(100) NOT NULL,
             event_data JSON,
-            name VARCHAR(255)
+            name VARCHAR(255),
+            PRIMARY KEY (ticker, event_date, event_type),
+            SHARD KEY (ticker),
+            SORT KEY (ticker, event_date)
         );
         """
         cursor.execute(create_table_query)
 
-    def create_ticker_news_table(self, cursor):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS ticker_news (
+    def create_ticker_news_table(self, cursor, table_name: str = 'ticker_news'):
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
             id VARCHAR(512) PRIMARY KEY,
             article_url TEXT,
             amp_url TEXT,
@@ -56,14 +75,47 @@ class SingleStoreDBHandler:
             keywords JSON,
             image_url TEXT,
             publisher JSON,
-            related_insights JSON
+            related_insights JSON,
+            SHARD KEY (id),
+            SORT KEY (published_utc)
         );
         """
         cursor.execute(create_table_query)
 
-    def create_ticker_details_table(self, cursor):
+    def create_news_tickers_table(self, cursor):
         create_table_query = """
-        CREATE TABLE IF NOT EXISTS ticker_details (
+        CREATE TABLE IF NOT EXISTS news_tickers (
+            ticker VARCHAR(32) NOT NULL,
+            published_utc DATETIME,
+            news_id VARCHAR(512) NOT NULL,
+            PRIMARY KEY (ticker, news_id),
+            SHARD KEY (ticker),
+            SORT KEY (ticker, published_utc)
+        );
+        """
+        cursor.execute(create_table_query)
+
+    def backfill_news_tickers(self, cursor):
+        """
+        Populate news_tickers from the JSON tickers arrays of articles stored
+        before it existed. Once news_tickers has any rows this is a single
+        EXISTS probe, and the INSERT IGNORE makes a rerun harmless.
+        """
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM news_tickers)")
+        if cursor.fetchone()[0]:
+            logger.debug("news_tickers already populated; skipping the backfill.")
+            return
+        cursor.execute("""
+        INSERT IGNORE INTO news_tickers (ticker, published_utc, news_id)
+        SELECT TRIM(BOTH '"' FROM t.table_col), n.published_utc, n.id
+        FROM ticker_news n
+        JOIN TABLE(JSON_TO_ARRAY(n.tickers)) t
+        """)
+        logger.info(f"Backfilled {cursor.rowcount} news_tickers rows from ticker_news.")
+
+    def create_ticker_details_table(self, cursor, table_name: str = 'ticker_details'):
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
             ticker VARCHAR(32) PRIMARY KEY,
             name VARCHAR(512),
             market VARCHAR(50),
@@ -87,55 +139,269 @@ class SingleStoreDBHandler:
             list_date DATE,
             branding JSON,
             share_class_shares_outstanding BIGINT,
-            weighted_shares_outstanding BIGINT
+            weighted_shares_outstanding BIGINT,
+            SHARD KEY (ticker)
         );
         """
         cursor.execute(create_table_query)
 
-    def create_related_companies_table(self, cursor):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS related_companies (
+    def create_related_companies_table(self, cursor, table_name: str = 'related_companies'):
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
             stock_symbol VARCHAR(32),
             related_ticker VARCHAR(32),
-            PRIMARY KEY (stock_symbol, related_ticker)
+            PRIMARY KEY (stock_symbol, related_ticker),
+            SHARD KEY (stock_symbol)
         );
         """
         cursor.execute(create_table_query)
 
-    def create_stock_fundamentals_table(self, cursor):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS stock_fundamentals (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            ticker VARCHAR(32),
+    def create_stock_fundamentals_table(self, cursor, table_name: str = 'stock_fundamentals'):
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            ticker VARCHAR(32) NOT NULL,
             company_name VARCHAR(512),
             cik VARCHAR(32),
             start_date DATE,
             end_date DATE,
             filing_date DATE,
-            fiscal_period VARCHAR(10),
-            fiscal_year VARCHAR(10),
+            fiscal_period VARCHAR(10) NOT NULL,
+            fiscal_year VARCHAR(10) NOT NULL,
+            timeframe VARCHAR(16) NOT NULL,
             source_filing_url TEXT,
-            financials JSON
+            financials JSON,
+            PRIMARY KEY (ticker, fiscal_year, fiscal_period, timeframe),
+            SHARD KEY (ticker),
+            SORT KEY (ticker, end_date)
         );
         """
         cursor.execute(create_table_query)
 
-    def get_distinct_tickers(self) -> List[str]:
+    def create_fundamentals_metrics_table(self, cursor):
+        create_table_query = """
+        CREATE TABLE IF NOT EXISTS fundamentals_metrics (
+            ticker VARCHAR(32) NOT NULL,
+            fiscal_year VARCHAR(10) NOT NULL,
+            fiscal_period VARCHAR(10) NOT NULL,
+            timeframe VARCHAR(16) NOT NULL,
+            statement VARCHAR(64) NOT NULL,
+            metric VARCHAR(128) NOT NULL,
+            value DOUBLE,
+            unit VARCHAR(32),
+            label VARCHAR(255),
+            start_date DATE,
+            end_date DATE,
+            filing_date DATE,
+            PRIMARY KEY (ticker, fiscal_year, fiscal_period, timeframe, statement, metric),
+            SHARD KEY (ticker),
+            SORT KEY (metric, end_date)
+        );
+        """
+        cursor.execute(create_table_query)
+
+    def create_ticker_universe_table(self, cursor):
+        create_table_query = """
+        CREATE ROWSTORE TABLE IF NOT EXISTS ticker_universe (
+            ticker VARCHAR(32) NOT NULL,
+            first_seen DATETIME,
+            last_seen DATETIME,
+            active BOOLEAN NOT NULL DEFAULT TRUE,
+            PRIMARY KEY (ticker),
+            KEY (last_seen)
+        );
+        """
+        cursor.execute(create_table_query)
+
+    def has_column(self, cursor, table_name: str, column_name: str) -> bool:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+            (table_name, column_name)
+        )
+        return cursor.fetchone()[0] > 0
+
+    def has_keys(self, cursor, table_name: str, shard_key: str, sort_key: Optional[str] = None) -> bool:
+        """
+        Whether ``table_name`` declares the given SHARD KEY (and SORT KEY)
+        columns. A missing table counts as keyed, since it will be created so.
+        """
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+            (table_name,)
+        )
+        if cursor.fetchone()[0] == 0:
+            return True
+        cursor.execute(f"SHOW CREATE TABLE {table_name}")
+        ddl = re.sub(r'\s+', ' ', cursor.fetchone()[1].replace('`', ''))
+        keys = [('SHARD KEY', shard_key)] + ([('SORT KEY', sort_key)] if sort_key else [])
+        return all(re.search(rf"{kind} (\w+ )?\({re.escape(columns)}\)", ddl) for kind, columns in keys)
+
+    def migrate_tables(self, cursor):
+        """
+        Move tables created with the old AUTO_INCREMENT schema onto the keyed
+        schema. Each table is rebuilt next to the original keeping only the
+        newest row per natural key, then swapped in by rename. Tables that
+        already had their primary key but predate the SHARD/SORT keys are
+        copied as-is into a rebuilt table, since keys cannot be altered in place.
+        """
+        if self.has_column(cursor, 'ticker_events', 'id'):
+            self.rebuild_table(
+                cursor, 'ticker_events', self.create_ticker_events_table,
+                columns="ticker, event_date, event_type, event_data, name",
+                select="ticker, event_date, COALESCE(event_type, '') AS event_type, event_data, name",
+                partition="ticker, event_date, COALESCE(event_type, '')",
+                where="ticker IS NOT NULL AND event_date IS NOT NULL",
+            )
+        if self.has_column(cursor, 'stock_fundamentals', 'id'):
+            # The legacy table only ever held the default quarterly timeframe.
+            self.rebuild_table(
+                cursor, 'stock_fundamentals', self.create_stock_fundamentals_table,
+                columns="ticker, company_name, cik, start_date, end_date, filing_date, "
+                        "fiscal_period, fiscal_year, timeframe, source_filing_url, financials",
+                select="ticker, company_name, cik, start_date, end_date, filing_date, "
+                       "COALESCE(fiscal_period, '') AS fiscal_period, COALESCE(fiscal_year, '') AS fiscal_year, "
+                       "'quarterly' AS timeframe, source_filing_url, financials",
+                partition="ticker, COALESCE(fiscal_year, ''), COALESCE(fiscal_period, '')",
+                where="ticker IS NOT NULL",
+            )
+        if not self.has_keys(cursor, 'ticker_news', 'id', 'published_utc'):
+            columns = ", ".join(TickerNews.COLUMNS)
+            self.rebuild_table(cursor, 'ticker_news', self.create_ticker_news_table, columns=columns, select=columns)
+        if not self.has_keys(cursor, 'ticker_details', 'ticker'):
+            columns = ", ".join(TickerDetail.COLUMNS)
+            self.rebuild_table(cursor, 'ticker_details', self.create_ticker_details_table, columns=columns, select=columns)
+        if not self.has_keys(cursor, 'related_companies', 'stock_symbol'):
+            columns = ", ".join(RelatedCompany.COLUMNS)
+            self.rebuild_table(cursor, 'related_companies', self.create_related_companies_table,
+                               columns=columns, select=columns, where="stock_symbol IS NOT NULL")
+
+    def rebuild_table(self, cursor, table_name: str, create_table, columns: str, select: str,
+                      partition: Optional[str] = None, where: str = "TRUE"):
+        staging = f"{table_name}_keyed"
+        legacy = f"{table_name}_legacy"
+        logger.info(f"Migrating {table_name} to the keyed schema.")
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        create_table(cursor, staging)
+        if partition is None:
+            cursor.execute(f"INSERT IGNORE INTO {staging} ({columns}) SELECT {select} FROM {table_name} WHERE {where}")
+        else:
+            cursor.execute(f"""
+            INSERT INTO {staging} ({columns})
+            SELECT {columns} FROM (
+                SELECT {select},
+                       ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY id DESC) AS rn
+                FROM {table_name}
+                WHERE {where}
+            ) ranked
+            WHERE rn = 1
+            """)
+        cursor.execute(f"ALTER TABLE {table_name} RENAME TO {legacy}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {table_name}")
+        cursor.execute(f"DROP TABLE {legacy}")
+        logger.info(f"Migrated {table_name} to the keyed schema.")
+
+    def seed_ticker_universe(self):
+        """
+        Fill ticker_universe from the whole ``trades`` history. This scans
+        every trade, so it is a one-off run by ``seed_universe.py`` rather
+        than part of start-up; rerunning it only widens the seen range.
+        """
         conn = self.create_connection()
         cursor = conn.cursor()
         try:
-            query = "SELECT DISTINCT ticker FROM trades;"
+            logger.info("Seeding ticker_universe from trades.")
+            cursor.execute("""
+            INSERT INTO ticker_universe (ticker, first_seen, last_seen, active)
+            SELECT ticker, MIN(localTS), MAX(localTS), TRUE
+            FROM trades
+            GROUP BY ticker
+            ON DUPLICATE KEY UPDATE
+            first_seen=LEAST(COALESCE(first_seen, VALUES(first_seen)), VALUES(first_seen)),
+            last_seen=GREATEST(COALESCE(last_seen, VALUES(last_seen)), VALUES(last_seen))
+            """)
+            conn.commit()
+            logger.info(f"Seeded ticker_universe ({cursor.rowcount} rows touched from trades).")
+        except Exception as e:
+            logger.error(f"Exception while seeding ticker universe: {e}")
+        finally:
+            conn.close()
+
+    def refresh_ticker_universe(self):
+        """
+        Bring ticker_universe up to date without rescanning trade history.
+
+        Only ``live_trades`` rows newer than their own ticker's ``last_seen``
+        (or of tickers not in the universe yet) are aggregated, so a ticker
+        that lags the others is not skipped. Tickers that only appear in the
+        older ``trades`` history are added by ``seed_ticker_universe``. The
+        active flag follows ``ticker_details``.
+        """
+        conn = self.create_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+            INSERT INTO ticker_universe (ticker, first_seen, last_seen, active)
+            SELECT t.ticker, MIN(t.localTS), MAX(t.localTS), TRUE
+            FROM live_trades t
+            LEFT JOIN ticker_universe u ON u.ticker = t.ticker
+            WHERE u.ticker IS NULL OR u.last_seen IS NULL OR t.localTS > u.last_seen
+            GROUP BY t.ticker
+            ON DUPLICATE KEY UPDATE
+            last_seen=GREATEST(COALESCE(last_seen, VALUES(last_seen)), VALUES(last_seen))
+            """)
+            new_activity = cursor.rowcount
+
+            cursor.execute("""
+            UPDATE ticker_universe
+            JOIN ticker_details ON ticker_universe.ticker = ticker_details.ticker
+            SET ticker_universe.active = ticker_details.active
+            WHERE ticker_details.active IS NOT NULL
+            """)
+            conn.commit()
+            logger.info(f"Refreshed ticker_universe ({new_activity} rows touched from live_trades).")
+        except Exception as e:
+            logger.error(f"Exception while refreshing ticker universe: {e}")
+        finally:
+            conn.close()
+
+    def get_universe_tickers(self, active_only: bool = True) -> List[str]:
+        """Tickers from ticker_universe, most recently traded first."""
+        conn = self.create_connection()
+        cursor = conn.cursor()
+        try:
+            query = "SELECT ticker FROM ticker_universe"
+            if active_only:
+                query += " WHERE active"
+            query += " ORDER BY last_seen DESC"
             cursor.execute(query)
             tickers = [row[0] for row in cursor.fetchall()]
-            logger.info(f"Retrieved {len(tickers)} tickers from trades table.")
+            logger.info(f"Retrieved {len(tickers)} tickers from ticker_universe.")
             return tickers
         except Exception as e:
-            logger.error(f"Exception while retrieving tickers: {e}")
+            logger.error(f"Exception while retrieving ticker universe: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def get_recently_traded_tickers(self, window_seconds: int) -> List[str]:
+        """Tickers whose last trade in ticker_universe falls within the window."""
+        conn = self.create_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT ticker FROM ticker_universe WHERE last_seen >= NOW() - INTERVAL %s SECOND",
+                (window_seconds,)
+            )
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Exception while retrieving recently traded tickers: {e}")
             return []
         finally:
             conn.close()
 
-    def insert_ticker_events(self, events: List[TickerEvent]):
+    def insert_ticker_events(self, events: List[TickerEvent]) -> bool:
+        if not events:
+            return True
         conn = self.create_connection()
         cursor = conn.cursor()
         try:
@@ -143,26 +409,23 @@ class SingleStoreDBHandler:
             INSERT INTO ticker_events (ticker, event_date, event_type, event_data, name)
             VALUES (%s, %s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE
-            event_type=VALUES(event_type),
             event_data=VALUES(event_data),
             name=VALUES(name)
             """
-            for event in events:
-                cursor.execute(insert_query, (
-                    event.ticker,
-                    event.event_date,
-                    event.event_type,
-                    json.dumps(event.event_data),
-                    event.name
-                ))
-            conn.commit()
+            with metrics.timed_write('ticker_events', len(events)):
+                cursor.executemany(insert_query, to_rows(events))
+                conn.commit()
             logger.info(f"Inserted {len(events)} ticker events.")
+            return True
         except Exception as e:
             logger.error(f"Exception while inserting ticker events: {e}")
+            return False
         finally:
             conn.close()
 
-    def insert_ticker_news(self, news_list: List[TickerNews]):
+    def insert_ticker_news(self, news_list: List[TickerNews]) -> bool:
+        if not news_list:
+            return True
         conn = self.create_connection()
         cursor = conn.cursor()
         try:
@@ -182,29 +445,29 @@ class SingleStoreDBHandler:
             publisher=VALUES(publisher),
             related_insights=VALUES(related_insights)
             """
-            for news in news_list:
-                cursor.execute(insert_query, (
-                    news.id,
-                    news.article_url,
-                    news.amp_url,
-                    news.title,
-                    news.author,
-                    news.published_utc,
-                    json.dumps(news.tickers),
-                    news.description,
-                    json.dumps(news.keywords),
-                    news.image_url,
-                    json.dumps(news.publisher),
-                    json.dumps(news.related_insights)
-                ))
-            conn.commit()
+            with metrics.timed_write('ticker_news', len(news_list)):
+                cursor.executemany(insert_query, to_rows(news_list))
+                mappings = [(ticker, news.published_utc, news.id)
+                            for news in news_list for ticker in dict.fromkeys(news.tickers or []) if ticker]
+                if mappings:
+                    cursor.executemany("""
+                    INSERT INTO news_tickers (ticker, published_utc, news_id)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                    published_utc=VALUES(published_utc)
+                    """, mappings)
+                conn.commit()
             logger.info(f"Inserted {len(news_list)} news articles.")
+            return True
         except Exception as e:
             logger.error(f"Exception while inserting ticker news: {e}")
+            return False
         finally:
             conn.close()
 
-    def insert_ticker_details(self, details: TickerDetail):
+    def insert_ticker_details(self, details_list: List[TickerDetail]) -> bool:
+        if not details_list:
+            return True
         conn = self.create_connection()
         cursor = conn.cursor()
         try:
@@ -212,10 +475,7 @@ class SingleStoreDBHandler:
             INSERT INTO ticker_details (ticker, name, market, locale, primary_exchange, type, active, currency_name,
             cik, composite_figi, share_class_figi, market_cap, phone_number, address, description, sic_code, sic_description,
             ticker_root, homepage_url, total_employees, list_date, branding, share_class_shares_outstanding, weighted_shares_outstanding)
-            VALUES (%(ticker)s, %(name)s, %(market)s, %(locale)s, %(primary_exchange)s, %(type)s, %(active)s, %(currency_name)s,
-            %(cik)s, %(composite_figi)s, %(share_class_figi)s, %(market_cap)s, %(phone_number)s, %(address)s, %(description)s,
-            %(sic_code)s, %(sic_description)s, %(ticker_root)s, %(homepage_url)s, %(total_employees)s, %(list_date)s, %(branding)s,
-            %(share_class_shares_outstanding)s, %(weighted_shares_outstanding)s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE
             name=VALUES(name),
             market=VALUES(market),
@@ -241,41 +501,20 @@ class SingleStoreDBHandler:
             share_class_shares_outstanding=VALUES(share_class_shares_outstanding),
             weighted_shares_outstanding=VALUES(weighted_shares_outstanding)
             """
-            data = {
-                'ticker': details.ticker,
-                'name': details.name,
-                'market': details.market,
-                'locale': details.locale,
-                'primary_exchange': details.primary_exchange,
-                'type': details.type,
-                'active': details.active,
-                'currency_name': details.currency_name,
-                'cik': details.cik,
-                'composite_figi': details.composite_figi,
-                'share_class_figi': details.share_class_figi,
-                'market_cap': details.market_cap,
-                'phone_number': details.phone_number,
-                'address': json.dumps(details.address),
-                'description': details.description,
-                'sic_code': details.sic_code,
-                'sic_description': details.sic_description,
-                'ticker_root': details.ticker_root,
-                'homepage_url': details.homepage_url,
-                'total_employees': details.total_employees,
-                'list_date': details.list_date,
-                'branding': json.dumps(details.branding),
-                'share_class_shares_outstanding': details.share_class_shares_outstanding,
-                'weighted_shares_outstanding': details.weighted_shares_outstanding,
-            }
-            cursor.execute(insert_query, data)
-            conn.commit()
-            logger.info(f"Inserted ticker details for {details.ticker}.")
+            with metrics.timed_write('ticker_details', len(details_list)):
+                cursor.executemany(insert_query, to_rows(details_list))
+                conn.commit()
+            logger.info(f"Inserted ticker details for {len(details_list)} tickers.")
+            return True
         except Exception as e:
-            logger.error(f"Exception while inserting ticker details for {details.ticker}: {e}")
+            logger.error(f"Exception while inserting ticker details: {e}")
+            return False
         finally:
             conn.close()
 
-    def insert_related_companies(self, related_companies: List[RelatedCompany]):
+    def insert_related_companies(self, related_companies: List[RelatedCompany]) -> bool:
+        if not related_companies:
+            return True
         conn = self.create_connection()
         cursor = conn.cursor()
         try:
@@ -285,42 +524,72 @@ class SingleStoreDBHandler:
             ON DUPLICATE KEY UPDATE
             related_ticker=VALUES(related_ticker)
             """
-            for rc in related_companies:
-                cursor.execute(insert_query, (rc.stock_symbol, rc.related_ticker))
-            conn.commit()
+            with metrics.timed_write('related_companies', len(related_companies)):
+                cursor.executemany(insert_query, to_rows(related_companies))
+                conn.commit()
             logger.info(f"Inserted {len(related_companies)} related companies.")
+            return True
         except Exception as e:
             logger.error(f"Exception while inserting related companies: {e}")
+            return False
         finally:
             conn.close()
 
-    def insert_stock_fundamentals(self, fundamentals: List[StockFundamental]):
+    def insert_stock_fundamentals(self, fundamentals: List[StockFundamental]) -> bool:
+        if not fundamentals:
+            return True
         conn = self.create_connection()
         cursor = conn.cursor()
         try:
             insert_query = """
             INSERT INTO stock_fundamentals (ticker, company_name, cik, start_date, end_date, filing_date,
-            fiscal_period, fiscal_year, source_filing_url, financials)
-            VALUES (%(ticker)s, %(company_name)s, %(cik)s, %(start_date)s, %(end_date)s, %(filing_date)s,
-            %(fiscal_period)s, %(fiscal_year)s, %(source_filing_url)s, %(financials)s)
+            fiscal_period, fiscal_year, timeframe, source_filing_url, financials)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            company_name=VALUES(company_name),
+            cik=VALUES(cik),
+            start_date=VALUES(start_date),
+            end_date=VALUES(end_date),
+            filing_date=VALUES(filing_date),
+            source_filing_url=VALUES(source_filing_url),
+            financials=VALUES(financials)
             """
-            for fundamental in fundamentals:
-                data = {
-                    'ticker': fundamental.ticker,
-                    'company_name': fundamental.company_name,
-                    'cik': fundamental.cik,
-                    'start_date': fundamental.start_date,
-                    'end_date': fundamental.end_date,
-                    'filing_date': fundamental.filing_date,
-                    'fiscal_period': fundamental.fiscal_period,
-                    'fiscal_year': fundamental.fiscal_year,
-                    'source_filing_url': fundamental.source_filing_url,
-                    'financials': json.dumps(fundamental.financials),
-                }
-                cursor.execute(insert_query, data)
-            conn.commit()
-            logger.info(f"Inserted {len(fundamentals)} stock fundamentals for {fundamental.ticker}.")
+            with metrics.timed_write('stock_fundamentals', len(fundamentals)):
+                cursor.executemany(insert_query, to_rows(fundamentals))
+                conn.commit()
+            logger.info(f"Inserted {len(fundamentals)} stock fundamentals.")
+            return True
         except Exception as e:
             logger.error(f"Exception while inserting stock fundamentals: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def insert_fundamentals_metrics(self, fundamentals_metrics: List[FundamentalMetric]) -> bool:
+        if not fundamentals_metrics:
+            return True
+        conn = self.create_connection()
+        cursor = conn.cursor()
+        try:
+            insert_query = """
+            INSERT INTO fundamentals_metrics (ticker, fiscal_year, fiscal_period, timeframe, statement, metric,
+            value, unit, label, start_date, end_date, filing_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            value=VALUES(value),
+            unit=VALUES(unit),
+            label=VALUES(label),
+            start_date=VALUES(start_date),
+            end_date=VALUES(end_date),
+            filing_date=VALUES(filing_date)
+            """
+            with metrics.timed_write('fundamentals_metrics', len(fundamentals_metrics)):
+                cursor.executemany(insert_query, to_rows(fundamentals_metrics))
+                conn.commit()
+            logger.info(f"Inserted {len(fundamentals_metrics)} fundamentals metrics.")
+            return True
+        except Exception as e:
+            logger.error(f"Exception while inserting fundamentals metrics: {e}")
+            return False
         finally:
             conn.close()
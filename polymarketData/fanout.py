@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+from utils import limiter_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies per endpoint."""
+
+    def __init__(self, window: int = 200):
+        self.lock = threading.Lock()
+        self.samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, name: str, seconds: float):
+        with self.lock:
+            self.samples[name].append(seconds)
+
+    def percentile(self, name: str, pct: float, min_samples: int) -> Optional[float]:
+        with self.lock:
+            samples = sorted(self.samples[name])
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+
+class EndpointFanout:
+    """
+    Runs the independent endpoint calls for one ticker concurrently.
+
+    All tickers share one executor, so ``max_concurrency`` is a global cap on
+    in-flight Polygon requests; the API client's rate limiter remains the
+    shared rate budget. A call still running after the endpoint's
+    ``hedge_percentile`` latency gets one duplicate request and the first
+    attempt to finish wins. Hedges are limited to ``hedge_budget`` times the
+    number of primary calls so they cannot crowd out the rate budget, and are
+    skipped while ``rate_limiter`` has no spare capacity. Latencies exclude
+    time spent waiting for the limiter, so a throttled run does not look
+    like a slow endpoint.
+    """
+
+    def __init__(self, max_concurrency: int, hedge_percentile: float, hedge_min_samples: int,
+                 hedge_budget: float, hedge_min_delay: float, rate_limiter=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='endpoint')
+        self.latencies = LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_budget = hedge_budget
+        self.hedge_min_delay = hedge_min_delay
+        self.rate_limiter = rate_limiter
+        self.lock = threading.Lock()
+        self.primary_calls = 0
+        self.hedged_calls = 0
+        self.hedge_wins = 0
+        self.hedges_throttled = 0
+
+    def _timed(self, name: str, fn: Callable[[], Any]) -> Any:
+        waited = limiter_wait_seconds()
+        start = time.monotonic()
+        result = fn()
+        queued = limiter_wait_seconds() - waited
+        self.latencies.record(name, time.monotonic() - start - queued)
+        return result
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        threshold = self.latencies.percentile(name, self.hedge_percentile, self.hedge_min_samples)
+        if threshold is None:
+            return None
+        return max(threshold, self.hedge_min_delay)
+
+    def _take_hedge_slot(self) -> bool:
+        with self.lock:
+            # A hedge would only queue behind the primary in the limiter.
+            if self.rate_limiter is not None and not self.rate_limiter.has_capacity():
+                self.hedges_throttled += 1
+                return False
+            if self.hedged_calls >= self.hedge_budget * self.primary_calls:
+                return False
+            self.hedged_calls += 1
+            return True
+
+    def run(self, calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        start = time.monotonic()
+        with self.lock:
+            self.primary_calls += len(calls)
+        attempts: Dict[str, List[Future]] = {}
+        owners: Dict[Future, str] = {}
+        deadlines: Dict[str, float] = {}
+        for name, fn in calls.items():
+            future = self.executor.submit(self._timed, name, fn)
+            attempts[name] = [future]
+            owners[future] = name
+            delay = self._hedge_delay(name)
+            if delay is not None:
+                deadlines[name] = start + delay
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        pending = set(owners)
+        while len(results) + len(errors) < len(calls):
+            now = time.monotonic()
+            timeout = min((d - now for d in deadlines.values()), default=None)
+            done, pending = wait(pending, timeout=max(0.0, timeout) if timeout is not None else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                name = owners[future]
+                if name in results:
+                    continue
+                if future.exception() is not None:
+                    # Only give up once every attempt for this endpoint has failed.
+                    if all(f.done() for f in attempts[name]):
+                        errors[name] = future.exception()
+                        deadlines.pop(name, None)
+                    continue
+                results[name] = future.result()
+                errors.pop(name, None)
+                deadlines.pop(name, None)
+                if future is not attempts[name][0]:
+                    with self.lock:
+                        self.hedge_wins += 1
+            now = time.monotonic()
+            for name, deadline in list(deadlines.items()):
+                if deadline > now:
+                    continue
+                del deadlines[name]
+                if name in results or not self._take_hedge_slot():
+                    continue
+                logger.debug(f"Hedging slow {name} request")
+                future = self.executor.submit(self._timed, name, calls[name])
+                attempts[name].append(future)
+                owners[future] = name
+                pending.add(future)
+
+        if errors:
+            raise next(iter(errors.values()))
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'primary_calls': self.primary_calls,
+                'hedged_calls': self.hedged_calls,
+                'hedge_wins': self.hedge_wins,
+                'hedges_throttled': self.hedges_throttled,
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -1,11 +1,16 @@
 import logging
-import threading
 import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+from typing import Any, Dict, List
 from config import Config
 from api_client import PolygonAPIClient
+from cache import ResponseCache, parse_ttl_map
 from db_handler import SingleStoreDBHandler
-from models import TickerEvent, TickerNews, TickerDetail, RelatedCompany, StockFundamental
+from fanout import EndpointFanout
+from metrics import start_metrics_server, write_run_report
+from replay import ResponseArchive
+from pipeline import IngestionPipeline, fetch_ticker_news
+from sharding import run_sharded
 from utils import RateLimiter
 
 def setup_logging():
@@ -17,137 +22,92 @@ def setup_logging():
                             logging.StreamHandler()
                         ])
 
-def process_ticker(ticker: str, api_client: PolygonAPIClient, db_handler: SingleStoreDBHandler):
-    logger = logging.getLogger(__name__)
-    logger.info(f"Processing ticker: {ticker}")
-
-    # Fetch ticker events
-    events_data = api_client.get_ticker_events(ticker)
-    if events_data:
-        events = []
-        name = events_data.get('results', {}).get('name', '')
-        for event in events_data.get('results', {}).get('events', []):
-            ticker_event = TickerEvent(
-                ticker=event.get('ticker_change', {}).get('ticker', ticker),
-                event_date=event.get('date'),
-                event_type=event.get('type'),
-                event_data=event,
-                name=name
-            )
-            events.append(ticker_event)
-        db_handler.insert_ticker_events(events)
-
-    # Fetch ticker details
-    details_data = api_client.get_ticker_details(ticker)
-    if details_data:
-        ticker_detail = TickerDetail(
-            ticker=details_data.get('ticker'),
-            name=details_data.get('name'),
-            market=details_data.get('market'),
-            locale=details_data.get('locale'),
-            primary_exchange=details_data.get('primary_exchange'),
-            type=details_data.get('type'),
-            active=details_data.get('active'),
-            currency_name=details_data.get('currency_name'),
-            cik=details_data.get('cik'),
-            composite_figi=details_data.get('composite_figi'),
-            share_class_figi=details_data.get('share_class_figi'),
-            market_cap=details_data.get('market_cap'),
-            phone_number=details_data.get('phone_number'),
-            address=details_data.get('address'),
-            description=details_data.get('description'),
-            sic_code=details_data.get('sic_code'),
-            sic_description=details_data.get('sic_description'),
-            ticker_root=details_data.get('ticker_root'),
-            homepage_url=details_data.get('homepage_url'),
-            total_employees=details_data.get('total_employees'),
-            list_date=details_data.get('list_date'),
-            branding=details_data.get('branding'),
-            share_class_shares_outstanding=details_data.get('share_class_shares_outstanding'),
-            weighted_shares_outstanding=details_data.get('weighted_shares_outstanding'),
-        )
-        db_handler.insert_ticker_details(ticker_detail)
-
-    # Fetch related companies
-    related_companies_data = api_client.get_related_companies(ticker)
-    if related_companies_data:
-        related_companies = []
-        for related_ticker in related_companies_data:
-            rc = RelatedCompany(stock_symbol=ticker, related_ticker=related_ticker)
-            related_companies.append(rc)
-        db_handler.insert_related_companies(related_companies)
-
-    # Fetch stock fundamentals
-    fundamentals_data = api_client.get_stock_fundamentals(ticker)
-    if fundamentals_data:
-        fundamentals = []
-        for record in fundamentals_data:
-            fundamental = StockFundamental(
-                ticker=ticker,
-                company_name=record.get('company_name'),
-                cik=record.get('cik'),
-                start_date=record.get('start_date'),
-                end_date=record.get('end_date'),
-                filing_date=record.get('filing_date'),
-                fiscal_period=record.get('fiscal_period'),
-                fiscal_year=record.get('fiscal_year'),
-                source_filing_url=record.get('source_filing_url'),
-                financials=record.get('financials'),
-            )
-            fundamentals.append(fundamental)
-        db_handler.insert_stock_fundamentals(fundamentals)
+def build_api_client(rate_limiter, record: bool = True, use_cache: bool = True):
+    cache = None
+    if Config.CACHE_ENABLED and use_cache:
+        cache = ResponseCache(Config.CACHE_PATH,
+                              max_bytes=Config.CACHE_MAX_MB * 1024 * 1024,
+                              default_ttl=Config.CACHE_DEFAULT_TTL,
+                              ttls=parse_ttl_map(Config.CACHE_TTLS))
+    recorder = ResponseArchive(Config.RECORD_ARCHIVE) if Config.RECORD_ARCHIVE and record else None
+    api_client = PolygonAPIClient(Config.API_KEY, rate_limiter, cache=cache,
+                                  base_url=Config.BASE_URL, recorder=recorder)
+    return api_client, cache, recorder
+
+def build_fanout(rate_limiter=None):
+    if Config.ENDPOINT_CONCURRENCY <= 0:
+        return None
+    return EndpointFanout(Config.ENDPOINT_CONCURRENCY,
+                          hedge_percentile=Config.HEDGE_PERCENTILE,
+                          hedge_min_samples=Config.HEDGE_MIN_SAMPLES,
+                          hedge_budget=Config.HEDGE_BUDGET,
+                          hedge_min_delay=Config.HEDGE_MIN_DELAY,
+                          rate_limiter=rate_limiter)
+
+def build_pipeline(api_client, db_handler, fanout=None, fetch_workers=None):
+    return IngestionPipeline(
+        api_client,
+        db_handler,
+        fetch_workers=Config.FETCH_WORKERS if fetch_workers is None else fetch_workers,
+        write_workers=Config.WRITE_WORKERS,
+        queue_size=Config.QUEUE_SIZE,
+        batch_size=Config.WRITE_BATCH_SIZE,
+        flush_interval=Config.WRITE_FLUSH_INTERVAL,
+        report_interval=Config.QUEUE_REPORT_INTERVAL,
+        fanout=fanout,
+    )
+
+def ingest_tickers(tickers: List[str], rate_limiter, include_news: bool = True, record: bool = True) -> Dict[str, Any]:
+    """Run the fetch/write pipeline over ``tickers`` and return its run stats."""
+    api_client, cache, recorder = build_api_client(rate_limiter, record=record)
+    db_handler = SingleStoreDBHandler(Config.DB_URL)
+    fanout = build_fanout(rate_limiter)
+    pipeline = build_pipeline(api_client, db_handler, fanout)
+    pipeline.start()
+    for ticker in tickers:
+        pipeline.submit(ticker)
+
+    if include_news:
+        # Fetch ticker news; the writer stage batches it with everything else
+        pipeline.put_records('ticker_news', fetch_ticker_news(api_client, limit=100))
+    stats = {'pipeline': pipeline.close()}
+
+    if fanout:
+        stats['fanout'] = fanout.stats()
+        fanout.shutdown()
+    if cache:
+        stats['response_cache'] = cache.stats()
+        cache.close()
+    if recorder:
+        recorder.save()
+    return stats
 
 def main():
     setup_logging()
     logger = logging.getLogger(__name__)
     logger.info("Starting data ingestion process.")
+    if Config.METRICS_PORT:
+        start_metrics_server(Config.METRICS_PORT)
 
-    rate_limiter = RateLimiter(Config.RATE_LIMIT)
-    api_client = PolygonAPIClient(Config.API_KEY, rate_limiter)
     db_handler = SingleStoreDBHandler(Config.DB_URL)
-
     db_handler.create_tables()
-    tickers = db_handler.get_distinct_tickers()
+    db_handler.refresh_ticker_universe()
+    tickers = db_handler.get_universe_tickers(active_only=Config.UNIVERSE_ACTIVE_ONLY)
 
     if not tickers:
-        logger.error("No tickers found to process.")
+        logger.error("No tickers found to process. Run seed_universe.py to load them from the trades history.")
         return
 
-    max_workers = Config.MAX_WORKERS
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for ticker in tickers:
-            futures.append(executor.submit(process_ticker, ticker, api_client, db_handler))
-
-        for future in as_completed(futures):
-            try:
-                future.result()
-            except Exception as e:
-                logger.error(f"Exception occurred: {e}")
-
-    # Fetch and insert ticker news
-    news_data = api_client.get_ticker_news(limit=100)
-    if news_data:
-        news_list = []
-        for news_item in news_data:
-            news = TickerNews(
-                id=news_item.get('id'),
-                article_url=news_item.get('article_url'),
-                amp_url=news_item.get('amp_url'),
-                title=news_item.get('title'),
-                author=news_item.get('author'),
-                published_utc=news_item.get('published_utc'),
-                tickers=news_item.get('tickers', []),
-                description=news_item.get('description'),
-                keywords=news_item.get('keywords', []),
-                image_url=news_item.get('image_url'),
-                publisher=news_item.get('publisher', {}),
-                related_insights=news_item.get('insights', [])
-            )
-            news_list.append(news)
-        db_handler.insert_ticker_news(news_list)
+    if Config.INGEST_PROCESSES > 1:
+        if Config.RECORD_ARCHIVE:
+            logger.warning("RECORD_ARCHIVE is ignored when INGEST_PROCESSES > 1.")
+        stats = run_sharded(tickers, Config.INGEST_PROCESSES, ingest_tickers, Config.RATE_LIMIT)
+    else:
+        stats = ingest_tickers(tickers, RateLimiter(Config.RATE_LIMIT))
 
+    report_path = os.path.join(Config.RUN_REPORT_DIR,
+                               datetime.datetime.now().strftime("run_report_%Y%m%d_%H%M%S.json"))
+    write_run_report(report_path, tickers=len(tickers), **stats)
     logger.info("Data ingestion process completed.")
 
 if __name__ == '__main__':
@@ -0,0 +1,223 @@
+import json
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_TICKER_SEGMENT = re.compile(r'^(/v\w+/reference/tickers/|/v1/related-companies/)[^/]+')
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Collapse per-ticker paths so every ticker shares one metric series."""
+    return _TICKER_SEGMENT.sub(r'\1{ticker}', endpoint)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound != float('inf') else self.buckets[-1]
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'buckets': list(self.buckets), 'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+    def merge(self, data: Dict[str, Any]):
+        for i, count in enumerate(data['counts']):
+            self.counts[i] += count
+        self.sum += data['sum']
+        self.count += data['count']
+
+
+class Metrics:
+    """Thread-safe counters and latency histograms for one ingestion run."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start an empty registry, e.g. in a freshly started worker process."""
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timed_write(self, table: str, rows: int):
+        """Record latency, rows and error class of one bulk write; exceptions propagate."""
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.inc('db_errors', table=table, error=type(e).__name__)
+            raise
+        finally:
+            self.observe('db_write_seconds', time.monotonic() - start, table=table)
+        self.inc('db_writes', table=table)
+        self.inc('db_rows_written', rows, table=table)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in self.counters.items()],
+                'histograms': [{'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                               for (name, labels), histogram in self.histograms.items()],
+            }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Fold a snapshot taken in another process into this registry."""
+        for counter in snapshot['counters']:
+            self.inc(counter['name'], counter['value'], **counter['labels'])
+        with self.lock:
+            for data in snapshot['histograms']:
+                key = (data['name'], tuple(sorted(data['labels'].items())))
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(data['buckets'])
+                histogram.merge(data)
+
+    def report(self) -> Dict[str, Any]:
+        """Group the raw series into a per-endpoint / per-table run summary."""
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        tables: Dict[str, Dict[str, Any]] = {}
+
+        def section(group: Dict[str, Dict[str, Any]], key: str) -> Dict[str, Any]:
+            return group.setdefault(key, {'errors': {}})
+
+        with self.lock:
+            counters = list(self.counters.items())
+            histograms = list(self.histograms.items())
+        for (name, labels), value in counters:
+            labels = dict(labels)
+            if name.startswith('api_'):
+                entry = section(endpoints, labels['endpoint'])
+                if name == 'api_responses':
+                    entry.setdefault('status', {})[labels['status']] = int(value)
+                elif name == 'api_errors':
+                    entry['errors'][labels['error']] = int(value)
+                else:
+                    entry[name[len('api_'):]] = value
+            elif name.startswith('db_'):
+                entry = section(tables, labels['table'])
+                if name == 'db_errors':
+                    entry['errors'][labels['error']] = int(value)
+                else:
+                    entry[name[len('db_'):]] = int(value)
+        for (name, labels), histogram in histograms:
+            labels = dict(labels)
+            latency = {
+                'count': histogram.count,
+                'mean': histogram.sum / histogram.count if histogram.count else None,
+                'p50': histogram.quantile(0.50),
+                'p95': histogram.quantile(0.95),
+                'p99': histogram.quantile(0.99),
+            }
+            if name == 'api_request_seconds':
+                section(endpoints, labels['endpoint'])['latency_seconds'] = latency
+            elif name == 'db_write_seconds':
+                section(tables, labels['table'])['latency_seconds'] = latency
+        return {
+            'started_at': self.started_at,
+            'duration_seconds': time.time() - self.started_at,
+            'endpoints': endpoints,
+            'tables': tables,
+        }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def fmt(labels: Dict[str, str]) -> str:
+            if not labels:
+                return ''
+            inner = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+            return '{' + inner + '}'
+
+        snapshot = self.snapshot()
+        for counter in snapshot['counters']:
+            lines.append(f"polymarket_{counter['name']}_total{fmt(counter['labels'])} {counter['value']}")
+        for data in snapshot['histograms']:
+            name = f"polymarket_{data['name']}"
+            cumulative = 0
+            for bound, count in zip(data['buckets'] + ['+Inf'], data['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{fmt(dict(data['labels'], le=str(bound)))} {cumulative}")
+            lines.append(f"{name}_sum{fmt(data['labels'])} {data['sum']}")
+            lines.append(f"{name}_count{fmt(data['labels'])} {data['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def write_run_report(path: str, **extra: Any) -> Dict[str, Any]:
+    report = metrics.report()
+    report.update(extra)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    logger.info(f"Run report written to {path}: {json.dumps(report, default=str)}")
+    return report
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` in Prometheus text format from a daemon thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Serving Prometheus metrics on port {port}")
+    return server
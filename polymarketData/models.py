@@ -1,16 +1,84 @@
+import json
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+    JSON_ENCODER = 'orjson'
+
+    def dumps(value: Any) -> str:
+        return orjson.dumps(value).decode('utf-8')
+except ImportError:  # orjson is an optional speedup
+    JSON_ENCODER = 'json'
+    _encoder = json.JSONEncoder(separators=(',', ':'))
+
+    def dumps(value: Any) -> str:
+        return _encoder.encode(value)
+
+
+class Row:
+    """
+    Base for models written to SingleStore. ``COLUMNS`` lists the table
+    columns in insert order (matching the field names) and ``JSON_COLUMNS``
+    the ones stored as JSON.
+    """
+    __slots__ = ()
+    COLUMNS: ClassVar[Tuple[str, ...]] = ()
+    JSON_COLUMNS: ClassVar[Tuple[str, ...]] = ()
+
+
+def to_rows(records: Sequence[Row]) -> List[Tuple[Any, ...]]:
+    """
+    Convert records of one model into DB parameter tuples in ``COLUMNS``
+    order, JSON-encoding every JSON column of the batch in one pass.
+    """
+    if not records:
+        return []
+    cls = type(records[0])
+    getter = attrgetter(*cls.COLUMNS)
+    if not cls.JSON_COLUMNS:
+        return [getter(record) for record in records]
+    positions = [cls.COLUMNS.index(column) for column in cls.JSON_COLUMNS]
+    rows = []
+    for record in records:
+        row = list(getter(record))
+        for i in positions:
+            row[i] = dumps(row[i])
+        rows.append(tuple(row))
+    return rows
+
+
+@dataclass(slots=True)
+class TickerEvent(Row):
+    COLUMNS: ClassVar[Tuple[str, ...]] = ('ticker', 'event_date', 'event_type', 'event_data', 'name')
+    JSON_COLUMNS: ClassVar[Tuple[str, ...]] = ('event_data',)
 
-@dataclass
-class TickerEvent:
     ticker: str
     event_date: str
     event_type: str
     event_data: Dict[str, Any]
     name: str
 
-@dataclass
-class TickerNews:
+    @classmethod
+    def from_api(cls, event: Dict[str, Any], ticker: str, name: str) -> 'TickerEvent':
+        return cls(
+            (event.get('ticker_change') or {}).get('ticker', ticker),
+            event.get('date'),
+            event.get('type') or '',
+            event,
+            name,
+        )
+
+
+@dataclass(slots=True)
+class TickerNews(Row):
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'id', 'article_url', 'amp_url', 'title', 'author', 'published_utc', 'tickers',
+        'description', 'keywords', 'image_url', 'publisher', 'related_insights',
+    )
+    JSON_COLUMNS: ClassVar[Tuple[str, ...]] = ('tickers', 'keywords', 'publisher', 'related_insights')
+
     id: str
     article_url: str
     amp_url: str
@@ -24,8 +92,35 @@ class TickerNews:
     publisher: Dict[str, Any]
     related_insights: List[Dict[str, Any]]
 
-@dataclass
-class TickerDetail:
+    @classmethod
+    def from_api(cls, item: Dict[str, Any]) -> 'TickerNews':
+        get = item.get
+        return cls(
+            get('id'),
+            get('article_url'),
+            get('amp_url'),
+            get('title'),
+            get('author'),
+            get('published_utc'),
+            get('tickers', []),
+            get('description'),
+            get('keywords', []),
+            get('image_url'),
+            get('publisher', {}),
+            get('insights', []),
+        )
+
+
+@dataclass(slots=True)
+class TickerDetail(Row):
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'ticker', 'name', 'market', 'locale', 'primary_exchange', 'type', 'active', 'currency_name',
+        'cik', 'composite_figi', 'share_class_figi', 'market_cap', 'phone_number', 'address',
+        'description', 'sic_code', 'sic_description', 'ticker_root', 'homepage_url', 'total_employees',
+        'list_date', 'branding', 'share_class_shares_outstanding', 'weighted_shares_outstanding',
+    )
+    JSON_COLUMNS: ClassVar[Tuple[str, ...]] = ('address', 'branding')
+
     ticker: str
     name: str
     market: str
@@ -51,13 +146,28 @@ class TickerDetail:
     share_class_shares_outstanding: int
     weighted_shares_outstanding: int
 
-@dataclass
-class RelatedCompany:
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> 'TickerDetail':
+        # Every column maps 1:1 onto a key of the Polygon payload.
+        return cls(*map(data.get, cls.COLUMNS))
+
+
+@dataclass(slots=True)
+class RelatedCompany(Row):
+    COLUMNS: ClassVar[Tuple[str, ...]] = ('stock_symbol', 'related_ticker')
+
     stock_symbol: str
     related_ticker: str
 
-@dataclass
-class StockFundamental:
+
+@dataclass(slots=True)
+class StockFundamental(Row):
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'ticker', 'company_name', 'cik', 'start_date', 'end_date', 'filing_date',
+        'fiscal_period', 'fiscal_year', 'timeframe', 'source_filing_url', 'financials',
+    )
+    JSON_COLUMNS: ClassVar[Tuple[str, ...]] = ('financials',)
+
     ticker: str
     company_name: str
     cik: str
@@ -66,5 +176,46 @@ class StockFundamental:
     filing_date: str
     fiscal_period: str
     fiscal_year: str
+    timeframe: str
     source_filing_url: str
     financials: Dict[str, Any]
+
+    @classmethod
+    def from_api(cls, record: Dict[str, Any], ticker: str, timeframe: str) -> 'StockFundamental':
+        get = record.get
+        return cls(
+            ticker,
+            get('company_name'),
+            get('cik'),
+            get('start_date'),
+            get('end_date'),
+            get('filing_date'),
+            get('fiscal_period') or '',
+            get('fiscal_year') or '',
+            get('timeframe') or timeframe,
+            get('source_filing_url'),
+            get('financials'),
+        )
+
+
+@dataclass(slots=True)
+class FundamentalMetric(Row):
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'ticker', 'fiscal_year', 'fiscal_period', 'timeframe', 'statement', 'metric',
+        'value', 'unit', 'label', 'start_date', 'end_date', 'filing_date',
+    )
+    # VARCHAR widths of the free-text columns in fundamentals_metrics.
+    WIDTHS: ClassVar[Dict[str, int]] = {'statement': 64, 'metric': 128, 'unit': 32, 'label': 255}
+
+    ticker: str
+    fiscal_year: str
+    fiscal_period: str
+    timeframe: str
+    statement: str
+    metric: str
+    value: float
+    unit: Optional[str]
+    label: Optional[str]
+    start_date: str
+    end_date: str
+    filing_date: str
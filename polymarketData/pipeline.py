@@ -0,0 +1,295 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from api_client import PolygonAPIClient
+from db_handler import SingleStoreDBHandler
+from fanout import EndpointFanout
+from models import TickerEvent, TickerNews, TickerDetail, RelatedCompany, StockFundamental, FundamentalMetric
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def fetch_ticker_events(ticker: str, api_client: PolygonAPIClient) -> List[TickerEvent]:
+    events_data = api_client.get_ticker_events(ticker)
+    if not events_data:
+        return []
+    results = events_data.get('results', {})
+    name = results.get('name', '')
+    return [TickerEvent.from_api(event, ticker, name)
+            for event in results.get('events', []) if event.get('date')]
+
+
+def fetch_ticker_details(ticker: str, api_client: PolygonAPIClient) -> List[TickerDetail]:
+    details_data = api_client.get_ticker_details(ticker)
+    if not details_data:
+        return []
+    return [TickerDetail.from_api(details_data)]
+
+
+def fetch_related_companies(ticker: str, api_client: PolygonAPIClient) -> List[RelatedCompany]:
+    related_companies_data = api_client.get_related_companies(ticker)
+    if not related_companies_data:
+        return []
+    return [RelatedCompany(stock_symbol=ticker, related_ticker=related_ticker)
+            for related_ticker in related_companies_data]
+
+
+def fetch_stock_fundamentals(ticker: str, api_client: PolygonAPIClient,
+                             timeframe: str = 'quarterly') -> List[StockFundamental]:
+    fundamentals_data = api_client.get_stock_fundamentals(ticker, timeframe=timeframe)
+    if not fundamentals_data:
+        return []
+    return [StockFundamental.from_api(record, ticker, timeframe) for record in fundamentals_data]
+
+
+def _clip(value: Optional[str], column: str) -> Optional[str]:
+    width = FundamentalMetric.WIDTHS[column]
+    return value[:width] if isinstance(value, str) else value
+
+
+def flatten_fundamentals(fundamentals: List[StockFundamental]) -> List[FundamentalMetric]:
+    """
+    One row per reported line item, e.g. ``income_statement.revenues``, so
+    cross-sectional screens read a typed column instead of parsing JSON.
+    Labels and units are cut to their column widths. Items whose statement
+    or metric name (part of the primary key) would not fit are skipped, so
+    one odd filing cannot fail the batch it is written in.
+    """
+    widths = FundamentalMetric.WIDTHS
+    metrics = []
+    for fundamental in fundamentals:
+        for statement, items in (fundamental.financials or {}).items():
+            if not isinstance(items, dict):
+                continue
+            if len(statement) > widths['statement']:
+                logger.warning(f"Skipping {fundamental.ticker} statement with an overlong name: {statement[:80]}...")
+                continue
+            for metric, item in items.items():
+                if not isinstance(item, dict) or not isinstance(item.get('value'), (int, float)):
+                    continue
+                if len(metric) > widths['metric']:
+                    logger.warning(f"Skipping {fundamental.ticker} {statement} metric with an overlong name: {metric[:80]}...")
+                    continue
+                metrics.append(FundamentalMetric(
+                    ticker=fundamental.ticker,
+                    fiscal_year=fundamental.fiscal_year,
+                    fiscal_period=fundamental.fiscal_period,
+                    timeframe=fundamental.timeframe,
+                    statement=statement,
+                    metric=metric,
+                    value=float(item['value']),
+                    unit=_clip(item.get('unit'), 'unit'),
+                    label=_clip(item.get('label'), 'label'),
+                    start_date=fundamental.start_date,
+                    end_date=fundamental.end_date,
+                    filing_date=fundamental.filing_date,
+                ))
+    return metrics
+
+
+def fetch_ticker_news(api_client: PolygonAPIClient, limit: int = 100) -> List[TickerNews]:
+    news_data = api_client.get_ticker_news(limit=limit)
+    if not news_data:
+        return []
+    return [TickerNews.from_api(news_item) for news_item in news_data]
+
+
+# Per-ticker fetch stages, keyed by the table their records are written to.
+TICKER_FETCHERS: Dict[str, Callable[[str, PolygonAPIClient], List[Any]]] = {
+    'ticker_events': fetch_ticker_events,
+    'ticker_details': fetch_ticker_details,
+    'related_companies': fetch_related_companies,
+    'stock_fundamentals': fetch_stock_fundamentals,
+}
+
+
+def fetch_ticker(ticker: str, api_client: PolygonAPIClient,
+                 fanout: Optional[EndpointFanout] = None) -> Dict[str, List[Any]]:
+    logger.info(f"Fetching ticker: {ticker}")
+    if fanout is None:
+        records = {table: fetcher(ticker, api_client) for table, fetcher in TICKER_FETCHERS.items()}
+    else:
+        records = fanout.run({table: partial(fetcher, ticker, api_client) for table, fetcher in TICKER_FETCHERS.items()})
+    records['fundamentals_metrics'] = flatten_fundamentals(records['stock_fundamentals'])
+    return records
+
+
+class IngestionPipeline:
+    """
+    Fetch workers pull tickers and push model records onto a bounded queue.
+    Writer workers drain that queue, coalescing records from many tickers
+    into one bulk insert per table once ``batch_size`` rows are buffered or
+    ``flush_interval`` seconds have passed. A full record queue blocks the
+    fetchers, so slow writes apply backpressure instead of growing memory.
+    Only successful writes count towards ``bulk_writes`` and
+    ``records_flushed``; failed ones are counted in ``failed_writes``.
+    """
+
+    def __init__(self, api_client: PolygonAPIClient, db_handler: SingleStoreDBHandler,
+                 fetch_workers: int, write_workers: int, queue_size: int,
+                 batch_size: int, flush_interval: float, report_interval: float,
+                 fanout: Optional[EndpointFanout] = None):
+        self.api_client = api_client
+        self.db_handler = db_handler
+        self.fanout = fanout
+        self.fetch_workers = fetch_workers
+        self.write_workers = write_workers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.report_interval = report_interval
+        self.ticker_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.record_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.writers = {
+            'ticker_events': db_handler.insert_ticker_events,
+            'ticker_news': db_handler.insert_ticker_news,
+            'ticker_details': db_handler.insert_ticker_details,
+            'related_companies': db_handler.insert_related_companies,
+            'stock_fundamentals': db_handler.insert_stock_fundamentals,
+            'fundamentals_metrics': db_handler.insert_fundamentals_metrics,
+        }
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'tickers_fetched': 0,
+            'fetch_errors': 0,
+            'bulk_writes': 0,
+            'records_flushed': 0,
+            'failed_writes': 0,
+            'records_dropped': 0,
+            'max_ticker_queue_depth': 0,
+            'max_record_queue_depth': 0,
+        }
+        self.fetch_threads: List[threading.Thread] = []
+        self.write_threads: List[threading.Thread] = []
+        self.stop_event = threading.Event()
+        self.reporter = None
+
+    def start(self):
+        for i in range(self.fetch_workers):
+            thread = threading.Thread(target=self._fetch_loop, name=f"fetch-{i}", daemon=True)
+            thread.start()
+            self.fetch_threads.append(thread)
+        for i in range(self.write_workers):
+            thread = threading.Thread(target=self._write_loop, name=f"writer-{i}", daemon=True)
+            thread.start()
+            self.write_threads.append(thread)
+        self.reporter = threading.Thread(target=self._report_loop, name="queue-reporter", daemon=True)
+        self.reporter.start()
+
+    def submit(self, ticker: str):
+        self.ticker_queue.put(ticker)
+        self._record_depths()
+
+    def put_records(self, table: str, records: List[Any]):
+        if records:
+            self.record_queue.put((table, records))
+            self._record_depths()
+
+    def close(self) -> Dict[str, int]:
+        """Drain both stages, flush every writer buffer and return run stats."""
+        for _ in self.fetch_threads:
+            self.ticker_queue.put(_STOP)
+        for thread in self.fetch_threads:
+            thread.join()
+        for _ in self.write_threads:
+            self.record_queue.put(_STOP)
+        for thread in self.write_threads:
+            thread.join()
+        self.stop_event.set()
+        if self.reporter:
+            self.reporter.join()
+        logger.info(f"Ingestion pipeline finished: {self.stats}")
+        return dict(self.stats)
+
+    def run(self, tickers: Iterable[str]) -> Dict[str, int]:
+        self.start()
+        for ticker in tickers:
+            self.submit(ticker)
+        return self.close()
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {'ticker_queue': self.ticker_queue.qsize(), 'record_queue': self.record_queue.qsize()}
+
+    def _record_depths(self):
+        depths = self.queue_depths()
+        with self.stats_lock:
+            self.stats['max_ticker_queue_depth'] = max(self.stats['max_ticker_queue_depth'], depths['ticker_queue'])
+            self.stats['max_record_queue_depth'] = max(self.stats['max_record_queue_depth'], depths['record_queue'])
+
+    def _report_loop(self):
+        while not self.stop_event.wait(self.report_interval):
+            logger.info(f"Pipeline queue depths: {self.queue_depths()}")
+
+    def _fetch_loop(self):
+        while True:
+            ticker = self.ticker_queue.get()
+            if ticker is _STOP:
+                return
+            try:
+                for table, records in fetch_ticker(ticker, self.api_client, self.fanout).items():
+                    self.put_records(table, records)
+                with self.stats_lock:
+                    self.stats['tickers_fetched'] += 1
+            except Exception as e:
+                logger.error(f"Exception while fetching {ticker}: {e}")
+                with self.stats_lock:
+                    self.stats['fetch_errors'] += 1
+
+    def _write_loop(self):
+        buffers: Dict[str, List[Any]] = defaultdict(list)
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self.record_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(buffers)
+                return
+            if item is not None:
+                table, records = item
+                buffers[table].extend(records)
+                if len(buffers[table]) >= self.batch_size:
+                    self._flush_table(table, buffers)
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush(buffers)
+                last_flush = time.monotonic()
+
+    def _flush(self, buffers: Dict[str, List[Any]]):
+        for table in list(buffers):
+            self._flush_table(table, buffers)
+
+    def _flush_table(self, table: str, buffers: Dict[str, List[Any]]):
+        records = buffers.pop(table, None)
+        if records:
+            self._write(table, records)
+
+    def _write(self, table: str, records: List[Any]):
+        """
+        Write one batch. A failed batch is split in half and each half
+        retried, so a single bad row only drops itself rather than the
+        records of every other ticker coalesced into the same batch.
+        """
+        try:
+            ok = self.writers[table](records)
+        except Exception as e:
+            logger.error(f"Exception while writing {len(records)} records to {table}: {e}")
+            ok = False
+        with self.stats_lock:
+            if ok:
+                self.stats['bulk_writes'] += 1
+                self.stats['records_flushed'] += len(records)
+            else:
+                self.stats['failed_writes'] += 1
+                if len(records) == 1:
+                    self.stats['records_dropped'] += 1
+        if not ok and len(records) > 1:
+            middle = len(records) // 2
+            self._write(table, records[:middle])
+            self._write(table, records[middle:])
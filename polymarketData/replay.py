@@ -0,0 +1,178 @@
+import argparse
+import gzip
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+from cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+_DETAILS_PATH = re.compile(r'^/v3/reference/tickers/([^/]+)$')
+
+
+class ResponseArchive:
+    """
+    Polygon responses keyed like the response cache, stored as gzip'd JSON
+    lines. Recording is thread-safe; a later response for the same key
+    replaces the earlier one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'ResponseArchive':
+        archive = cls(path)
+        with gzip.open(path, 'rt') as f:
+            for line in f:
+                entry = json.loads(line)
+                archive.entries[make_cache_key(entry['endpoint'], entry['params'])] = entry
+        logger.info(f"Loaded {len(archive.entries)} recorded responses from {path}")
+        return archive
+
+    def record(self, endpoint: str, params: Dict[str, Any], body: bytes):
+        entry = {
+            'endpoint': endpoint,
+            'params': {k: v for k, v in params.items() if k != 'apiKey'},
+            'body': body.decode('utf-8'),
+        }
+        with self.lock:
+            self.entries[make_cache_key(endpoint, params)] = entry
+
+    def lookup(self, endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+        entry = self.entries.get(make_cache_key(endpoint, params))
+        return entry['body'] if entry else None
+
+    def tickers(self) -> List[str]:
+        tickers = set()
+        for entry in self.entries.values():
+            match = _DETAILS_PATH.match(entry['endpoint'])
+            if match:
+                tickers.add(match.group(1))
+        return sorted(tickers)
+
+    def save(self):
+        with self.lock:
+            entries = list(self.entries.values())
+        with gzip.open(self.path, 'wt') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':')))
+                f.write('\n')
+        logger.info(f"Saved {len(entries)} recorded responses to {self.path}")
+
+
+class StubServer:
+    """
+    Local HTTP server that replays an archive in place of api.polygon.io.
+
+    Every request waits ``latency_ms`` plus up to ``jitter_ms`` of uniform
+    jitter. It then fails with a 429 with probability ``rate_429``, or with
+    a 500 with probability ``error_rate``. Unknown requests get a 404.
+    """
+
+    def __init__(self, archive: ResponseArchive, port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, rate_429: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.archive = archive
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _roll(self) -> float:
+        with self.random_lock:
+            return self.random.random()
+
+    def _handler(self):
+        stub = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay = stub.latency_ms + stub.jitter_ms * stub._roll()
+                if delay:
+                    time.sleep(delay / 1000.0)
+                roll = stub._roll()
+                if roll < stub.rate_429:
+                    self._send(429, '{"status":"ERROR","error":"rate limited (stub)"}')
+                    return
+                if roll < stub.rate_429 + stub.error_rate:
+                    self._send(500, '{"status":"ERROR","error":"injected error (stub)"}')
+                    return
+                url = urlsplit(self.path)
+                body = stub.archive.lookup(url.path, dict(parse_qsl(url.query)))
+                if body is None:
+                    self._send(404, '{"status":"NOT_FOUND"}')
+                else:
+                    self._send(200, body)
+
+            def _send(self, status: int, body: str):
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return ReplayHandler
+
+    def start(self) -> 'StubServer':
+        self.thread = threading.Thread(target=self.server.serve_forever, name='stub-server', daemon=True)
+        self.thread.start()
+        logger.info(f"Replaying {len(self.archive.entries)} responses at {self.base_url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--archive', required=True, help='Recorded responses (.jsonl.gz)')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Probability of a 429 response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a 500 response')
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded Polygon responses locally.')
+    add_stub_arguments(parser)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    stub = StubServer(ResponseArchive.load(args.archive), port=args.port, latency_ms=args.latency_ms,
+                      jitter_ms=args.jitter_ms, rate_429=args.rate_429, error_rate=args.error_rate, seed=args.seed)
+    stub.start()
+    logger.info(f"Set POLYGON_BASE_URL={stub.base_url} to ingest against the stub.")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
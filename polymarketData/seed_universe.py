@@ -0,0 +1,23 @@
+import logging
+from config import Config
+from db_handler import SingleStoreDBHandler
+from main import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    One-off: add every ticker in the ``trades`` history to ticker_universe.
+    Ingestion keeps the universe current from ``live_trades`` on its own;
+    run this once on a new database, or after loading historical trades.
+    """
+    setup_logging()
+    db_handler = SingleStoreDBHandler(Config.DB_URL)
+    db_handler.create_tables()
+    db_handler.seed_ticker_universe()
+    logger.info(f"ticker_universe holds {len(db_handler.get_universe_tickers(active_only=False))} tickers.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import logging
+import multiprocessing
+import queue
+import zlib
+from typing import Any, Callable, Dict, List, Set
+from config import Config
+from metrics import metrics
+from utils import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Stats that describe a peak rather than a total are combined with max().
+# The response cache file is shared by every shard, so its size is one too.
+_PEAK_STATS = ('max_ticker_queue_depth', 'max_record_queue_depth', 'bytes')
+
+
+def shard_for(ticker: str, processes: int) -> int:
+    """Stable across runs and interpreters, unlike the salted built-in hash()."""
+    return zlib.crc32(ticker.encode('utf-8')) % processes
+
+
+def shard_tickers(tickers: List[str], processes: int) -> List[List[str]]:
+    shards: List[List[str]] = [[] for _ in range(processes)]
+    for ticker in tickers:
+        shards[shard_for(ticker, processes)].append(ticker)
+    return shards
+
+
+def _shard_worker(index: int, tickers: List[str], ingest: Callable[..., Dict[str, Any]],
+                  rate_limiter: SharedRateLimiter, results: multiprocessing.Queue):
+    logging.basicConfig(level=Config.LOG_LEVEL,
+                        format=f'%(asctime)s %(levelname)s [shard-{index} %(threadName)s] %(message)s')
+    metrics.reset()
+    try:
+        stats = ingest(tickers, rate_limiter, include_news=index == 0, record=False)
+        results.put((index, stats, metrics.snapshot(), None))
+    except Exception as e:
+        logger.exception(f"Shard {index} failed")
+        results.put((index, {}, metrics.snapshot(), repr(e)))
+
+
+def _combine(total: Dict[str, Any], stats: Dict[str, Any]):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            _combine(total.setdefault(key, {}), value)
+        elif key in _PEAK_STATS:
+            total[key] = max(total.get(key, 0), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def run_sharded(tickers: List[str], processes: int, ingest: Callable[..., Dict[str, Any]],
+                rate_limit: int, poll_seconds: float = 5.0) -> Dict[str, Any]:
+    """
+    Split ``tickers`` by hash across ``processes`` worker processes. Each
+    one runs ``ingest(tickers, rate_limiter, include_news=..., record=...)``.
+    They share a single API rate budget. Their stats and metrics are merged
+    into this process.
+
+    Workers are checked every ``poll_seconds`` while waiting for results.
+    One that exits without reporting (killed, out of memory, a crash in
+    C code) fails the run with a RuntimeError once the others finish.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    rate_limiter = SharedRateLimiter(rate_limit, ctx=ctx)
+    results = ctx.Queue()
+    workers = {}
+    for index, shard in enumerate(shard_tickers(tickers, processes)):
+        worker = ctx.Process(target=_shard_worker, name=f"ingest-shard-{index}",
+                             args=(index, shard, ingest, rate_limiter, results))
+        worker.start()
+        workers[index] = worker
+        logger.info(f"Started shard {index} with {len(shard)} tickers (pid {worker.pid}).")
+
+    combined: Dict[str, Any] = {'shard_failures': 0}
+    pending = dict(workers)
+    exited: Set[int] = set()
+    dead: List[int] = []
+    while pending:
+        try:
+            index, stats, snapshot, error = results.get(timeout=poll_seconds)
+        except queue.Empty:
+            # A worker flushes its result before exiting, so one that has been
+            # gone for a whole poll without reporting died.
+            for index in exited & pending.keys():
+                worker = pending.pop(index)
+                dead.append(index)
+                logger.error(f"Shard {index} (pid {worker.pid}) exited with code {worker.exitcode} "
+                             f"without reporting results.")
+            exited = {index for index, worker in pending.items() if worker.exitcode is not None}
+            continue
+        pending.pop(index, None)
+        metrics.merge(snapshot)
+        _combine(combined, stats)
+        if error:
+            combined['shard_failures'] += 1
+            logger.error(f"Shard {index} reported an error: {error}")
+    for worker in workers.values():
+        worker.join()
+    if dead:
+        raise RuntimeError(f"Ingest shards {sorted(dead)} died; their tickers were not fully ingested.")
+    return combined
@@ -0,0 +1,151 @@
+import sqlite3
+import pytest
+from unittest.mock import patch, MagicMock
+from requests.exceptions import ConnectionError
+from tenacity import wait_none
+from api_client import PolygonAPIClient
+from cache import ResponseCache, make_cache_key, parse_ttl_map
+from utils import RateLimiter
+
+
+def make_response(status_code, body=b'{"status":"OK"}', headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = body
+    response.headers = headers or {}
+    response.json.return_value = {"status": "OK"}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = ConnectionError(str(status_code))
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=1 << 20, default_ttl=60,
+                          ttls={"/v2/reference/news": 5})
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def client(cache):
+    return PolygonAPIClient("key", RateLimiter(1000), cache=cache, base_url="http://polygon.test")
+
+
+def test_parse_ttl_map_skips_malformed_entries():
+    assert parse_ttl_map("/v2/reference/news=60, bogus, /v3/=10") == {"/v2/reference/news": 60, "/v3/": 10}
+
+
+def test_cache_key_ignores_api_key_and_param_order():
+    assert make_cache_key("/x", {"a": 1, "b": 2, "apiKey": "k"}) == make_cache_key("/x", {"b": 2, "a": 1})
+
+
+def test_ttl_longest_prefix_wins(cache):
+    assert cache.ttl_for("/v2/reference/news") == 5
+    assert cache.ttl_for("/v3/reference/tickers/AAPL") == 60
+
+
+def test_entry_expires_after_ttl(cache):
+    with patch("cache.time.time", return_value=1000.0):
+        cache.store("/v2/reference/news", {"limit": 10}, b'{"status":"OK"}')
+    with patch("cache.time.time", return_value=1004.0):
+        assert cache.lookup("/v2/reference/news", {"limit": 10}).fresh
+    with patch("cache.time.time", return_value=1006.0):
+        # Without a validator there is nothing to revalidate, so it is a miss.
+        assert cache.lookup("/v2/reference/news", {"limit": 10}) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entry_with_etag_is_stale(cache):
+    with patch("cache.time.time", return_value=1000.0):
+        cache.store("/v2/reference/news", {}, b'{"status":"OK"}', etag='"v1"')
+    with patch("cache.time.time", return_value=1010.0):
+        cached = cache.lookup("/v2/reference/news", {})
+    assert not cached.fresh
+    assert cached.etag == '"v1"'
+    assert cache.stats()["stale"] == 1
+    assert cache.stats()["misses"] == 0
+
+
+def test_eviction_keeps_total_under_max_bytes(tmp_path):
+    cache = ResponseCache(str(tmp_path / "small.sqlite"), max_bytes=100, default_ttl=60)
+    for i in range(5):
+        cache.store(f"/item/{i}", {}, b'"' + b"x" * 38 + b'"')
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert stats["evictions"] == 3
+    assert cache.lookup("/item/0", {}) is None
+    assert cache.lookup("/item/4", {}) is not None
+    cache.close()
+
+
+def test_fresh_hit_skips_request(client, cache):
+    cache.store("/v2/reference/news", {}, b'{"status":"OK","cached":true}')
+    with patch("api_client.requests.get") as mock_get:
+        assert client.get("/v2/reference/news", {}) == {"status": "OK", "cached": True}
+    mock_get.assert_not_called()
+
+
+def test_304_revalidates_stale_entry(client, cache):
+    with patch("cache.time.time", return_value=1000.0):
+        cache.store("/v2/reference/news", {}, b'{"status":"OK","cached":true}', etag='"v1"')
+    with patch("api_client.requests.get", return_value=make_response(304)) as mock_get:
+        data = client.get("/v2/reference/news", {})
+    assert data == {"status": "OK", "cached": True}
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert cache.stats()["revalidations"] == 1
+    assert cache.lookup("/v2/reference/news", {}).fresh
+
+
+def test_304_without_cached_entry_refetches(client, cache):
+    responses = [make_response(304), make_response(200, headers={"ETag": '"v2"'})]
+    with patch("api_client.requests.get", side_effect=responses) as mock_get:
+        assert client.get("/v2/reference/news", {}) == {"status": "OK"}
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs["headers"] == {"Cache-Control": "no-cache"}
+    assert cache.lookup("/v2/reference/news", {}).etag == '"v2"'
+
+
+def test_retries_do_not_repeat_cache_lookup(client, cache):
+    responses = [make_response(503), make_response(200)]
+    with patch.object(PolygonAPIClient._fetch.retry, "wait", wait_none()), \
+            patch("api_client.requests.get", side_effect=responses) as mock_get:
+        assert client.get("/v2/reference/news", {}) == {"status": "OK"}
+    assert mock_get.call_count == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_locked_cache_is_retried(cache):
+    calls = []
+    original = cache._total_bytes
+
+    def locked_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return original()
+
+    with patch.object(cache, "_total_bytes", side_effect=locked_once), \
+            patch.object(ResponseCache.store.retry, "wait", wait_none()):
+        cache.store("/v2/reference/news", {}, b'{"status":"OK"}')
+    assert len(calls) == 2
+    assert cache.lookup("/v2/reference/news", {}).fresh
+
+
+def test_cache_failure_does_not_lose_the_response(client, cache):
+    with patch.object(cache, "lookup", side_effect=sqlite3.OperationalError("database is locked")), \
+            patch.object(cache, "store", side_effect=sqlite3.OperationalError("database is locked")), \
+            patch("api_client.requests.get", return_value=make_response(200)):
+        assert client.get("/v3/reference/tickers/AAPL", {}) == {"status": "OK"}
+
+
+def test_non_ok_body_is_not_cached(client, cache):
+    error = make_response(200, body=b'{"status":"ERROR","error":"Unknown API Key"}')
+    error.json.return_value = {"status": "ERROR", "error": "Unknown API Key"}
+    with patch("api_client.requests.get", side_effect=[error, make_response(200)]) as mock_get:
+        assert client.get("/v3/reference/tickers/AAPL", {})["status"] == "ERROR"
+        assert cache.lookup("/v3/reference/tickers/AAPL", {}) is None
+        assert client.get("/v3/reference/tickers/AAPL", {}) == {"status": "OK"}
+    assert mock_get.call_count == 2
+    assert cache.lookup("/v3/reference/tickers/AAPL", {}).fresh
@@ -0,0 +1,50 @@
+import json
+import time
+from unittest.mock import MagicMock
+from daemon import RefreshScheduler
+
+CADENCES = {'news': 60, 'ticker_events': 3600, 'ticker_details': 86400,
+            'related_companies': 86400, 'stock_fundamentals': 86400}
+
+
+def make_scheduler(tmp_path, tickers=("AAPL", "MSFT")):
+    db_handler = MagicMock()
+    db_handler.get_universe_tickers.return_value = list(tickers)
+    db_handler.get_recently_traded_tickers.return_value = []
+    return RefreshScheduler(MagicMock(), db_handler, MagicMock(), CADENCES, workers=1,
+                            state_path=str(tmp_path / "schedule.json"), boost_window=60,
+                            boost_factor=0.25, universe_sync_interval=60)
+
+
+def test_cold_start_spreads_fetches_over_first_cadence(tmp_path):
+    scheduler = make_scheduler(tmp_path, tickers=[f"T{i}" for i in range(50)])
+    start = time.time()
+    scheduler.sync_universe()
+    for item in scheduler.heap:
+        assert start <= item.due <= time.time() + CADENCES[item.endpoint]
+    details = [item.due for item in scheduler.heap if item.endpoint == 'ticker_details']
+    assert max(details) - min(details) > 3600
+
+
+def test_saved_due_times_are_resumed(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    scheduler.saved_due = {"ticker_details:AAPL": 123.0}
+    scheduler.sync_universe()
+    assert [item.due for item in scheduler.heap if item.key == "ticker_details:AAPL"] == [123.0]
+
+
+def test_save_state_keeps_in_flight_fetches(tmp_path):
+    scheduler = make_scheduler(tmp_path, tickers=["AAPL"])
+    scheduler.saved_due = {"ticker_events:AAPL": 0.0}
+    scheduler.sync_universe()
+    item = scheduler._next()
+    assert item.key == "ticker_events:AAPL"
+
+    scheduler.save_state()
+    with open(scheduler.state_path) as f:
+        state = json.load(f)
+    assert state["ticker_events:AAPL"] == 0.0
+    assert len(state) == len(scheduler.heap) + 1
+
+    scheduler._reschedule(item)
+    assert not scheduler.in_flight
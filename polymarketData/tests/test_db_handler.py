@@ -0,0 +1,132 @@
+from unittest.mock import MagicMock
+from db_handler import SingleStoreDBHandler
+from models import TickerNews
+
+NEWS_DDL = """CREATE TABLE `ticker_news` (
+  `id` varchar(512) NOT NULL,
+  `published_utc` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  SHARD KEY `__SHARDKEY` (`id`),
+  SORT KEY `published_utc` (`published_utc`)
+)"""
+
+LEGACY_NEWS_DDL = """CREATE TABLE `ticker_news` (
+  `id` varchar(512) NOT NULL,
+  `published_utc` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`)
+)"""
+
+
+def make_cursor(exists, ddl):
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [(1 if exists else 0,), ("ticker_news", ddl)]
+    return cursor
+
+
+def test_has_keys_matches_declared_keys():
+    handler = SingleStoreDBHandler("unused")
+    assert handler.has_keys(make_cursor(True, NEWS_DDL), "ticker_news", "id", "published_utc")
+    assert not handler.has_keys(make_cursor(True, NEWS_DDL), "ticker_news", "id", "title")
+
+
+def test_has_keys_flags_tables_created_before_keys():
+    handler = SingleStoreDBHandler("unused")
+    assert not handler.has_keys(make_cursor(True, LEGACY_NEWS_DDL), "ticker_news", "id", "published_utc")
+
+
+def test_has_keys_treats_missing_table_as_keyed():
+    handler = SingleStoreDBHandler("unused")
+    cursor = make_cursor(False, None)
+    assert handler.has_keys(cursor, "ticker_news", "id", "published_utc")
+    assert cursor.execute.call_count == 1
+
+
+def test_create_tables_runs_each_step_independently():
+    handler = SingleStoreDBHandler("unused")
+    conn = MagicMock()
+    handler.create_connection = MagicMock(return_value=conn)
+    handler.create_all_tables = MagicMock(__name__="create_all_tables")
+    handler.migrate_tables = MagicMock(__name__="migrate_tables", side_effect=RuntimeError("locked"))
+    handler.backfill_news_tickers = MagicMock(__name__="backfill_news_tickers")
+
+    handler.create_tables()
+
+    handler.create_all_tables.assert_called_once()
+    handler.backfill_news_tickers.assert_called_once()
+    assert conn.commit.call_count == 2
+    conn.close.assert_called_once()
+
+
+def make_handler(*fetched):
+    handler = SingleStoreDBHandler("unused")
+    conn = MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.fetchall.side_effect = list(fetched)
+    handler.create_connection = MagicMock(return_value=conn)
+    return handler, conn, cursor
+
+
+def executed(cursor):
+    return [" ".join(call.args[0].split()) for call in cursor.execute.call_args_list]
+
+
+def test_seed_ticker_universe_scans_trades_once():
+    handler, conn, cursor = make_handler()
+    handler.seed_ticker_universe()
+    [query] = executed(cursor)
+    assert "FROM trades GROUP BY ticker" in query
+    assert "first_seen=LEAST" in query and "last_seen=GREATEST" in query
+    conn.commit.assert_called_once()
+
+
+def test_refresh_ticker_universe_only_reads_live_trades_past_each_watermark():
+    handler, conn, cursor = make_handler()
+    handler.refresh_ticker_universe()
+    queries = executed(cursor)
+    assert not any("FROM trades" in query for query in queries)
+    assert "LEFT JOIN ticker_universe u ON u.ticker = t.ticker" in queries[0]
+    assert "WHERE u.ticker IS NULL OR u.last_seen IS NULL OR t.localTS > u.last_seen" in queries[0]
+    assert "JOIN ticker_details" in queries[1]
+    conn.commit.assert_called_once()
+
+
+def test_universe_ticker_queries():
+    handler, _, cursor = make_handler([("AAPL",), ("MSFT",)], [("AAPL",)], [("TSLA",)])
+    assert handler.get_universe_tickers() == ["AAPL", "MSFT"]
+    assert handler.get_universe_tickers(active_only=False) == ["AAPL"]
+    assert handler.get_recently_traded_tickers(300) == ["TSLA"]
+    queries = executed(cursor)
+    assert queries[0] == "SELECT ticker FROM ticker_universe WHERE active ORDER BY last_seen DESC"
+    assert queries[1] == "SELECT ticker FROM ticker_universe ORDER BY last_seen DESC"
+    assert "last_seen >= NOW() - INTERVAL %s SECOND" in queries[2]
+    assert cursor.execute.call_args.args[1] == (300,)
+
+
+def make_news(news_id, tickers):
+    return TickerNews(news_id, "url", None, "title", "author", "2024-05-01T12:00:00Z", tickers,
+                      None, [], None, {}, [])
+
+
+def test_insert_ticker_news_maps_each_article_to_its_tickers():
+    handler, conn, cursor = make_handler()
+    assert handler.insert_ticker_news([make_news("n1", ["AAPL", "MSFT", "AAPL", ""]), make_news("n2", None)])
+    news_call, mapping_call = cursor.executemany.call_args_list
+    assert [row[0] for row in news_call.args[1]] == ["n1", "n2"]
+    assert "INSERT INTO news_tickers" in mapping_call.args[0]
+    assert mapping_call.args[1] == [("AAPL", "2024-05-01T12:00:00Z", "n1"), ("MSFT", "2024-05-01T12:00:00Z", "n1")]
+    conn.commit.assert_called_once()
+
+
+def test_backfill_news_tickers_runs_only_while_empty():
+    handler = SingleStoreDBHandler("unused")
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (0,)
+    handler.backfill_news_tickers(cursor)
+    backfill = " ".join(cursor.execute.call_args.args[0].split())
+    assert backfill.startswith("INSERT IGNORE INTO news_tickers")
+    assert "JOIN TABLE(JSON_TO_ARRAY(n.tickers))" in backfill
+
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1,)
+    handler.backfill_news_tickers(cursor)
+    assert cursor.execute.call_count == 1
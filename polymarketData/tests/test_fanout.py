@@ -0,0 +1,41 @@
+import time
+from fanout import EndpointFanout
+from utils import RateLimiter
+
+
+def test_latency_excludes_rate_limiter_wait():
+    limiter = RateLimiter(1)
+    fanout = EndpointFanout(2, hedge_percentile=95, hedge_min_samples=1, hedge_budget=1.0,
+                            hedge_min_delay=0.0, rate_limiter=limiter)
+
+    def call():
+        with limiter():
+            return "ok"
+
+    try:
+        assert fanout.run({"first": call}) == {"first": "ok"}
+        start = time.monotonic()
+        # The limiter's one token per second is spent, so this waits about a second.
+        assert fanout.run({"second": call}) == {"second": "ok"}
+        assert time.monotonic() - start > 0.5
+        assert max(fanout.latencies.samples["second"]) < 0.1
+    finally:
+        fanout.shutdown()
+
+
+def test_no_hedge_without_spare_capacity():
+    limiter = RateLimiter(1)
+    fanout = EndpointFanout(2, hedge_percentile=50, hedge_min_samples=1, hedge_budget=1.0,
+                            hedge_min_delay=0.0, rate_limiter=limiter)
+    fanout.latencies.record("slow", 0.01)
+    fanout.primary_calls = 10
+    try:
+        with limiter():
+            pass
+        assert not limiter.has_capacity()
+        assert fanout.run({"slow": lambda: time.sleep(0.1) or "done"}) == {"slow": "done"}
+        stats = fanout.stats()
+        assert stats["hedged_calls"] == 0
+        assert stats["hedges_throttled"] == 1
+    finally:
+        fanout.shutdown()
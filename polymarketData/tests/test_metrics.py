@@ -0,0 +1,80 @@
+import json
+import pytest
+from metrics import Histogram, Metrics, endpoint_label, write_run_report
+import metrics as metrics_module
+
+
+def test_bucket_bounds_are_inclusive_upper_limits():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.1, 0.1000001, 1.0, 5.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.count == 4
+    assert histogram.quantile(0.25) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == 1.0  # the +Inf bucket reports the last finite bound
+
+
+def test_endpoint_label_collapses_tickers():
+    assert endpoint_label('/v3/reference/tickers/AAPL') == '/v3/reference/tickers/{ticker}'
+    assert endpoint_label('/v1/related-companies/MSFT') == '/v1/related-companies/{ticker}'
+    assert endpoint_label('/v2/reference/news') == '/v2/reference/news'
+
+
+def test_timed_write_counts_rows_and_errors():
+    registry = Metrics()
+    with registry.timed_write('ticker_events', 3):
+        pass
+    with pytest.raises(ValueError):
+        with registry.timed_write('ticker_events', 2):
+            raise ValueError('bad row')
+    tables = registry.report()['tables']['ticker_events']
+    assert tables['writes'] == 1
+    assert tables['rows_written'] == 3
+    assert tables['errors'] == {'ValueError': 1}
+    assert tables['latency_seconds']['count'] == 2
+
+
+def test_merge_adds_snapshots_from_other_shards():
+    shards = [Metrics(), Metrics()]
+    for i, shard in enumerate(shards):
+        shard.inc('api_requests', 2 + i, endpoint='/v2/reference/news')
+        shard.observe('api_request_seconds', 0.02 * (i + 1), endpoint='/v2/reference/news')
+    merged = Metrics()
+    for shard in shards:
+        merged.merge(json.loads(json.dumps(shard.snapshot())))
+
+    snapshot = merged.snapshot()
+    assert snapshot['counters'] == [{'name': 'api_requests', 'labels': {'endpoint': '/v2/reference/news'}, 'value': 5}]
+    [histogram] = snapshot['histograms']
+    assert histogram['count'] == 2
+    assert histogram['sum'] == pytest.approx(0.06)
+    assert sum(histogram['counts']) == 2
+
+
+def test_render_prometheus_text_format():
+    registry = Metrics()
+    registry.inc('db_writes', table='ticker_news')
+    registry.observe('db_write_seconds', 0.2, table='ticker_news')
+    lines = registry.render_prometheus().splitlines()
+    assert 'polymarket_db_writes_total{table="ticker_news"} 1' in lines
+    assert 'polymarket_db_write_seconds_bucket{le="0.1",table="ticker_news"} 0' in lines
+    assert 'polymarket_db_write_seconds_bucket{le="0.25",table="ticker_news"} 1' in lines
+    assert 'polymarket_db_write_seconds_bucket{le="+Inf",table="ticker_news"} 1' in lines
+    assert 'polymarket_db_write_seconds_sum{table="ticker_news"} 0.2' in lines
+    assert 'polymarket_db_write_seconds_count{table="ticker_news"} 1' in lines
+
+
+def test_run_report_groups_series_by_endpoint(tmp_path, monkeypatch):
+    registry = Metrics()
+    monkeypatch.setattr(metrics_module, 'metrics', registry)
+    registry.inc('api_requests', endpoint='/v2/reference/news')
+    registry.inc('api_responses', status='200', endpoint='/v2/reference/news')
+    registry.inc('api_errors', error='Timeout', endpoint='/v2/reference/news')
+    path = tmp_path / 'report.json'
+    write_run_report(str(path), tickers=2)
+    with open(path) as f:
+        report = json.load(f)
+    assert report['tickers'] == 2
+    assert report['endpoints']['/v2/reference/news'] == {
+        'requests': 1, 'status': {'200': 1}, 'errors': {'Timeout': 1}}
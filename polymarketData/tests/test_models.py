@@ -0,0 +1,53 @@
+import json
+from dataclasses import fields
+from models import (TickerEvent, TickerNews, TickerDetail, RelatedCompany, StockFundamental,
+                    to_rows)
+
+
+def test_to_rows_empty():
+    assert to_rows([]) == []
+
+
+def test_to_rows_follows_columns_order():
+    rows = to_rows([RelatedCompany("AAPL", "MSFT"), RelatedCompany("AAPL", "GOOGL")])
+    assert rows == [("AAPL", "MSFT"), ("AAPL", "GOOGL")]
+
+
+def test_columns_match_dataclass_fields():
+    for model in (TickerEvent, TickerNews, TickerDetail, RelatedCompany, StockFundamental):
+        assert model.COLUMNS == tuple(field.name for field in fields(model))
+        assert set(model.JSON_COLUMNS) <= set(model.COLUMNS)
+
+
+def test_to_rows_encodes_json_columns():
+    event = {"type": "ticker_change", "date": "2024-01-02", "ticker_change": {"ticker": "META"}}
+    row, = to_rows([TickerEvent.from_api(event, "FB", "Meta Platforms")])
+    assert row[:3] == ("META", "2024-01-02", "ticker_change")
+    assert json.loads(row[3]) == event
+    assert row[4] == "Meta Platforms"
+
+
+def test_news_from_api_maps_insights_and_defaults():
+    news = TickerNews.from_api({"id": "n1", "title": "Title", "insights": [{"ticker": "AAPL"}]})
+    row, = to_rows([news])
+    columns = dict(zip(TickerNews.COLUMNS, row))
+    assert columns["id"] == "n1"
+    assert columns["title"] == "Title"
+    assert json.loads(columns["related_insights"]) == [{"ticker": "AAPL"}]
+    assert json.loads(columns["tickers"]) == []
+    assert json.loads(columns["publisher"]) == {}
+
+
+def test_detail_from_api_takes_columns_by_name():
+    payload = {column: column.upper() for column in TickerDetail.COLUMNS}
+    payload.update(address={"city": "Cupertino"}, branding={})
+    row, = to_rows([TickerDetail.from_api(payload)])
+    assert row[0] == "TICKER"
+    assert row[-1] == "WEIGHTED_SHARES_OUTSTANDING"
+    assert json.loads(row[TickerDetail.COLUMNS.index("address")]) == {"city": "Cupertino"}
+
+
+def test_fundamental_falls_back_to_requested_timeframe():
+    fundamental = StockFundamental.from_api({"company_name": "Apple", "financials": {}}, "AAPL", "annual")
+    assert fundamental.timeframe == "annual"
+    assert fundamental.fiscal_period == ""
@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from models import FundamentalMetric, StockFundamental
+from pipeline import IngestionPipeline, flatten_fundamentals
+
+
+class RecordingWriter:
+    """Stands in for an insert_* method; fails any batch holding a 'bad' record."""
+
+    def __init__(self):
+        self.batches = []
+        self.written = threading.Event()
+
+    def __call__(self, records):
+        self.batches.append(list(records))
+        if 'bad' in records:
+            return False
+        self.written.set()
+        return True
+
+    def rows(self):
+        return [record for batch in self.batches if 'bad' not in batch for record in batch]
+
+
+def make_pipeline(batch_size=1000, flush_interval=60.0):
+    writer = RecordingWriter()
+    db_handler = MagicMock()
+    db_handler.insert_ticker_events = writer
+    pipeline = IngestionPipeline(MagicMock(), db_handler, fetch_workers=0, write_workers=1, queue_size=100,
+                                 batch_size=batch_size, flush_interval=flush_interval, report_interval=60.0)
+    pipeline.start()
+    return pipeline, writer
+
+
+def test_flushes_once_batch_size_is_reached():
+    pipeline, writer = make_pipeline(batch_size=3)
+    pipeline.put_records('ticker_events', ['a', 'b'])
+    pipeline.put_records('ticker_events', ['c'])
+    assert writer.written.wait(2)
+    assert writer.batches == [['a', 'b', 'c']]
+    stats = pipeline.close()
+    assert stats['bulk_writes'] == 1
+    assert stats['records_flushed'] == 3
+
+
+def test_flushes_partial_batch_after_flush_interval():
+    pipeline, writer = make_pipeline(flush_interval=0.1)
+    start = time.monotonic()
+    pipeline.put_records('ticker_events', ['a', 'b'])
+    assert writer.written.wait(2)
+    assert time.monotonic() - start < 1.0
+    assert writer.batches == [['a', 'b']]
+    pipeline.close()
+
+
+def test_close_drains_buffered_records():
+    pipeline, writer = make_pipeline()
+    pipeline.put_records('ticker_events', ['a', 'b'])
+    time.sleep(0.1)
+    assert writer.batches == []
+    stats = pipeline.close()
+    assert writer.batches == [['a', 'b']]
+    assert stats['records_flushed'] == 2
+
+
+def test_failed_batch_is_split_so_only_the_bad_record_is_dropped():
+    pipeline, writer = make_pipeline()
+    pipeline.put_records('ticker_events', ['a', 'bad', 'c', 'd', 'e'])
+    stats = pipeline.close()
+    assert sorted(writer.rows()) == ['a', 'c', 'd', 'e']
+    assert stats['records_flushed'] == 4
+    assert stats['records_dropped'] == 1
+    assert stats['failed_writes'] == 3  # the whole batch, the half holding 'bad', then 'bad' alone
+    assert stats['bulk_writes'] == len(writer.batches) - stats['failed_writes']
+
+
+FILING = {
+    "start_date": "2024-01-01", "end_date": "2024-03-31", "filing_date": "2024-05-03",
+    "fiscal_period": "Q1", "fiscal_year": "2024", "timeframe": "quarterly",
+    "financials": {
+        "income_statement": {
+            "revenues": {"value": 90753000000, "unit": "USD", "label": "Revenues", "order": 100},
+            "basic_earnings_per_share": {"value": 1.53, "unit": "USD / shares", "label": "Basic Earnings Per Share"},
+            "diluted_average_shares": {"value": None, "unit": "shares", "label": "Diluted Average Shares"},
+            "x" * 200: {"value": 1.0, "unit": "USD", "label": "Overlong metric name"},
+        },
+        "balance_sheet": {
+            "assets": {"value": 337411000000, "unit": "USD", "label": "Assets " + "very " * 80},
+        },
+        "comprehensive_income": {},
+        "source": "filing",
+    },
+}
+
+
+def test_flatten_fundamentals_emits_one_row_per_numeric_line_item():
+    fundamental = StockFundamental.from_api(FILING, "AAPL", "quarterly")
+    metrics = {(m.statement, m.metric): m for m in flatten_fundamentals([fundamental])}
+    assert sorted(metrics) == [("balance_sheet", "assets"), ("income_statement", "basic_earnings_per_share"),
+                               ("income_statement", "revenues")]
+
+    revenues = metrics[("income_statement", "revenues")]
+    assert revenues == FundamentalMetric("AAPL", "2024", "Q1", "quarterly", "income_statement", "revenues",
+                                         90753000000.0, "USD", "Revenues", "2024-01-01", "2024-03-31", "2024-05-03")
+    label = metrics[("balance_sheet", "assets")].label
+    assert len(label) == FundamentalMetric.WIDTHS["label"]
+    assert label.startswith("Assets very")
@@ -0,0 +1,52 @@
+import requests
+from replay import ResponseArchive, StubServer
+
+
+def make_archive(path):
+    archive = ResponseArchive(str(path))
+    archive.record("/v3/reference/tickers/AAPL", {"apiKey": "secret"}, b'{"status":"OK","results":{"ticker":"AAPL"}}')
+    archive.record("/v3/reference/tickers/MSFT", {}, b'{"status":"OK","results":{"ticker":"MSFT"}}')
+    archive.record("/v2/reference/news", {"limit": 10}, b'{"status":"OK","results":[]}')
+    return archive
+
+
+def test_archive_round_trip(tmp_path):
+    archive = make_archive(tmp_path / "responses.jsonl.gz")
+    archive.save()
+    loaded = ResponseArchive.load(archive.path)
+    assert loaded.entries == archive.entries
+    assert loaded.tickers() == ["AAPL", "MSFT"]
+    assert loaded.lookup("/v2/reference/news", {"limit": "10", "apiKey": "other"}) == '{"status":"OK","results":[]}'
+    assert loaded.lookup("/v2/reference/news", {"limit": 5}) is None
+
+
+def test_archive_never_stores_api_key(tmp_path):
+    archive = make_archive(tmp_path / "responses.jsonl.gz")
+    archive.save()
+    with open(archive.path, "rb") as f:
+        assert b"secret" not in f.read()
+
+
+def replay_statuses(archive, seed):
+    stub = StubServer(archive, rate_429=0.2, error_rate=0.2, seed=seed).start()
+    try:
+        with requests.Session() as session:
+            return [session.get(f"{stub.base_url}/v3/reference/tickers/AAPL", timeout=5).status_code
+                    for _ in range(30)]
+    finally:
+        stub.stop()
+
+
+def test_stub_server_is_deterministic_for_a_seed(tmp_path):
+    archive = make_archive(tmp_path / "responses.jsonl.gz")
+    first = replay_statuses(archive, seed=7)
+    assert first == replay_statuses(archive, seed=7)
+    assert {200, 429, 500} <= set(first)
+
+
+def test_stub_server_returns_404_for_unknown_requests(tmp_path):
+    stub = StubServer(make_archive(tmp_path / "responses.jsonl.gz")).start()
+    try:
+        assert requests.get(f"{stub.base_url}/v3/reference/tickers/TSLA", timeout=5).status_code == 404
+    finally:
+        stub.stop()
@@ -0,0 +1,40 @@
+import os
+import pytest
+from sharding import _combine, run_sharded, shard_tickers
+
+
+def ingest_ok(tickers, rate_limiter, include_news, record):
+    return {'pipeline': {'tickers': len(tickers), 'max_ticker_queue_depth': len(tickers)},
+            'response_cache': {'hits': 1, 'bytes': 1000}}
+
+
+def ingest_crash(tickers, rate_limiter, include_news, record):
+    if include_news:
+        os._exit(3)
+    return ingest_ok(tickers, rate_limiter, include_news, record)
+
+
+def test_shard_tickers_is_stable_and_complete():
+    tickers = [f"T{i}" for i in range(50)]
+    shards = shard_tickers(tickers, 4)
+    assert sorted(sum(shards, [])) == sorted(tickers)
+    assert shards == shard_tickers(tickers, 4)
+
+
+def test_combine_does_not_add_up_shared_cache_size():
+    total = {}
+    _combine(total, {'response_cache': {'hits': 1, 'bytes': 1000}})
+    _combine(total, {'response_cache': {'hits': 2, 'bytes': 1200}})
+    assert total == {'response_cache': {'hits': 3, 'bytes': 1200}}
+
+
+def test_run_sharded_combines_results():
+    stats = run_sharded([f"T{i}" for i in range(20)], 2, ingest_ok, rate_limit=100, poll_seconds=0.2)
+    assert stats['pipeline']['tickers'] == 20
+    assert stats['response_cache'] == {'hits': 2, 'bytes': 1000}
+    assert stats['shard_failures'] == 0
+
+
+def test_run_sharded_fails_on_dead_shard():
+    with pytest.raises(RuntimeError, match=r"\[0\]"):
+        run_sharded([f"T{i}" for i in range(20)], 2, ingest_crash, rate_limit=100, poll_seconds=0.2)
@@ -1,7 +1,19 @@
+import multiprocessing
 import threading
 import time
 from contextlib import contextmanager
 
+_waits = threading.local()
+
+
+def limiter_wait_seconds():
+    """Total time the calling thread has spent waiting for rate limiter tokens."""
+    return getattr(_waits, 'seconds', 0.0)
+
+
+def _record_wait(seconds):
+    _waits.seconds = limiter_wait_seconds() + seconds
+
 class RateLimiter:
     def __init__(self, max_calls_per_sec):
         self.lock = threading.Lock()
@@ -10,8 +22,18 @@ class RateLimiter:
         self.period = 1
         self.start_time = time.time()
 
+    def has_capacity(self):
+        """True if a call could start now without waiting for the next period."""
+        if not self.lock.acquire(blocking=False):
+            return False  # another caller holds the lock while it sleeps off the budget
+        try:
+            return self.calls < self.max_calls or time.time() - self.start_time >= self.period
+        finally:
+            self.lock.release()
+
     @contextmanager
     def __call__(self):
+        requested = time.monotonic()
         with self.lock:
             elapsed = time.time() - self.start_time
             if elapsed >= self.period:
@@ -24,4 +46,34 @@ class RateLimiter:
                 self.calls = 0
                 self.start_time = time.time()
             self.calls += 1
+        _record_wait(time.monotonic() - requested)
+        yield
+
+class SharedRateLimiter:
+    """
+    Rate budget shared by every process it is handed to, since Polygon
+    limits are per API key. Callers reserve evenly spaced slots from a
+    timestamp in shared memory and sleep outside the lock until their slot.
+    """
+    def __init__(self, max_calls_per_sec, ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.interval = 1.0 / max_calls_per_sec
+        self.lock = ctx.Lock()
+        self.next_slot = ctx.Value('d', 0.0, lock=False)
+
+    def has_capacity(self):
+        """True if the next slot is already due."""
+        return self.next_slot.value <= time.time()
+
+    @contextmanager
+    def __call__(self):
+        requested = time.monotonic()
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + self.interval
+        delay = slot - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        _record_wait(time.monotonic() - requested)
         yield